@@ -1,18 +1,40 @@
+from src.app.fragment import fragment
 from src.search.search import perform_search
+from src.search.merge import dedupe_results
+from src.search.merge import merge_results
+from src.search.paging import fetch_more
+from src.utils.passwords import verify_session_token
+from src.utils.passwords import issue_session_token
+from src.app.warmup import start_warmup
 from src.db.create import authenticate_user
 from src.db.create import insert_feedback
 from src.utils.db import encrypt_password
-from src.db.create import username_exists
+from src.db.create import is_known_username
 from src.db.create import insert_user
+from src.utils.coalesce import normalize_key
+from src.query.canonical import canonical_key
+from src.utils.metrics import start_metrics_server
+from src.utils.metrics import counter
+from src.utils.profiler import get_profile_store
+from src.utils.profiler import profile_request
+from src.serve.client import get_pool_client
 from src.config.logging import logger 
+from src.config.setup import config
+from collections import OrderedDict
 from datetime import datetime
 from typing import Optional
+from typing import Tuple
 from typing import Dict
 from typing import Any
 import streamlit as st
+import math
+import os
 from PIL import Image
 
 
+SESSION_SEARCH_LOOKUPS = counter("session_search_cache_lookups_total", "Per-session search cache lookups, by result.", ("result",))
+
+
 def load_css(file_path: str) -> None:
     """Load and apply CSS styles from a given file."""
     try:
@@ -22,6 +44,13 @@ def load_css(file_path: str) -> None:
         logger.exception(f"Failed to load CSS from {file_path}: {e}")
 
 
+def start_session(username: str) -> None:
+    """Marks the session as authenticated and issues a signed, expiring session token."""
+    st.session_state['authenticated'] = True
+    st.session_state['username'] = username
+    st.session_state['session_token'] = issue_session_token(username)
+
+
 def create_account_form() -> None:
     """Displays a form to create a new user account and handles the creation logic."""
     with st.form("create_account", border=False):
@@ -35,7 +64,8 @@ def create_account_form() -> None:
         
         if submit_button:
             try:
-                if username_exists(username):
+                # Reject names we already know are taken before paying for a bcrypt hash
+                if is_known_username(username):
                     st.error("This username is already taken. Please choose a different one.")
                 else:
                     user_data: Dict[str, Any] = {
@@ -45,11 +75,12 @@ def create_account_form() -> None:
                         "last_name": last_name,
                         "team": team
                     }
-                    insert_user(user_data)
-                    st.success(f"Account created successfully for {username}!")
-                    st.session_state['authenticated'] = True
-                    st.session_state['username'] = username
-                    st.rerun()
+                    if insert_user(user_data):
+                        st.success(f"Account created successfully for {username}!")
+                        start_session(username)
+                        st.rerun()
+                    else:
+                        st.error("This username is already taken. Please choose a different one.")
             except Exception as e:
                 logger.exception("Failed to create account: %s", e)
                 st.error("Failed to create account.")
@@ -69,8 +100,7 @@ def login_form() -> Optional[bool]:
         st.divider()
         if submit_button:
             if authenticate_user(username, password):
-                st.session_state['authenticated'] = True
-                st.session_state['username'] = username
+                start_session(username)
                 st.success(f"Welcome back, {username}!")
                 return True
             else:
@@ -84,6 +114,8 @@ def logout_button() -> None:
     if st.button("Logout"):
         st.session_state['authenticated'] = False
         st.session_state.pop('username', None)
+        st.session_state.pop('session_token', None)
+        st.session_state.pop('search_cache', None)
         st.rerun()
 
 
@@ -98,46 +130,153 @@ def display_banner(banner_path: str) -> None:
         st.error(f"Banner image not found at {banner_path}")
 
 
+@fragment
+def feedback_card(query: str, result: Dict[str, Any], rank: int, card_id: str, entity_details: Dict[str, Any]) -> None:
+    """
+    Renders one search result with its feedback form. Submitting the form reruns only this card.
+    """
+    with st.container():
+        st.markdown(f"### {rank}.) {result['title']} </br>",unsafe_allow_html=True)
+        st.markdown(f"{result['snippet']}")
+        st.markdown(f"{result['link']}", unsafe_allow_html=True)
+        if 'source' in result:
+            st.caption("Company website" if result['source'] == 'site' else "CDN")
+
+        with st.form(key=f"feedback_{card_id}",  border=False):
+            col1, col2 = st.columns([1, 3])
+            with col1:
+                feedback_type: str = st.radio("Relevant?", ["Yes", "No"], key=f'feedback_type_{card_id}', horizontal=True)
+            with col2:
+                feedback_text: str = st.text_input("Comments [Optional]", key=f'feedback_text_{card_id}', help="Please provide your comments here.")
+                submitted: bool = st.form_submit_button("Submit", use_container_width=True)
+            
+            if submitted:
+                logger.info("Feedback submitted for: %s - %s", feedback_type, feedback_text)
+                st.success("Feedback received. Thank you!")
+                feedback_data = {
+                    'timestamp': datetime.now(),
+                    'username': st.session_state['username'],
+                    'query': query,
+                    'title': result['title'],
+                    'snippet': result['snippet'],
+                    'url': result['link'],
+                    'feedback': feedback_text,
+                    'is_relevant': feedback_type,
+                    'feedback_given_timestamp': datetime.now(),
+                    'match_rank': rank,
+                    'query_mode': st.session_state.get('query_mode'),
+                    **entity_details  # Unpack entity details into the feedback data
+                }
+                # Replace with your actual function to handle feedback data
+                insert_feedback(feedback_data)
+
+        st.divider()
+
+
+def load_more_results(tab: str) -> bool:
+    """
+    Appends the next page of a tab's results to the stored search results, from the page cache
+    when it was prefetched. Entity extraction is not rerun.
+
+    Args:
+        tab (str): 'site', 'cdn', or 'all' for the unified list (which advances both backends).
+
+    Returns:
+        bool: True if new results were added.
+    """
+    search_results = st.session_state.search_results
+    next_pages = dict(search_results.get('next_pages', {}))
+    backends = ('site', 'cdn') if tab == 'all' else (tab,)
+    more = get_pool_client().fetch_more if config.SERVING_MODE == "worker_pool" else fetch_more
+
+    fetched = {}
+    for backend in backends:
+        if next_pages.get(backend):
+            fetched[backend], next_pages[backend] = more(next_pages[backend])
+    # A later page can repeat a result already shown in either tab
+    if tab == 'all':
+        shown = {backend: [result for result in search_results.get('all', []) if result.get('source') == backend] for backend in backends}
+    else:
+        shown = {backend: search_results.get(backend, []) for backend in ('site', 'cdn')}
+    fetched = dedupe_results(fetched, backends, shown=shown)
+    new_results = merge_results(fetched, backends) if tab == 'all' else fetched.get(tab, [])
+    # Replace rather than mutate: the stored results are shared with the session search cache
+    st.session_state.search_results = {**search_results, tab: search_results.get(tab, []) + new_results, 'next_pages': next_pages}
+    return bool(new_results)
+
+
 def display_search_results(query, search_results, tab_name, entity_details):
-    if search_results:
-        rank = 1
-        for result in search_results[tab_name.lower()]:
-            with st.container():
-                st.markdown(f"### {rank}.) {result['title']} </br>",unsafe_allow_html=True)
-                st.markdown(f"{result['snippet']}")
-                st.markdown(f"{result['link']}", unsafe_allow_html=True)
-
-                feedback_form_id = f"{tab_name.lower()}_{rank}"
-                with st.form(key=f"feedback_{feedback_form_id}",  border=False):
-                    col1, col2 = st.columns([1, 3])
-                    with col1:
-                        feedback_type: str = st.radio("Relevant?", ["Yes", "No"], key=f'feedback_type_{feedback_form_id}', horizontal=True)
-                    with col2:
-                        feedback_text: str = st.text_input("Comments [Optional]", key=f'feedback_text_{feedback_form_id}', help="Please provide your comments here.")
-                        submitted: bool = st.form_submit_button("Submit", use_container_width=True)
-                    
-                    if submitted:
-                        logger.info("Feedback submitted for: %s - %s", feedback_type, feedback_text)
-                        st.success("Feedback received. Thank you!")
-                        feedback_data = {
-                            'timestamp': datetime.now(),
-                            'username': st.session_state['username'],
-                            'query': query,
-                            'title': result['title'],
-                            'snippet': result['snippet'],
-                            'url': result['link'],
-                            'feedback': feedback_text,
-                            'is_relevant': feedback_type,
-                            'feedback_given_timestamp': datetime.now(),
-                            'match_rank': rank,
-                            **entity_details  # Unpack entity details into the feedback data
-                        }
-                        # Replace with your actual function to handle feedback data
-                        insert_feedback(feedback_data)
-
-                st.divider()     
-
-                rank += 1
+    """
+    Renders one page of a tab's results; only the cards on the current page are built.
+    """
+    if not search_results:
+        return
+    results = search_results.get(tab_name.lower(), [])
+    page_count = max(1, math.ceil(len(results) / config.RESULTS_PER_PAGE))
+    page_key = f"{tab_name.lower()}_page"
+    page = min(st.session_state.get(page_key, 0), page_count - 1)
+
+    offset = page * config.RESULTS_PER_PAGE
+    for index, result in enumerate(results[offset:offset + config.RESULTS_PER_PAGE]):
+        rank = offset + index + 1
+        feedback_card(query, result, rank, f"{tab_name.lower()}_{rank}", entity_details)
+
+    if page_count > 1:
+        col1, col2, col3 = st.columns([1, 2, 1])
+        with col1:
+            if st.button("Previous", key=f"{page_key}_previous", disabled=page == 0, use_container_width=True):
+                st.session_state[page_key] = page - 1
+                st.rerun()
+        with col2:
+            st.markdown(f"<p style='text-align: center'>Page {page + 1} of {page_count}</p>", unsafe_allow_html=True)
+        with col3:
+            if st.button("Next", key=f"{page_key}_next", disabled=page == page_count - 1, use_container_width=True):
+                st.session_state[page_key] = page + 1
+                st.rerun()
+
+    tab = tab_name.lower()
+    backends = ('site', 'cdn') if tab == 'all' else (tab,)
+    has_more = any(search_results.get('next_pages', {}).get(backend) for backend in backends)
+    if has_more and page == page_count - 1:
+        if st.button("Show more", key=f"{page_key}_more", use_container_width=True):
+            with st.spinner('Loading more results...'):
+                added = load_more_results(tab)
+            if added:
+                st.session_state[page_key] = page + 1 if len(results) % config.RESULTS_PER_PAGE == 0 else page
+            st.rerun()
+
+
+def cached_search(query_mode: str, query: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Runs `perform_search`, remembering the most recent results in the user's session so that
+    repeating a query (in any equivalent wording) and mode does not rerun entity extraction and search.
+
+    Args:
+        query_mode (str): 'Raw' or 'Targeted'.
+        query (str): The user's query.
+
+    Returns:
+        Tuple[Dict[str, Any], Dict[str, Any]]: The search results and extracted entities.
+    """
+    cache: OrderedDict = st.session_state.setdefault('search_cache', OrderedDict())
+    key = normalize_key(query_mode, canonical_key(query))
+    SESSION_SEARCH_LOOKUPS.inc(result="hit" if key in cache else "miss")
+    if key in cache:
+        cache.move_to_end(key)
+        logger.info("Serving search for '%s' (%s) from the session cache", query, query_mode)
+        return cache[key]
+
+    # Sample the pipeline when profiling is on for everyone or requested with ?profile=1
+    profiling = config.PROFILING_ENABLED or st.query_params.get("profile") == "1"
+    if config.SERVING_MODE == "worker_pool":
+        # This thread only waits on the pool, so the worker samples the pipeline instead
+        cache[key] = get_pool_client().perform_search(query_mode, query, profile=profiling)
+    else:
+        with profile_request(f"{query_mode}: {query}", enabled=profiling):
+            cache[key] = perform_search(query_mode, query)
+    while len(cache) > config.SEARCH_SESSION_CACHE_SIZE:
+        cache.popitem(last=False)
+    return cache[key]
 
 
 def search_and_feedback_ui():
@@ -146,7 +285,10 @@ def search_and_feedback_ui():
         st.session_state['search_results'] = None
     if 'entities' not in st.session_state:
         st.session_state['entities'] = None
-
+    if 'query_mode' not in st.session_state:
+        st.session_state['query_mode'] = None
+    if 'query' not in st.session_state:
+        st.session_state['query'] = None
 
     with st.form(key='search_form', border=False):
         
@@ -156,22 +298,31 @@ def search_and_feedback_ui():
         query_mode = st.radio("Query type: ", ['Raw', 'Targeted'], index=0, horizontal=True)
         submit_button = st.form_submit_button(label='Search', use_container_width=True)
         
-    # Simulate search results for the purpose of this example
+    # Only a search submission runs the pipeline; feedback reruns reuse the stored results
     if submit_button:
         with st.spinner('Searching...'):
-            search_results, entities = perform_search(query_mode, query)  # Replace with your actual function
+            search_results, entities = cached_search(query_mode, query)
             st.session_state.search_results = search_results
             st.session_state.entities = entities
+            st.session_state.query_mode = query_mode
+            st.session_state.query = query
+            st.session_state.site_page = 0
+            st.session_state.cdn_page = 0
+            st.session_state.all_page = 0
 
     entity_details = st.session_state.entities if st.session_state['entities'] else {}
 
+    if config.UNIFIED_RESULTS:
+        display_search_results(st.session_state.query, st.session_state.search_results, "All", entity_details)
+        return
+
     tab1, tab2 = st.tabs(["Company Websites", "CDNs"])
 
     with tab1:
-        display_search_results(query, st.session_state.search_results, "Site", entity_details)
+        display_search_results(st.session_state.query, st.session_state.search_results, "Site", entity_details)
 
     with tab2:
-        display_search_results(query, st.session_state.search_results, "CDN", entity_details)
+        display_search_results(st.session_state.query, st.session_state.search_results, "CDN", entity_details)
 
 
 def display_logo(image_path: str) -> None:
@@ -183,6 +334,24 @@ def display_logo(image_path: str) -> None:
         st.sidebar.error(f"Image not found at {image_path}")
 
 
+def profiles_admin_view() -> None:
+    """Lists the stored slow-request profiles in the sidebar for download."""
+    with st.sidebar.expander("Slow request profiles"):
+        profiles = get_profile_store().list()
+        if not profiles:
+            st.write("No profiles stored.")
+        for index, profile in enumerate(profiles):
+            with open(profile.path, 'rb') as file:
+                st.download_button(
+                    f"{profile.hour} · {profile.duration_ms} ms · {profile.label}",
+                    data=file.read(),
+                    file_name=os.path.basename(profile.path),
+                    mime="text/plain",
+                    key=f"profile_{index}",
+                    use_container_width=True
+                )
+
+
 def app() -> None:
     """Main application function to initialize and manage the search and feedback system."""
     # st.subheader(':blue[Document Sourcing - Search and Feedback System]', divider='rainbow')
@@ -195,8 +364,15 @@ def app() -> None:
     if 'authenticated' not in st.session_state:
         st.session_state['authenticated'] = False
 
+    # Reruns are authorized by the signed session token; no bcrypt or DB work until it expires
+    if st.session_state['authenticated'] and verify_session_token(st.session_state.get('session_token')) != st.session_state.get('username'):
+        st.session_state['authenticated'] = False
+        st.info("Your session has expired. Please log in again.")
+
     if st.session_state['authenticated']:
         search_and_feedback_ui()
+        if st.session_state.get('username') in config.ADMIN_USERS:
+            profiles_admin_view()
     else:
         # login_expander = st.expander("Login")
         # with login_expander:
@@ -207,6 +383,11 @@ def app() -> None:
         with create_acc_expander:
             create_account_form()
 
+    # No-op when started through src.app.launch; otherwise preload clients once the first page is on screen
+    start_warmup()
+    if config.METRICS_ENABLED:
+        start_metrics_server(config.METRICS_PORT)
+
 
 if __name__ == '__main__':
     app()
\ No newline at end of file
@@ -0,0 +1,19 @@
+from typing import Callable
+from typing import TypeVar
+import streamlit as st
+
+
+F = TypeVar("F", bound=Callable)
+
+
+def _rerun_whole_script(func: F) -> F:
+    return func
+
+
+# A fragment reruns on its own when one of its widgets changes, instead of rerunning the whole
+# script. Older Streamlit releases only have the experimental name or no fragments at all.
+fragment: Callable[[F], F] = (
+    getattr(st, "fragment", None)
+    or getattr(st, "experimental_fragment", None)
+    or _rerun_whole_script
+)
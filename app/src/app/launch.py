@@ -0,0 +1,53 @@
+from src.utils.metrics import start_metrics_server
+from src.app.warmup import wait_until_ready
+from src.app.warmup import start_warmup
+from src.config.setup import config
+import multiprocessing
+import argparse
+import secrets
+import os
+
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+
+
+def main(port: int) -> None:
+    """
+    Starts the warm-up and the metrics/readiness server, then runs the Streamlit app in the same
+    process so the first session finds every client already built. In `worker_pool` serving mode
+    the worker pool is started first, in its own process group.
+
+    Streamlit only starts listening once the warm-up has finished (or `warmup_timeout_seconds`
+    has passed), so a startup probe on the serving port, e.g. `GET /_stcore/health`, doubles as
+    the readiness check.
+
+    Args:
+        port (int): Port Streamlit listens on.
+    """
+    from streamlit.web import bootstrap
+
+    if config.SERVING_MODE == "worker_pool":
+        from src.serve.pool import serve
+
+        # Without a configured authkey, use a fresh one known only to this process and the pool
+        if not config.POOL_AUTHKEY:
+            config.POOL_AUTHKEY = secrets.token_hex(32)
+        multiprocessing.get_context("spawn").Process(
+            target=serve, kwargs={"authkey": config.POOL_AUTHKEY}, name="worker-pool", daemon=False
+        ).start()
+    if config.METRICS_ENABLED:
+        start_metrics_server(config.METRICS_PORT)
+    start_warmup()
+    wait_until_ready(config.WARMUP_TIMEOUT_SECONDS)
+
+    flag_options = {"server.port": port}
+    # bootstrap.run does not apply flag options itself; the streamlit CLI loads them first too
+    bootstrap.load_config_options(flag_options=flag_options)
+    bootstrap.run(APP_PATH, False, [], flag_options)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the app with a warm-up on process start.")
+    parser.add_argument("--port", type=int, default=8080)
+    args = parser.parse_args()
+    main(args.port)
@@ -0,0 +1,175 @@
+from src.utils.metrics import register_endpoint
+from src.config.logging import logger
+from src.config.setup import config
+from typing import Callable
+from typing import Tuple
+from typing import List
+from typing import Dict
+import threading
+import json
+import time
+
+
+_started = False
+_lock = threading.Lock()
+_ready = threading.Event()
+_status: Dict[str, str] = {}
+
+
+def _preload_search_client() -> None:
+    from src.search.client import get_search_client
+    get_search_client()
+
+
+def _open_search_channel() -> None:
+    # The gRPC channel connects on the first request, so send one small search
+    from src.search.cdn_search import search_data_store
+    search_data_store("annual report")
+
+
+def _preload_chat_model() -> None:
+    from src.generate.llm import get_llm
+    get_llm().model
+
+
+def _call_chat_model() -> None:
+    from src.generate.llm import get_llm
+    get_llm().predict("Reply with OK.", "warm-up", use_cache=False)
+
+
+def _open_pool_connections() -> None:
+    from src.utils.db import get_engine
+    from sqlalchemy import text
+
+    # Check out several connections at once so the pool keeps that many open for the first users
+    engine = get_engine()
+    connections = [engine.connect() for _ in range(config.WARMUP_DB_CONNECTIONS)]
+    try:
+        for connection in connections:
+            connection.execute(text("SELECT 1"))
+    finally:
+        for connection in connections:
+            connection.close()
+
+
+def _wait_for_pool() -> None:
+    from src.serve.client import get_pool_client
+
+    # The pool starts alongside this process; answer searches only once its workers respond
+    deadline = time.monotonic() + config.WARMUP_TIMEOUT_SECONDS
+    while True:
+        try:
+            get_pool_client().call("ping")
+            return
+        except (ConnectionRefusedError, EOFError):
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.5)
+
+
+def _preload_alias_table() -> None:
+    from src.query.canonical import get_alias_table
+    get_alias_table()
+
+
+def _preload_entity_table() -> None:
+    from src.query.entity_table import get_entity_table
+    get_entity_table()
+
+
+def _preload_vector_store() -> None:
+    from src.embed.providers import get_vector_store
+    get_vector_store()
+
+
+def _embed_query() -> None:
+    from src.query.sematic_search import find_closest_match
+    find_closest_match("warm-up")
+
+
+WARMUP_STEPS: List[Tuple[str, Callable[[], None]]] = [
+    ("search client", _preload_search_client),
+    ("chat model", _preload_chat_model),
+    ("database pool", _open_pool_connections),
+    ("company aliases", _preload_alias_table),
+    ("entity table", _preload_entity_table),
+    ("vector store", _preload_vector_store),
+]
+
+# Steps that call remote services; skipped when `warmup_remote_calls` is false
+REMOTE_WARMUP_STEPS: List[Tuple[str, Callable[[], None]]] = [
+    ("search channel", _open_search_channel),
+    ("chat model call", _call_chat_model),
+    ("query embedding", _embed_query),
+]
+
+
+def _run_warmup() -> None:
+    """
+    Runs each warm-up step, logging its duration. Failures are logged and do not stop later steps.
+    Readiness is reported once every step has run, whether or not it succeeded, so a failing
+    dependency degrades the first requests instead of keeping the instance out of service.
+    """
+    start = time.perf_counter()
+    if config.SERVING_MODE == "worker_pool":
+        # Search clients live in the pool's workers, which warm themselves up
+        steps = [(name, step) for name, step in WARMUP_STEPS if name in ("database pool", "company aliases")]
+        steps.append(("worker pool", _wait_for_pool))
+    else:
+        steps = WARMUP_STEPS + (REMOTE_WARMUP_STEPS if config.WARMUP_REMOTE_CALLS else [])
+    for name, step in steps:
+        _status[name] = "running"
+        step_start = time.perf_counter()
+        try:
+            step()
+            _status[name] = "ok"
+            logger.info("Warm-up: %s ready in %.0f ms", name, (time.perf_counter() - step_start) * 1000)
+        except Exception as e:
+            _status[name] = "failed"
+            logger.error(f"Warm-up: failed to preload {name}: {e}")
+    _ready.set()
+    logger.info("Warm-up completed in %.0f ms", (time.perf_counter() - start) * 1000)
+
+
+def start_warmup() -> None:
+    """
+    Preloads heavy dependencies and clients in a background thread, once per process.
+    """
+    global _started
+    with _lock:
+        if _started:
+            return
+        _started = True
+    threading.Thread(target=_run_warmup, name="warmup", daemon=True).start()
+
+
+def is_ready() -> bool:
+    """
+    Returns True once the warm-up has finished.
+    """
+    return _ready.is_set()
+
+
+def wait_until_ready(timeout: float) -> bool:
+    """
+    Blocks until the warm-up has finished or `timeout` seconds have passed.
+
+    Returns:
+        bool: True if the warm-up finished.
+    """
+    if not _ready.wait(timeout):
+        logger.warning("Warm-up still running after %.0f s; serving anyway", timeout)
+    return is_ready()
+
+
+def _ready_endpoint() -> Tuple[int, str, str]:
+    """
+    Readiness probe: 503 until the warm-up has finished, then 200. The first probe starts the
+    warm-up if nothing else has.
+    """
+    start_warmup()
+    body = json.dumps({"ready": is_ready(), "steps": dict(_status)})
+    return (200 if is_ready() else 503), "application/json", body
+
+
+register_endpoint("/ready", _ready_endpoint)
@@ -0,0 +1,121 @@
+from src.config.logging import logger
+from typing import Optional
+import threading
+import datetime
+import os
+
+
+SCOPES = ["https://www.googleapis.com/auth/cloud-platform"]
+
+# Refresh this long before the token expires so callers never see an expired token
+REFRESH_MARGIN_SECONDS = 300
+
+# Wait between attempts when a background refresh fails
+RETRY_SECONDS = 30
+
+
+class CredentialManager:
+    """
+    Holds the process-wide Google credentials and caches their access token.
+
+    The token is fetched on first use and then refreshed in a background thread shortly before
+    it expires. All methods are thread-safe.
+    """
+
+    def __init__(self, credentials_path: Optional[str] = None, scopes: Optional[list] = None) -> None:
+        """
+        Args:
+            credentials_path (Optional[str]): Path to a service account key file. Application default
+                credentials are used when it is missing.
+            scopes (Optional[list]): OAuth scopes to request.
+        """
+        self.credentials_path = credentials_path
+        self.scopes = scopes or SCOPES
+        self._credentials = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._refresher: Optional[threading.Thread] = None
+
+    def _load_credentials(self):
+        if self.credentials_path and os.path.exists(self.credentials_path):
+            from google.oauth2 import service_account
+            return service_account.Credentials.from_service_account_file(self.credentials_path, scopes=self.scopes)
+        import google.auth
+        credentials, _ = google.auth.default(scopes=self.scopes)
+        return credentials
+
+    def _seconds_until_expiry(self) -> Optional[float]:
+        expiry = getattr(self._credentials, 'expiry', None)
+        if expiry is None:
+            return None
+        # google-auth stores expiry as a naive UTC datetime
+        return (expiry - datetime.datetime.utcnow()).total_seconds()
+
+    def _needs_refresh(self) -> bool:
+        if self._credentials is None or not self._credentials.token:
+            return True
+        remaining = self._seconds_until_expiry()
+        return remaining is not None and remaining <= REFRESH_MARGIN_SECONDS
+
+    def _refresh(self) -> None:
+        from google.auth.transport.requests import Request
+
+        logger.info("Refreshing access token...")
+        if self._credentials is None:
+            self._credentials = self._load_credentials()
+        self._credentials.refresh(Request())
+        logger.info("Access token refreshed; valid for %.0f s.", self._seconds_until_expiry() or 0)
+
+    def get_token(self) -> str:
+        """
+        Returns a valid access token, refreshing it first if it is missing or about to expire.
+
+        Returns:
+            str: The access token.
+
+        Raises:
+            RuntimeError: If no token could be obtained.
+        """
+        if self._needs_refresh():
+            with self._lock:
+                if self._needs_refresh():
+                    try:
+                        self._refresh()
+                    except Exception as e:
+                        logger.error(f"Failed to fetch access token. Error: {e}")
+                        raise RuntimeError("Failed to obtain access token") from e
+            self._start_refresher()
+        return self._credentials.token
+
+    def _start_refresher(self) -> None:
+        with self._lock:
+            if self._refresher is not None:
+                return
+            self._refresher = threading.Thread(target=self._refresh_loop, name="token-refresher", daemon=True)
+            self._refresher.start()
+
+    def _refresh_loop(self) -> None:
+        """
+        Sleeps until the token enters the refresh margin, then refreshes it proactively.
+        """
+        while not self._stop.is_set():
+            remaining = self._seconds_until_expiry()
+            wait = RETRY_SECONDS if remaining is None else max(remaining - REFRESH_MARGIN_SECONDS, 0)
+            if self._stop.wait(wait):
+                return
+            failed = False
+            with self._lock:
+                if self._needs_refresh():
+                    try:
+                        self._refresh()
+                    except Exception as e:
+                        logger.error(f"Background token refresh failed, retrying in {RETRY_SECONDS}s: {e}")
+                        failed = True
+            if failed:
+                self._stop.wait(RETRY_SECONDS)
+
+    def stop(self) -> None:
+        """
+        Stops the background refresher.
+        """
+        self._stop.set()
@@ -1,11 +1,26 @@
+from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueListener
+from logging.handlers import QueueHandler
+from datetime import datetime
+from datetime import timezone
+import multiprocessing
 import logging
+import atexit
+import random
+import queue
+import json
+import sys
 import os
 
 
+# Messages longer than this are truncated when written; full payloads belong at DEBUG level
+MAX_MESSAGE_CHARS = int(os.environ.get("LOG_MAX_MESSAGE_CHARS", 4000))
+
+
 def custom_path_filter(path):
     # Define the project root name
     project_root = "VertexAIDocExplorer"
-    
+
     # Find the index of the project root in the path
     idx = path.find(project_root)
     if idx != -1:
@@ -13,32 +28,116 @@ def custom_path_filter(path):
         path = path[idx+len(project_root):]
     return path
 
-class CustomLogRecord(logging.LogRecord):
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.pathname = custom_path_filter(self.pathname)
 
+class JsonFormatter(logging.Formatter):
+    """
+    Formats records as one JSON object per line. The `severity` field is what Cloud Logging
+    reads to classify structured log lines.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        message = record.getMessage()
+        if len(message) > MAX_MESSAGE_CHARS:
+            message = f"{message[:MAX_MESSAGE_CHARS]}... [{len(message) - MAX_MESSAGE_CHARS} chars truncated]"
+        entry = {
+            "time": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "severity": record.levelname,
+            "logger": record.name,
+            "module": record.module,
+            "path": f"{custom_path_filter(record.pathname)}:{record.lineno}",
+            "thread": record.threadName,
+            "message": message,
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class SampleFilter(logging.Filter):
+    """
+    Keeps a random fraction of records logged with `extra={'sample_rate': <0..1>}`, so that
+    large per-request payloads can be logged without writing every one. Other records pass.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        sample_rate = getattr(record, "sample_rate", None)
+        return sample_rate is None or random.random() < sample_rate
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    Enqueues records as they are, leaving message formatting to the listener thread. The queue
+    never leaves the process, so records do not need to be made picklable first.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def process_log_filename(log_filename):
+    """
+    Names the log file of the current process. A file is only rotated safely by the one process
+    writing it, so each process gets its own: `app.log` for the app, `api.log` and `pool.log` for
+    the API and the worker pool when run directly, and `<parent>.<process name>.log` for processes
+    started by them, e.g. `app.worker-pool.log` for the pool `src.app.launch` starts.
+    """
+    stem, extension = os.path.splitext(log_filename)
+    # Spawned processes inherit the parent's sys.argv, so they keep its prefix
+    script = os.path.splitext(os.path.basename(sys.argv[0] if sys.argv else ""))[0]
+    if script in ("api", "pool"):
+        stem = script
+    process_name = multiprocessing.current_process().name
+    if process_name != "MainProcess":
+        stem = f"{stem}.{process_name.lower()}"
+    return stem + extension
+
+
+def setup_logger(log_filename="app.log", log_dir="logs", max_bytes=10 * 1024 * 1024, backup_count=5):
+    """
+    Routes all logging through an in-memory queue. Callers only enqueue the record; a background
+    listener formats it as JSON and writes it to stderr and to a size-rotated log file of its own
+    process (see `process_log_filename`).
+
+    Args:
+        log_filename (str): Name of the log file of the app's main process.
+        log_dir (str): Directory of the log file.
+        max_bytes (int): Size at which the log file is rotated.
+        backup_count (int): Number of rotated files kept.
+
+    Returns:
+        logging.Logger: The root logger.
+    """
+    root = logging.getLogger()
+    # Configure once per process even if this module is loaded again
+    if any(isinstance(handler, DeferredQueueHandler) for handler in root.handlers):
+        return root
 
-def setup_logger(log_filename="app.log", log_dir="logs"):
     # Ensure the logging directory exists
     if not os.path.exists(log_dir):
         os.makedirs(log_dir)
 
     # Define the log file path
-    log_filepath = os.path.join(log_dir, log_filename)
-
-    # Define the logging configuration
-    logging.setLogRecordFactory(CustomLogRecord)
-    logging.basicConfig(
-        level=logging.INFO,
-        format="%(asctime)s [%(levelname)s] [%(module)s] [%(pathname)s]: %(message)s",
-        handlers=[
-            logging.StreamHandler(),
-            logging.FileHandler(log_filepath)
-        ]
-    )
+    log_filepath = os.path.join(log_dir, process_log_filename(log_filename))
+
+    formatter = JsonFormatter()
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(formatter)
+    file_handler = RotatingFileHandler(log_filepath, maxBytes=max_bytes, backupCount=backup_count)
+    file_handler.setFormatter(formatter)
+
+    log_queue: queue.Queue = queue.Queue(-1)
+    queue_handler = DeferredQueueHandler(log_queue)
+    queue_handler.addFilter(SampleFilter())
+
+    root.setLevel(os.environ.get("LOG_LEVEL", "INFO").upper())
+    root.addHandler(queue_handler)
+
+    listener = QueueListener(log_queue, stream_handler, file_handler, respect_handler_level=True)
+    listener.start()
+    # Drain queued records before the interpreter exits
+    atexit.register(listener.stop)
 
     # Return the configured logger
-    return logging.getLogger()
+    return root
 
-logger = setup_logger()
\ No newline at end of file
+logger = setup_logger()
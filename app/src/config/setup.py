@@ -1,5 +1,4 @@
-from google.auth.transport.requests import Request
-from google.oauth2 import service_account
+from src.config.credentials import CredentialManager
 from src.config.logging import logger
 from typing import Dict
 from typing import Any
@@ -33,10 +32,14 @@ class Config:
         self.REGION = self.__config['region']
         self.CREDENTIALS_PATH = self.__config['credentials_json']
         self._set_google_credentials(self.CREDENTIALS_PATH)
-        self.ACCESS_TOKEN = self._set_access_token()
+        self.credentials = CredentialManager(self.CREDENTIALS_PATH)
         self.CDN_SEARCH_DATA_STORE_ID = self.__config['cdn_search_datastore_id']
         self.TEXT_EMBED_MODEL_NAME = self.__config['text_embed_model_name']
         self.TEXT_GEN_MODEL_NAME = self.__config['text_gen_model_name']
+        self.MODEL_PROVIDER = self.__config.get('model_provider', 'vertex')
+        self.LOCAL_EMBEDDING_DIMENSION = self.__config.get('local_embedding_dimension', 768)
+        self.LOCAL_CHAT_RECORDINGS_PATH = self.__config.get('local_chat_recordings_path')
+        self.ENTITIES_PATH = self.__config.get('entities_path', './data/entities.jsonl')
 
         self.BUCKET = self.__config['bucket']
         self.CLOUD_SQL_INSTANCE = self.__config['cloud_sql_instance']
@@ -46,6 +49,52 @@ class Config:
         self.CLOUD_SQL_USERS_TABLE = self.__config['cloud_sql_users_table']
         self.CLOUD_SQL_FEEDBACK_TABLE = self.__config['cloud_sql_feedback_table']
         self.CLOUD_SQL_URLS_TABLE = self.__config['cloud_sql_urls_table']
+        self.DATABASE_URL = self.__config.get('database_url')
+        self.BCRYPT_ROUNDS = self.__config.get('bcrypt_rounds', 12)
+        self.BCRYPT_WORKERS = self.__config.get('bcrypt_workers', 2)
+        self.SESSION_TTL_SECONDS = self.__config.get('session_ttl_seconds', 28800)
+        self.SESSION_SECRET = self.__config.get('session_secret')
+        self.FEEDBACK_SPOOL_PATH = self.__config.get('feedback_spool_path', './spool/feedback.jsonl')
+        self.FEEDBACK_BATCH_SIZE = self.__config.get('feedback_batch_size', 100)
+        self.FEEDBACK_FLUSH_INTERVAL_SECONDS = self.__config.get('feedback_flush_interval_seconds', 2)
+        self.RELEVANCE_TABLE_PATH = self.__config.get('relevance_table_path', './data/relevance_table.json')
+        self.RERANK_WEIGHT = self.__config.get('rerank_weight', 3)
+        self.SEARCH_PAGE_SIZE = self.__config.get('search_page_size', 5)
+        self.RESULTS_PER_PAGE = self.__config.get('results_per_page', 5)
+        self.UNIFIED_RESULTS = self.__config.get('unified_results', False)
+        self.ENTITY_BATCH_REFRESH_SECONDS = self.__config.get('entity_batch_refresh_seconds', 300)
+        self.PREFETCH_NEXT_PAGE = self.__config.get('prefetch_next_page', True)
+        self.PREFETCH_WORKERS = self.__config.get('prefetch_workers', 2)
+        self.SEARCH_PAGE_CACHE_SIZE = self.__config.get('search_page_cache_size', 256)
+        self.SEARCH_SESSION_CACHE_SIZE = self.__config.get('search_session_cache_size', 16)
+        self.METRICS_ENABLED = self.__config.get('metrics_enabled', True)
+        self.METRICS_PORT = self.__config.get('metrics_port', 9090)
+        self.SERVING_MODE = self.__config.get('serving_mode', 'in_process')
+        self.POOL_HOST = self.__config.get('pool_host', '127.0.0.1')
+        self.POOL_PORT = self.__config.get('pool_port', 8765)
+        self.POOL_WORKERS = self.__config.get('pool_workers') or os.cpu_count() or 1
+        self.POOL_AUTHKEY = self.__config.get('pool_authkey')
+        self.API_HOST = self.__config.get('api_host', '0.0.0.0')
+        self.API_PORT = self.__config.get('api_port', 8081)
+        self.API_MAX_CONCURRENCY = self.__config.get('api_max_concurrency', 8)
+        self.API_MAX_BATCH = self.__config.get('api_max_batch', 32)
+        self.API_KEEPALIVE_SECONDS = self.__config.get('api_keepalive_seconds', 75)
+        self.FAISS_MMAP = self.__config.get('faiss_mmap', False)
+        self.WARMUP_REMOTE_CALLS = self.__config.get('warmup_remote_calls', True)
+        self.WARMUP_DB_CONNECTIONS = self.__config.get('warmup_db_connections', 2)
+        self.WARMUP_TIMEOUT_SECONDS = self.__config.get('warmup_timeout_seconds', 120)
+        self.PROFILING_ENABLED = self.__config.get('profiling_enabled', False)
+        self.PROFILE_DIR = self.__config.get('profile_dir', './profiles')
+        self.PROFILE_KEEP_PER_HOUR = self.__config.get('profile_keep_per_hour', 5)
+        self.PROFILE_RETENTION_HOURS = self.__config.get('profile_retention_hours', 24)
+        self.PROFILE_INTERVAL_MS = self.__config.get('profile_interval_ms', 5)
+        self.ADMIN_USERS = self.__config.get('admin_users') or []
+
+        self.LLM_CACHE_ENABLED = self.__config.get('llm_cache_enabled', True)
+        self.LLM_CACHE_MAX_ENTRIES = self.__config.get('llm_cache_max_entries', 1024)
+        self.LLM_CACHE_TTL_SECONDS = self.__config.get('llm_cache_ttl_seconds', 86400)
+        self.LLM_CACHE_PATH = self.__config.get('llm_cache_path')
+        self.LLM_CACHE_DISK_MAX_ENTRIES = self.__config.get('llm_cache_disk_max_entries', 50000)
 
     @staticmethod
     def _load_config(config_path: str) -> Dict[str, Any]:
@@ -74,33 +123,18 @@ class Config:
         """
         os.environ['GOOGLE_APPLICATION_CREDENTIALS'] = credentials_path
 
-        
-    def _set_access_token(self) -> str:
+    @property
+    def ACCESS_TOKEN(self) -> str:
         """
-        Fetch an access token for authentication using the Google Cloud SDK for Python.
+        A valid access token from the shared credential manager, refreshed automatically before it expires.
 
         Returns:
-        - str: The fetched access token.
+        - str: The access token, or an empty string if it could not be fetched.
         """
-        logger.info("Fetching access token...")
-        try:  
-            # Load the credentials from the service account file
-            credentials = service_account.Credentials.from_service_account_file(
-                self.__config['credentials_json'],
-                scopes=["https://www.googleapis.com/auth/cloud-platform"],
-            )
-
-            # Request a new token if needed
-            if not credentials.valid or credentials.expired:
-                credentials.refresh(Request())
-
-            logger.info("Access token obtained successfully.")
-            return credentials.token
-        except Exception as e:
-            logger.error(f"Failed to fetch access token. Error: {e}")
+        try:
+            return self.credentials.get_token()
+        except RuntimeError:
             return ""
 
-    
-
 
 config = Config()
\ No newline at end of file
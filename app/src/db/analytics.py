@@ -0,0 +1,153 @@
+from sqlalchemy.exc import SQLAlchemyError
+from src.config.logging import logger
+from src.config.setup import config
+from src.utils.db import get_engine
+from sqlalchemy import text
+from typing import Optional
+from typing import List
+from typing import Dict
+from typing import Any
+import argparse
+import time
+import os
+
+
+EXPORT_COLUMNS = [
+    'id', 'timestamp', 'username', 'query', 'title', 'snippet', 'url', 'feedback', 'is_relevant',
+    'feedback_given_timestamp', 'match_rank', 'company', 'report_type', 'country', 'year', 'query_mode'
+]
+
+GROUPINGS = {
+    'company': ['company'],
+    'query_mode': ['query_mode'],
+    'company_query_mode': ['company', 'query_mode'],
+}
+
+
+def export_feedback_to_parquet(output_path: str, chunk_size: int = 50000, since_id: Optional[int] = None) -> int:
+    """
+    Streams the feedback table to a Parquet file without holding it in memory.
+
+    Rows are read through a server-side cursor and written one chunk (row group) at a time.
+
+    Args:
+        output_path (str): Destination Parquet file.
+        chunk_size (int): Rows fetched and written per chunk.
+        since_id (Optional[int]): Only export rows with an id greater than this.
+
+    Returns:
+        int: Number of rows exported.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        ('id', pa.int64()),
+        ('timestamp', pa.timestamp('us')),
+        ('username', pa.string()),
+        ('query', pa.string()),
+        ('title', pa.string()),
+        ('snippet', pa.string()),
+        ('url', pa.string()),
+        ('feedback', pa.string()),
+        ('is_relevant', pa.string()),
+        ('feedback_given_timestamp', pa.timestamp('us')),
+        ('match_rank', pa.int32()),
+        ('company', pa.string()),
+        ('report_type', pa.string()),
+        ('country', pa.string()),
+        ('year', pa.int32()),
+        ('query_mode', pa.string()),
+    ])
+    query = f"SELECT {', '.join(EXPORT_COLUMNS)} FROM {config.CLOUD_SQL_FEEDBACK_TABLE}"
+    params: Dict[str, Any] = {}
+    if since_id is not None:
+        query += " WHERE id > :since_id"
+        params['since_id'] = since_id
+    query += " ORDER BY id"
+
+    directory = os.path.dirname(output_path)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+
+    exported = 0
+    start = time.perf_counter()
+    try:
+        with get_engine().connect() as connection, pq.ParquetWriter(output_path, schema, compression='zstd') as writer:
+            result = connection.execution_options(stream_results=True, yield_per=chunk_size).execute(text(query), params)
+            for partition in result.partitions(chunk_size):
+                columns = {name: [row[i] for row in partition] for i, name in enumerate(EXPORT_COLUMNS)}
+                writer.write_table(pa.Table.from_pydict(columns, schema=schema))
+                exported += len(partition)
+                logger.info("Exported %d feedback rows...", exported)
+    except SQLAlchemyError as e:
+        logger.error(f"Failed to export feedback: {e}")
+        raise
+
+    logger.info("Exported %d feedback rows to %s in %.1f s", exported, output_path, time.perf_counter() - start)
+    return exported
+
+
+def precision_by(grouping: str = 'company', min_votes: int = 1) -> List[Dict[str, Any]]:
+    """
+    Computes relevance precision per group. The aggregation runs in the database, so only one row
+    per group is transferred.
+
+    Args:
+        grouping (str): One of 'company', 'query_mode' or 'company_query_mode'.
+        min_votes (int): Minimum number of votes for a group to be reported.
+
+    Returns:
+        List[Dict[str, Any]]: Per-group vote counts, overall precision and precision at rank 1,
+        ordered by vote count.
+    """
+    if grouping not in GROUPINGS:
+        raise ValueError(f"Unknown grouping '{grouping}'. Expected one of {sorted(GROUPINGS)}.")
+    keys = ", ".join(GROUPINGS[grouping])
+    query = text(f"""
+        SELECT {keys},
+               COUNT(*) AS votes,
+               SUM(CASE WHEN is_relevant = 'Yes' THEN 1 ELSE 0 END) AS relevant,
+               SUM(CASE WHEN match_rank = 1 THEN 1 ELSE 0 END) AS votes_at_1,
+               SUM(CASE WHEN match_rank = 1 AND is_relevant = 'Yes' THEN 1 ELSE 0 END) AS relevant_at_1
+        FROM {config.CLOUD_SQL_FEEDBACK_TABLE}
+        WHERE is_relevant IN ('Yes', 'No')
+        GROUP BY {keys}
+        HAVING COUNT(*) >= :min_votes
+        ORDER BY votes DESC
+    """)
+    try:
+        with get_engine().connect() as connection:
+            rows = connection.execute(query, {'min_votes': min_votes}).mappings().all()
+    except SQLAlchemyError as e:
+        logger.error(f"Failed to compute precision by {grouping}: {e}")
+        raise
+
+    aggregates = []
+    for row in rows:
+        aggregate = dict(row)
+        aggregate['precision'] = aggregate['relevant'] / aggregate['votes'] if aggregate['votes'] else None
+        aggregate['precision_at_1'] = (
+            aggregate['relevant_at_1'] / aggregate['votes_at_1'] if aggregate['votes_at_1'] else None
+        )
+        aggregates.append(aggregate)
+    return aggregates
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Feedback analytics.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    export_parser = subparsers.add_parser("export", help="Stream the feedback table to Parquet.")
+    export_parser.add_argument("--out", default="./exports/feedback.parquet")
+    export_parser.add_argument("--chunk-size", type=int, default=50000)
+    export_parser.add_argument("--since-id", type=int)
+    precision_parser = subparsers.add_parser("precision", help="Report precision per group.")
+    precision_parser.add_argument("--by", choices=sorted(GROUPINGS), default="company")
+    precision_parser.add_argument("--min-votes", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.command == "export":
+        export_feedback_to_parquet(args.out, args.chunk_size, args.since_id)
+    elif args.command == "precision":
+        for aggregate in precision_by(args.by, args.min_votes):
+            logger.info(aggregate)
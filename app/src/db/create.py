@@ -1,15 +1,50 @@
-from src.utils.db import create_engine_with_connection_pool
+from src.db.feedback_writer import get_feedback_writer
+from src.db.migrate import migrate
+from src.query.canonical import stable_query_key
+from src.utils.passwords import verify_password
+from src.utils.passwords import hash_password
+from src.utils.passwords import needs_rehash
+from src.utils.db import get_engine
 from sqlalchemy.engine.base import Connection
 from sqlalchemy.exc import SQLAlchemyError 
+from sqlalchemy.exc import IntegrityError
 from src.config.logging import logger
+from collections import OrderedDict
 from sqlalchemy import text
 from typing import Optional
 from typing import Dict
+import threading
 import hashlib
-import bcrypt
 
 
-engine = create_engine_with_connection_pool()
+# Usernames known to be taken, most recently seen last. Lets the signup form reject a taken
+# name without hashing the password or touching the database.
+KNOWN_USERNAMES_MAX = 10000
+_known_usernames: "OrderedDict[str, None]" = OrderedDict()
+_known_usernames_lock = threading.Lock()
+
+
+def remember_username(username: str) -> None:
+    """
+    Records a username as taken, evicting the least recently seen one when the cache is full.
+    """
+    with _known_usernames_lock:
+        _known_usernames[username] = None
+        _known_usernames.move_to_end(username)
+        if len(_known_usernames) > KNOWN_USERNAMES_MAX:
+            _known_usernames.popitem(last=False)
+
+
+def is_known_username(username: str) -> bool:
+    """
+    Returns True if the username is cached as taken. A False result is not authoritative;
+    `insert_user` remains the source of truth.
+    """
+    with _known_usernames_lock:
+        if username in _known_usernames:
+            _known_usernames.move_to_end(username)
+            return True
+    return False
 
 
 def check_password(plain_password: str, retrieved_password: bytes) -> bool:
@@ -23,9 +58,7 @@ def check_password(plain_password: str, retrieved_password: bytes) -> bool:
     Returns:
         bool: True if the passwords match, False otherwise.
     """
-    if isinstance(retrieved_password, str):
-        retrieved_password = retrieved_password.encode('utf-8')
-    return bcrypt.checkpw(plain_password.encode('utf-8'), retrieved_password)
+    return verify_password(plain_password, retrieved_password)
 
 
 def execute_safe_query(connection: Connection, query: str, params: Optional[Dict] = None) -> None:
@@ -44,60 +77,48 @@ def execute_safe_query(connection: Connection, query: str, params: Optional[Dict
         raise
 
 
-def create_users_table() -> None:
-    """
-    Creates the 'users' table in the database if it does not already exist.
+def _is_duplicate_key(error: IntegrityError) -> bool:
     """
-    create_table_statement = """
-        CREATE TABLE IF NOT EXISTS users (
-            username VARCHAR(255) NOT NULL,
-            password_hash VARCHAR(255) NOT NULL,
-            first_name VARCHAR(255),
-            last_name VARCHAR(255),
-            team VARCHAR(255),
-            created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
-            PRIMARY KEY (username)
-        );
+    Tells a duplicate key (MySQL error 1062, or a UNIQUE/PRIMARY KEY failure in SQLite) from other
+    integrity errors such as NOT NULL violations.
     """
-    with engine.begin() as connection:
-        execute_safe_query(connection, create_table_statement)
-        logger.info("Table 'users' created successfully.")
+    args = getattr(error.orig, 'args', ())
+    if args and args[0] == 1062:
+        return True
+    return "UNIQUE constraint failed" in str(error.orig)
 
 
-def insert_user(user_data: Dict[str, str]) -> None:
+def insert_user(user_data: Dict[str, str]) -> bool:
     """
-    Inserts a new user into the 'users' table.
+    Inserts a new user into the 'users' table in a single statement. The username primary key
+    rejects duplicates atomically, so no separate existence check is needed.
     
     Args:
         user_data (Dict[str, str]): A dictionary containing the user data.
+
+    Returns:
+        bool: True if the user was created, False if the username is already taken.
     """
     insert_stmt = f"""
         INSERT INTO users (username, password_hash, first_name, last_name, team)
         VALUES (:username, :password_hash, :first_name, :last_name, :team)
     """
-    with engine.begin() as connection:
-        execute_safe_query(connection, insert_stmt, user_data)
-        logger.info(f"User {user_data['username']} inserted successfully.")
-
-
-def username_exists(username: str) -> bool:
-    """
-    Checks if the given username already exists in the 'users' table.
-    
-    Args:
-        username (str): The username to check.
-        
-    Returns:
-        bool: True if the username exists, False otherwise.
-    """
-    query = "SELECT EXISTS(SELECT 1 FROM users WHERE username = :username)"
-    with engine.connect() as connection:
-        try:
-            result = connection.execute(text(query), {'username': username}).scalar()
-            return result
-        except SQLAlchemyError as e:
-            logger.error(f"Failed to check if username {username} exists: {e}")
+    try:
+        with get_engine().begin() as connection:
+            connection.execute(text(insert_stmt), user_data)
+    except IntegrityError as e:
+        if not _is_duplicate_key(e):
+            logger.error(f"Failed to insert user {user_data['username']}: {e}")
             raise
+        logger.info(f"Username {user_data['username']} is already taken.")
+        remember_username(user_data['username'])
+        return False
+    except SQLAlchemyError as e:
+        logger.error(f"Failed to insert user {user_data['username']}: {e}")
+        raise
+    remember_username(user_data['username'])
+    logger.info(f"User {user_data['username']} inserted successfully.")
+    return True
 
 
 def authenticate_user(username: str, password: str) -> bool:
@@ -112,106 +133,78 @@ def authenticate_user(username: str, password: str) -> bool:
         bool: True if authentication is successful, False otherwise.
     """
     query = "SELECT password_hash FROM users WHERE username = :username"
-    with engine.connect() as connection:
+    with get_engine().connect() as connection:
         try:
             result = connection.execute(text(query), {'username': username}).fetchone()
-            if result is not None:
-                hashed_password = result[0]
-                return check_password(password, hashed_password)
-            return False
         except SQLAlchemyError as e:
             logger.error(f"Authentication failed for user {username}: {e}")
             raise
 
+    # Verify after the connection is back in the pool so bcrypt never holds it
+    if result is None:
+        return False
+    remember_username(username)
+    hashed_password = result[0]
+    if not check_password(password, hashed_password):
+        return False
 
-def generate_hash(username, query, feedback, vote):
-    """
-    Generates a SHA-256 hash from the concatenation of the given fields.
-    """
-    hash_input = f"{username}{query}{feedback}{vote}".encode('utf-8')
-    return hashlib.sha256(hash_input).hexdigest()
+    # Upgrade hashes made with an outdated cost factor while we have the plain password
+    if needs_rehash(hashed_password):
+        try:
+            update_password_hash(username, hash_password(password))
+        except SQLAlchemyError as e:
+            logger.error(f"Failed to rehash password for user {username}: {e}")
+    return True
 
 
-def check_hash_exists(hash_value):
+def update_password_hash(username: str, password_hash: bytes) -> None:
     """
-    Checks if a given hash already exists in the feedback table.
+    Replaces a user's stored password hash.
+
+    Args:
+        username (str): The user's username.
+        password_hash (bytes): The new bcrypt hash.
     """
-    query = text("SELECT EXISTS(SELECT 1 FROM feedback WHERE unique_hash = :hash_value)")
-    with engine.begin() as connection:
-        result = connection.execute(query, {'hash_value': hash_value}).fetchone()
-        return result[0]
+    query = "UPDATE users SET password_hash = :password_hash WHERE username = :username"
+    with get_engine().begin() as connection:
+        execute_safe_query(connection, query, {'username': username, 'password_hash': password_hash})
+        logger.info(f"Password hash for user {username} upgraded to the current cost factor.")
 
 
-def create_feedback_table() -> None:
-    """
-    Creates the 'feedback' table in the database if it does not already exist.
+def generate_hash(username, query, feedback, vote):
     """
-    create_table_statement = """
-    CREATE TABLE IF NOT EXISTS feedback (
-        id INT AUTO_INCREMENT PRIMARY KEY,
-        timestamp TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
-        username VARCHAR(255) NOT NULL,
-        query TEXT,
-        title TEXT,
-        snippet TEXT,
-        url VARCHAR(255),
-        feedback TEXT,
-        is_relevant ENUM('Yes', 'No', 'NA'),
-        feedback_given_timestamp TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
-        match_rank INT,
-        unique_hash VARCHAR(255) UNIQUE,
-        company VARCHAR(255),
-        report_type VARCHAR(255),
-        country VARCHAR(255),
-        year INT,
-        FOREIGN KEY (username) REFERENCES users(username)
-    );
+    Generates a SHA-256 hash from the concatenation of the given fields. The query is reduced to
+    its stable key, so the same vote on a query differing only in case, spacing or word order
+    counts as a duplicate. Migration 6 rehashed the rows stored before this.
     """
-    with engine.begin() as connection:
-        execute_safe_query(connection, create_table_statement)
-        logger.info("Table 'feedback' created successfully.")
+    hash_input = f"{username}{stable_query_key(query)}{feedback}{vote}".encode('utf-8')
+    return hashlib.sha256(hash_input).hexdigest()
 
 
 def insert_feedback(feedback_data):
     """
-    Inserts feedback into the database if the hash is unique.
+    Queues feedback for a batched write to the database.
+
+    The row is spooled locally and inserted in the background; duplicates (same unique hash)
+    are dropped by the database's unique constraint instead of a separate lookup.
     """
     # Compute the hash including feedback text
-    hash_value = generate_hash(
+    feedback_data['unique_hash'] = generate_hash(
         feedback_data['username'],
         feedback_data['query'],
         feedback_data['feedback'],
         feedback_data['is_relevant']
     )
-
-    # Check if the hash exists
-    if check_hash_exists(hash_value):
-        print("Duplicate feedback detected. Skipping insertion.")
-        return False
-
-    # Prepare the insert query using the text function
-    insert_query = text("""
-        INSERT INTO feedback (timestamp, username, query, title, snippet, url, feedback, is_relevant, feedback_given_timestamp, match_rank, unique_hash, company, report_type, country, year)
-        VALUES (:timestamp, :username, :query, :title, :snippet, :url, :feedback, :is_relevant, :feedback_given_timestamp, :match_rank, :unique_hash, :company, :report_type, :country, :year)
-    """)
-
-    # Add the computed hash to the feedback data
-    feedback_data['unique_hash'] = hash_value
-
-    # Execute the query with parameters passed as a dictionary
-    with engine.begin() as connection:
-        connection.execute(insert_query, feedback_data)  # Pass feedback_data as a dictionary
-        print("Feedback inserted successfully.")
-        return True
+    get_feedback_writer().enqueue(feedback_data)
+    return True
 
 
 def create_tables() -> None:
     """
-    Creates necessary tables in the database.
+    Brings the database schema up to date by applying any pending migrations.
     """
     try:
-        create_users_table()
-        create_feedback_table()
+        migrate()
         logger.info("All necessary tables created successfully.")
     except Exception as e:
         logger.error(f"Failed to create tables: {e}")
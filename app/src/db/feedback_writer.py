@@ -0,0 +1,299 @@
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.exc import InterfaceError
+from sqlalchemy.exc import TimeoutError
+from src.config.logging import logger
+from src.utils.metrics import counter
+from src.config.setup import config
+from src.utils.db import get_engine
+from sqlalchemy import text
+from typing import Optional
+from typing import List
+from typing import Dict
+from typing import Any
+import threading
+import atexit
+import glob
+import json
+import time
+import os
+
+
+FEEDBACK_COLUMNS = [
+    'timestamp', 'username', 'query', 'title', 'snippet', 'url', 'feedback', 'is_relevant',
+    'feedback_given_timestamp', 'match_rank', 'unique_hash', 'company', 'report_type', 'country', 'year',
+    'query_mode'
+]
+
+FEEDBACK_ROWS = counter("feedback_rows_total", "Feedback rows, by stage: spooled by the app, flushed to the database, or failed.", ("stage",))
+FEEDBACK_FLUSH_FAILURES = counter("feedback_flush_failures_total", "Feedback batch inserts that failed and were left spooled.")
+
+# Errors reaching the database rather than caused by the rows; the batch is retried later
+TRANSIENT_ERRORS = (OperationalError, InterfaceError, TimeoutError)
+
+
+def build_insert_ignore(dialect_name: str) -> str:
+    """
+    Builds the feedback INSERT statement that silently skips rows whose `unique_hash` already exists.
+
+    Args:
+        dialect_name (str): SQLAlchemy dialect name of the target database.
+
+    Returns:
+        str: The INSERT statement with named parameters.
+    """
+    verb = "INSERT OR IGNORE" if dialect_name == "sqlite" else "INSERT IGNORE"
+    columns = ", ".join(FEEDBACK_COLUMNS)
+    params = ", ".join(f":{column}" for column in FEEDBACK_COLUMNS)
+    return f"{verb} INTO {config.CLOUD_SQL_FEEDBACK_TABLE} ({columns}) VALUES ({params})"
+
+
+class FeedbackWriter:
+    """
+    Write-behind buffer for feedback rows.
+
+    `enqueue` appends the row to a local spool file and returns immediately. A background thread
+    periodically seals the spool into a batch file and inserts its rows with multi-row
+    `INSERT IGNORE` statements, relying on the `unique_hash` constraint to drop duplicates. A batch
+    file is only deleted once its rows are committed, so feedback survives database outages and
+    restarts; leftover batch files are retried on the next flush.
+
+    The app, the API and the worker pool may share the spool directory, so each process only
+    touches files carrying its own pid: `<spool_path>.<pid>` while appending and
+    `<spool_path>.<pid>.<time>.batch` once sealed. Files left by processes that are no longer
+    running are adopted by renaming them to the adopting process's pid; the rename is atomic,
+    so only one process gets each file.
+
+    Rows the database rejects (e.g. a value too long for its column) and lines that do not parse
+    (e.g. torn by a crash mid-append) are moved to `<spool_path>.failed` so they cannot hold back
+    later batches.
+    """
+
+    def __init__(self, spool_path: str, batch_size: int = 100, flush_interval: float = 2.0) -> None:
+        """
+        Args:
+            spool_path (str): Path of the spool file.
+            batch_size (int): Maximum rows per INSERT statement; reaching it triggers an early flush.
+            flush_interval (float): Seconds between flushes.
+        """
+        self.spool_path = spool_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._pending = 0
+        self._thread: Optional[threading.Thread] = None
+        directory = os.path.dirname(spool_path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+
+    def start(self) -> None:
+        """
+        Starts the background flush thread.
+        """
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="feedback-writer", daemon=True)
+            self._thread.start()
+
+    def enqueue(self, row: Dict[str, Any]) -> None:
+        """
+        Durably records a feedback row for a later batched insert.
+
+        Args:
+            row (Dict[str, Any]): Feedback row; missing columns are stored as NULL.
+        """
+        record = {column: row.get(column) for column in FEEDBACK_COLUMNS}
+        line = json.dumps(record, default=str) + "\n"
+        with self._lock:
+            with open(self._own_spool(), 'a') as spool:
+                spool.write(line)
+            self._pending += 1
+            if self._pending >= self.batch_size:
+                self._wakeup.set()
+        FEEDBACK_ROWS.inc(stage="spooled")
+
+    def _own_spool(self) -> str:
+        return f"{self.spool_path}.{os.getpid()}"
+
+    def _new_batch_path(self) -> str:
+        return f"{self.spool_path}.{os.getpid()}.{time.time_ns()}.batch"
+
+    def _seal_spool(self) -> None:
+        """
+        Moves this process's spool aside as a batch file so new rows go to a fresh spool.
+        """
+        with self._lock:
+            if os.path.exists(self._own_spool()):
+                os.replace(self._own_spool(), self._new_batch_path())
+            self._pending = 0
+
+    def _adopt_orphans(self) -> None:
+        """
+        Takes over the spools and batch files of processes that are no longer running, and those
+        written before spools were kept per process (`<spool_path>` and `<spool_path>.<time>.batch`).
+        """
+        for path in glob.glob(f"{glob.escape(self.spool_path)}*"):
+            parts = path[len(self.spool_path):].split(".")[1:]
+            if not parts:
+                orphaned = True
+            elif parts[0].isdigit() and (len(parts) == 1 or parts[-1] == "batch"):
+                # A lone number before "batch" is the time of a batch from before per-process spools
+                owner = int(parts[0]) if len(parts) != 2 else None
+                orphaned = owner is None or (owner != os.getpid() and not _is_running(owner))
+            else:
+                orphaned = False
+            if orphaned:
+                try:
+                    os.replace(path, self._new_batch_path())
+                    logger.info(f"Adopted orphaned feedback spool {path}")
+                except FileNotFoundError:
+                    # Adopted by another process first
+                    pass
+
+    def _insert_rows(self, rows: List[Dict[str, Any]]) -> None:
+        engine = get_engine()
+        statement = text(build_insert_ignore(engine.dialect.name))
+        with engine.begin() as connection:
+            for start in range(0, len(rows), self.batch_size):
+                connection.execute(statement, rows[start:start + self.batch_size])
+
+    def _quarantine(self, lines: List[str], reason: str) -> None:
+        """
+        Appends spool lines that can never be inserted to the `.failed` file for inspection.
+        """
+        with self._lock:
+            with open(f"{self.spool_path}.failed", 'a') as failed:
+                for line in lines:
+                    failed.write(line.rstrip("\n") + "\n")
+        FEEDBACK_ROWS.inc(len(lines), stage="failed")
+        logger.error(f"Moved {len(lines)} feedback rows to {self.spool_path}.failed: {reason}")
+
+    def _read_batch(self, batch_path: str) -> List[Dict[str, Any]]:
+        rows, torn = [], []
+        with open(batch_path, 'r') as batch:
+            for line in batch:
+                if not line.strip():
+                    continue
+                try:
+                    rows.append(json.loads(line))
+                except json.JSONDecodeError:
+                    torn.append(line)
+        if torn:
+            self._quarantine(torn, "unparseable spool lines")
+        return rows
+
+    def _insert_one_by_one(self, rows: List[Dict[str, Any]]) -> int:
+        """
+        Inserts rows individually after a batch was rejected, quarantining the rows at fault.
+
+        Returns:
+            int: Number of rows inserted.
+
+        Raises:
+            SQLAlchemyError: A transient error; the batch stays spooled (inserted rows are ignored as duplicates on retry).
+        """
+        inserted = 0
+        for row in rows:
+            try:
+                self._insert_rows([row])
+                inserted += 1
+            except TRANSIENT_ERRORS:
+                raise
+            except SQLAlchemyError as e:
+                self._quarantine([json.dumps(row, default=str)], str(e))
+        return inserted
+
+    def flush(self) -> int:
+        """
+        Inserts every spooled row into the database.
+
+        Returns:
+            int: Number of rows written (including duplicates ignored by the database).
+        """
+        with self._flush_lock:
+            self._seal_spool()
+            self._adopt_orphans()
+            written = 0
+            for batch_path in sorted(glob.glob(f"{glob.escape(self._own_spool())}.*.batch")):
+                rows = self._read_batch(batch_path)
+                inserted = len(rows)
+                try:
+                    try:
+                        if rows:
+                            self._insert_rows(rows)
+                    except TRANSIENT_ERRORS:
+                        raise
+                    except SQLAlchemyError as e:
+                        logger.warning(f"Feedback batch {batch_path} was rejected, inserting its rows one by one: {e}")
+                        inserted = self._insert_one_by_one(rows)
+                except SQLAlchemyError as e:
+                    FEEDBACK_FLUSH_FAILURES.inc()
+                    logger.error(f"Failed to flush {len(rows)} feedback rows, keeping them spooled in {batch_path}: {e}")
+                    break
+                os.remove(batch_path)
+                written += inserted
+            if written:
+                FEEDBACK_ROWS.inc(written, stage="flushed")
+                logger.info("Flushed %d feedback rows.", written)
+            return written
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Unexpected error while flushing feedback: {e}")
+
+    def close(self) -> None:
+        """
+        Stops the background thread and makes a final flush attempt.
+        """
+        self._stop.set()
+        self._wakeup.set()
+        try:
+            self.flush()
+        except Exception as e:
+            logger.error(f"Final feedback flush failed; rows remain spooled: {e}")
+
+
+def _is_running(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # Running, but owned by another user
+        return True
+    except OverflowError:
+        return False
+    return True
+
+
+_writer: Optional[FeedbackWriter] = None
+_writer_lock = threading.Lock()
+
+
+def get_feedback_writer() -> FeedbackWriter:
+    """
+    Returns the process-wide feedback writer, starting it on first use.
+
+    Returns:
+        FeedbackWriter: The shared writer.
+    """
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                writer = FeedbackWriter(
+                    config.FEEDBACK_SPOOL_PATH,
+                    batch_size=config.FEEDBACK_BATCH_SIZE,
+                    flush_interval=config.FEEDBACK_FLUSH_INTERVAL_SECONDS
+                )
+                writer.start()
+                atexit.register(writer.close)
+                _writer = writer
+    return _writer
@@ -0,0 +1,154 @@
+from sqlalchemy.exc import SQLAlchemyError
+from src.config.logging import logger
+from src.config.setup import config
+from src.utils.db import get_engine
+from sqlalchemy import text
+from typing import Iterator
+from typing import List
+from typing import Dict
+from typing import Any
+import argparse
+import json
+import time
+
+
+ENTITY_URL_COLUMNS = ['entity', 'url', 'country', 'batch_id', 'cloud_storage_uri']
+
+
+def build_upsert(dialect_name: str, keep_batch_id: bool = False) -> str:
+    """
+    Builds the entity_urls upsert statement for the given dialect, keyed on (entity, country).
+
+    Existing rows keep their `cloud_storage_uri` unless the new row sets one. With `keep_batch_id`,
+    existing rows also keep their `batch_id`, so batch IDs assigned by the loader only apply to
+    new rows (or rows without one); otherwise the new row's `batch_id` replaces it.
+
+    Args:
+        dialect_name (str): SQLAlchemy dialect name of the target database.
+        keep_batch_id (bool): Whether existing rows keep their batch ID.
+
+    Returns:
+        str: The upsert statement with named parameters.
+    """
+    table = config.CLOUD_SQL_URLS_TABLE
+    columns = ", ".join(ENTITY_URL_COLUMNS)
+    params = ", ".join(f":{column}" for column in ENTITY_URL_COLUMNS)
+    new = "excluded.{}" if dialect_name == "sqlite" else "VALUES({})"
+    assignments = {
+        'url': new.format('url'),
+        'batch_id': f"COALESCE({table}.batch_id, {new.format('batch_id')})" if keep_batch_id else new.format('batch_id'),
+        'cloud_storage_uri': f"COALESCE({new.format('cloud_storage_uri')}, {table}.cloud_storage_uri)",
+    }
+    assignments = ", ".join(f"{column} = {value}" for column, value in assignments.items())
+    if dialect_name == "sqlite":
+        return f"INSERT INTO {table} ({columns}) VALUES ({params}) ON CONFLICT (entity, country) DO UPDATE SET {assignments}"
+    return f"INSERT INTO {table} ({columns}) VALUES ({params}) ON DUPLICATE KEY UPDATE {assignments}"
+
+
+def read_entities(file_path: str, batch_prefix: str, batch_capacity: int) -> Iterator[Dict[str, Any]]:
+    """
+    Streams entity_urls rows from a JSON lines file.
+
+    Records that carry their own `batch_id` keep it; the rest are assigned to consecutive batches of
+    `batch_capacity` entities named `{batch_prefix}_{n}`, flagged with `batch_id_assigned` so the
+    assignment never replaces an existing row's batch ID.
+
+    Args:
+        file_path (str): Path to the entities JSON lines file.
+        batch_prefix (str): Prefix for assigned batch IDs.
+        batch_capacity (int): Number of entities per assigned batch.
+
+    Yields:
+        Dict[str, Any]: One row per entity.
+    """
+    with open(file_path, 'r') as file:
+        index = 0
+        for line in file:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            yield {
+                'entity': record['entity'],
+                'url': record.get('url'),
+                'country': record.get('country', 'Unknown'),
+                'batch_id': record.get('batch_id') or f"{batch_prefix}_{index // batch_capacity + 1}",
+                'cloud_storage_uri': record.get('cloud_storage_uri'),
+                'batch_id_assigned': not record.get('batch_id'),
+            }
+            index += 1
+
+
+def load_entities(
+    file_path: str,
+    batch_prefix: str = "batch",
+    batch_capacity: int = 1000,
+    statement_rows: int = 1000,
+    transaction_rows: int = 50000
+) -> int:
+    """
+    Upserts entities into the entity_urls table.
+
+    Rows are sent as multi-row statements of `statement_rows` rows, and committed every
+    `transaction_rows` rows so a failure only rolls back the current chunk.
+
+    Args:
+        file_path (str): Path to the entities JSON lines file.
+        batch_prefix (str): Prefix for assigned batch IDs.
+        batch_capacity (int): Number of entities per assigned batch.
+        statement_rows (int): Rows per multi-row INSERT statement.
+        transaction_rows (int): Rows per transaction.
+
+    Returns:
+        int: Number of rows loaded.
+    """
+    engine = get_engine()
+    # Batch IDs are Discovery Engine data store IDs; one assigned by the loader must not replace a real one
+    statements = {
+        assigned: text(build_upsert(engine.dialect.name, keep_batch_id=assigned))
+        for assigned in (False, True)
+    }
+    loaded = 0
+    start = time.perf_counter()
+
+    def commit_chunk(chunk: List[Dict[str, Any]]) -> None:
+        with engine.begin() as connection:
+            for assigned, statement in statements.items():
+                rows = [row for row in chunk if row['batch_id_assigned'] == assigned]
+                for offset in range(0, len(rows), statement_rows):
+                    connection.execute(statement, rows[offset:offset + statement_rows])
+
+    chunk: List[Dict[str, Any]] = []
+    try:
+        for row in read_entities(file_path, batch_prefix, batch_capacity):
+            chunk.append(row)
+            if len(chunk) >= transaction_rows:
+                commit_chunk(chunk)
+                loaded += len(chunk)
+                chunk = []
+                elapsed = time.perf_counter() - start
+                logger.info("Loaded %d entities (%.0f rows/s)", loaded, loaded / elapsed if elapsed else 0)
+        if chunk:
+            commit_chunk(chunk)
+            loaded += len(chunk)
+    except SQLAlchemyError as e:
+        logger.error(f"Entity load failed after {loaded} committed rows: {e}")
+        raise
+
+    elapsed = time.perf_counter() - start
+    logger.info(
+        "Loaded %d entities from %s in %.2f s (%.0f rows/s)",
+        loaded, file_path, elapsed, loaded / elapsed if elapsed else 0
+    )
+    return loaded
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk load entities.jsonl into the entity_urls table.")
+    parser.add_argument("file_path", nargs="?", default=config.ENTITIES_PATH)
+    parser.add_argument("--batch-prefix", default="batch", help="Prefix for batch IDs assigned to records without one.")
+    parser.add_argument("--batch-capacity", type=int, default=1000, help="Entities per assigned batch.")
+    parser.add_argument("--statement-rows", type=int, default=1000, help="Rows per multi-row INSERT.")
+    parser.add_argument("--transaction-rows", type=int, default=50000, help="Rows per committed transaction.")
+    args = parser.parse_args()
+
+    load_entities(args.file_path, args.batch_prefix, args.batch_capacity, args.statement_rows, args.transaction_rows)
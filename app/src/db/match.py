@@ -1,13 +1,10 @@
-from src.utils.db import create_engine_with_connection_pool
+from src.utils.db import get_engine
 from sqlalchemy.exc import SQLAlchemyError
 from src.config.logging import logger
 from src.config.setup import config
 from sqlalchemy import text
 
 
-engine = create_engine_with_connection_pool()
-
-
 def find_entity_url_by_key(entity: str, country: str) -> dict:
     """
     Finds a row in the 'entity_urls' table based on the composite primary key (entity and country).
@@ -25,10 +22,10 @@ def find_entity_url_by_key(entity: str, country: str) -> dict:
     )
 
     try:
-        with engine.connect() as connection:
+        with get_engine().connect() as connection:
             result = connection.execute(select_stmt, {"entity": entity, "country": country}).fetchone()
             if result:
-                logger.info(f"Matching row for {entity} in {country} found.")
+                logger.info("Matching row for %s in %s found.", entity, country)
                 # Map the result to a dictionary using specified keys
                 result_dict = {
                     "entity": result[0],
@@ -40,8 +37,28 @@ def find_entity_url_by_key(entity: str, country: str) -> dict:
                 }
                 return result_dict
             else:
-                logger.info(f"No matching row for {entity} in {country}.")
+                logger.info("No matching row for %s in %s.", entity, country)
                 return None
     except SQLAlchemyError as e:
         logger.error(f"Failed to find entity_url entry: {e}")
-        raise
\ No newline at end of file
+        raise
+
+
+def batch_id_exists(batch_id: str) -> bool:
+    """
+    Checks whether any entity in the 'entity_urls' table uses the given data store.
+
+    Args:
+        batch_id: The data store (batch) ID to look for.
+
+    Returns:
+        True if an entity uses the data store, False otherwise.
+    """
+    select_stmt = text(f"SELECT 1 FROM {config.CLOUD_SQL_URLS_TABLE} WHERE batch_id = :batch_id LIMIT 1")
+
+    try:
+        with get_engine().connect() as connection:
+            return connection.execute(select_stmt, {"batch_id": batch_id}).first() is not None
+    except SQLAlchemyError as e:
+        logger.error(f"Failed to look up batch ID {batch_id}: {e}")
+        raise
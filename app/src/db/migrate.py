@@ -0,0 +1,312 @@
+from sqlalchemy.engine.base import Connection
+from sqlalchemy.engine.base import Engine
+from sqlalchemy.exc import SQLAlchemyError
+from src.config.logging import logger
+from src.config.setup import config
+from src.utils.db import get_engine
+from sqlalchemy import bindparam
+from sqlalchemy import inspect
+from sqlalchemy import text
+from typing import NamedTuple
+from typing import Callable
+from typing import Optional
+from typing import Tuple
+from typing import List
+import unicodedata
+import argparse
+import hashlib
+import re
+
+
+SCHEMA_VERSION_TABLE = "schema_version"
+
+
+class Migration(NamedTuple):
+    """
+    One schema change.
+
+    Attributes:
+        version (int): Position in the migration sequence; applied in ascending order.
+        description (str): Human-readable summary recorded in the schema_version table.
+        apply (Callable[[Connection], None]): Applies the change on an open connection.
+    """
+    version: int
+    description: str
+    apply: Callable[[Connection], None]
+
+
+def _dialect(connection: Connection) -> str:
+    return connection.dialect.name
+
+
+def _create_table(mysql_ddl: str, sqlite_ddl: str) -> Callable[[Connection], None]:
+    """
+    Builds a step that runs the DDL matching the connection's dialect.
+    """
+    def step(connection: Connection) -> None:
+        connection.execute(text(sqlite_ddl if _dialect(connection) == "sqlite" else mysql_ddl))
+    return step
+
+
+def _add_column(table: str, column: str, definition: str) -> Callable[[Connection], None]:
+    """
+    Builds a step that adds a column unless it already exists.
+    """
+    def step(connection: Connection) -> None:
+        if column in {c['name'] for c in inspect(connection).get_columns(table)}:
+            logger.info(f"Column '{table}.{column}' already exists, skipping.")
+            return
+        connection.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {definition}"))
+    return step
+
+
+def _create_indexes(table: str, indexes: List[Tuple[str, Tuple[str, ...]]]) -> Callable[[Connection], None]:
+    """
+    Builds a step that creates each (name, columns) index unless one with that name already exists.
+    """
+    def step(connection: Connection) -> None:
+        existing = {index['name'] for index in inspect(connection).get_indexes(table)}
+        for name, columns in indexes:
+            if name in existing:
+                logger.info(f"Index '{name}' already exists, skipping.")
+                continue
+            connection.execute(text(f"CREATE INDEX {name} ON {table} ({', '.join(columns)})"))
+    return step
+
+
+def _steps(*steps: Callable[[Connection], None]) -> Callable[[Connection], None]:
+    def apply(connection: Connection) -> None:
+        for step in steps:
+            step(connection)
+    return apply
+
+
+USERS = config.CLOUD_SQL_USERS_TABLE
+FEEDBACK = config.CLOUD_SQL_FEEDBACK_TABLE
+ENTITY_URLS = config.CLOUD_SQL_URLS_TABLE
+
+
+REHASH_BATCH_SIZE = 1000
+
+# Frozen copy of src.query.canonical.stable_query_key as of migration 6, so that later changes
+# to it cannot change what this migration computes
+_V6_INNER_PUNCTUATION = re.compile(r"(?<=\w)[.\-/'’&](?=\w)")
+_V6_PUNCTUATION = re.compile(r"[^\w\s]")
+
+
+def _v6_feedback_hash(username: str, query: Optional[str], feedback: Optional[str], vote: str) -> str:
+    text = unicodedata.normalize("NFKC", query or "").casefold()
+    text = _V6_INNER_PUNCTUATION.sub("", text)
+    text = _V6_PUNCTUATION.sub(" ", text)
+    query_key = " ".join(sorted(text.split()))
+    return hashlib.sha256(f"{username}{query_key}{feedback}{vote}".encode('utf-8')).hexdigest()
+
+
+def _rehash_feedback(connection: Connection) -> None:
+    """
+    Recomputes feedback unique hashes from the stable query key instead of the raw query, so a
+    repeat vote is recognized whichever way the stored one was hashed. Rows are read in batches
+    of REHASH_BATCH_SIZE by id; rows that become duplicates of an earlier row get a NULL hash
+    and are kept.
+    """
+    # Cleared first so that no update collides with a hash not yet rewritten
+    connection.execute(text(f"UPDATE {FEEDBACK} SET unique_hash = NULL"))
+    select_batch = text(
+        f"SELECT id, username, query, feedback, is_relevant FROM {FEEDBACK} WHERE id > :last_id ORDER BY id LIMIT :limit"
+    )
+    select_taken = text(f"SELECT unique_hash FROM {FEEDBACK} WHERE unique_hash IN :hashes").bindparams(
+        bindparam('hashes', expanding=True)
+    )
+    last_id, rehashed, duplicates = 0, 0, 0
+    while True:
+        rows = connection.execute(select_batch, {'last_id': last_id, 'limit': REHASH_BATCH_SIZE}).fetchall()
+        if not rows:
+            break
+        last_id = rows[-1][0]
+        # The earliest row with a hash keeps it, in this batch or an earlier one
+        first_ids = {}
+        for row_id, username, query, feedback, vote in rows:
+            first_ids.setdefault(_v6_feedback_hash(username, query, feedback, vote), row_id)
+        taken = {unique_hash for (unique_hash,) in connection.execute(select_taken, {'hashes': list(first_ids)})}
+        updates = [{'id': row_id, 'unique_hash': unique_hash} for unique_hash, row_id in first_ids.items() if unique_hash not in taken]
+        if updates:
+            connection.execute(text(f"UPDATE {FEEDBACK} SET unique_hash = :unique_hash WHERE id = :id"), updates)
+        rehashed += len(updates)
+        duplicates += len(rows) - len(updates)
+    logger.info(f"Rehashed {rehashed} feedback rows; {duplicates} duplicates left without a hash.")
+
+
+# Append new migrations at the end; never edit one that has shipped.
+MIGRATIONS: List[Migration] = [
+    Migration(1, "create users table", _create_table(
+        f"""
+        CREATE TABLE IF NOT EXISTS {USERS} (
+            username VARCHAR(255) NOT NULL,
+            password_hash VARCHAR(255) NOT NULL,
+            first_name VARCHAR(255),
+            last_name VARCHAR(255),
+            team VARCHAR(255),
+            created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (username)
+        )
+        """,
+        f"""
+        CREATE TABLE IF NOT EXISTS {USERS} (
+            username VARCHAR(255) NOT NULL PRIMARY KEY,
+            password_hash VARCHAR(255) NOT NULL,
+            first_name VARCHAR(255),
+            last_name VARCHAR(255),
+            team VARCHAR(255),
+            created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+        """
+    )),
+    Migration(2, "create feedback table", _create_table(
+        f"""
+        CREATE TABLE IF NOT EXISTS {FEEDBACK} (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            timestamp TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            username VARCHAR(255) NOT NULL,
+            query TEXT,
+            title TEXT,
+            snippet TEXT,
+            url VARCHAR(255),
+            feedback TEXT,
+            is_relevant ENUM('Yes', 'No', 'NA'),
+            feedback_given_timestamp TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            match_rank INT,
+            unique_hash VARCHAR(255) UNIQUE,
+            company VARCHAR(255),
+            report_type VARCHAR(255),
+            country VARCHAR(255),
+            year INT,
+            FOREIGN KEY (username) REFERENCES {USERS}(username)
+        )
+        """,
+        f"""
+        CREATE TABLE IF NOT EXISTS {FEEDBACK} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            username VARCHAR(255) NOT NULL REFERENCES {USERS}(username),
+            query TEXT,
+            title TEXT,
+            snippet TEXT,
+            url VARCHAR(255),
+            feedback TEXT,
+            is_relevant VARCHAR(3) CHECK (is_relevant IN ('Yes', 'No', 'NA')),
+            feedback_given_timestamp TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            match_rank INT,
+            unique_hash VARCHAR(255) UNIQUE,
+            company VARCHAR(255),
+            report_type VARCHAR(255),
+            country VARCHAR(255),
+            year INT
+        )
+        """
+    )),
+    Migration(3, "create entity_urls table", _create_table(
+        f"""
+        CREATE TABLE IF NOT EXISTS {ENTITY_URLS} (
+            entity VARCHAR(255) NOT NULL,
+            url VARCHAR(255),
+            country VARCHAR(255) NOT NULL,
+            batch_id VARCHAR(64),
+            created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            cloud_storage_uri VARCHAR(1024),
+            PRIMARY KEY (entity, country)
+        )
+        """,
+        f"""
+        CREATE TABLE IF NOT EXISTS {ENTITY_URLS} (
+            entity VARCHAR(255) NOT NULL,
+            url VARCHAR(255),
+            country VARCHAR(255) NOT NULL,
+            batch_id VARCHAR(64),
+            created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            cloud_storage_uri VARCHAR(1024),
+            PRIMARY KEY (entity, country)
+        )
+        """
+    )),
+    Migration(4, "add feedback query_mode and analytics indexes", _steps(
+        _add_column(FEEDBACK, "query_mode", "VARCHAR(32)"),
+        _create_indexes(FEEDBACK, [
+            ("idx_feedback_company_report_year", ("company", "report_type", "year")),
+            ("idx_feedback_company_url", ("company", "url")),
+            ("idx_feedback_username", ("username",)),
+            ("idx_feedback_query_mode", ("query_mode",)),
+            ("idx_feedback_timestamp", ("timestamp",)),
+        ]),
+    )),
+    Migration(5, "index entity_urls by batch", _create_indexes(ENTITY_URLS, [
+        ("idx_entity_urls_batch_id", ("batch_id",)),
+    ])),
+    Migration(6, "rehash feedback on the stable query key", _rehash_feedback),
+]
+
+
+def _ensure_version_table(engine: Engine) -> None:
+    with engine.begin() as connection:
+        connection.execute(text(f"""
+            CREATE TABLE IF NOT EXISTS {SCHEMA_VERSION_TABLE} (
+                version INT NOT NULL PRIMARY KEY,
+                description VARCHAR(255) NOT NULL,
+                applied_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+            )
+        """))
+
+
+def current_version(engine: Optional[Engine] = None) -> int:
+    """
+    Returns the highest applied migration version, or 0 for an empty database.
+    """
+    engine = engine or get_engine()
+    _ensure_version_table(engine)
+    with engine.connect() as connection:
+        version = connection.execute(text(f"SELECT MAX(version) FROM {SCHEMA_VERSION_TABLE}")).scalar()
+    return version or 0
+
+
+def migrate(engine: Optional[Engine] = None, target: Optional[int] = None) -> int:
+    """
+    Applies pending migrations in order, recording each in the schema_version table.
+    Running it again is a no-op once the schema is current.
+
+    Args:
+        engine (Optional[Engine]): Database to migrate. Defaults to the configured database.
+        target (Optional[int]): Stop after this version. Defaults to the latest.
+
+    Returns:
+        int: The schema version after migrating.
+    """
+    engine = engine or get_engine()
+    version = current_version(engine)
+    for migration in MIGRATIONS:
+        if migration.version <= version or (target is not None and migration.version > target):
+            continue
+        logger.info(f"Applying migration {migration.version}: {migration.description}")
+        try:
+            with engine.begin() as connection:
+                migration.apply(connection)
+                connection.execute(
+                    text(f"INSERT INTO {SCHEMA_VERSION_TABLE} (version, description) VALUES (:version, :description)"),
+                    {'version': migration.version, 'description': migration.description}
+                )
+        except SQLAlchemyError as e:
+            logger.error(f"Migration {migration.version} failed: {e}")
+            raise
+        version = migration.version
+    logger.info(f"Database schema is at version {version}.")
+    return version
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Apply database schema migrations.")
+    parser.add_argument("--target", type=int, help="Migrate up to this version only.")
+    parser.add_argument("--status", action="store_true", help="Print the current version and exit.")
+    args = parser.parse_args()
+
+    if args.status:
+        logger.info(f"Current schema version: {current_version()} (latest: {MIGRATIONS[-1].version})")
+    else:
+        migrate(target=args.target)
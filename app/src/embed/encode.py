@@ -1,8 +1,9 @@
 from langchain_community.document_loaders import JSONLoader
-from langchain_google_vertexai import VertexAIEmbeddings
+from src.embed.providers import get_embedding_provider
 from langchain_community.vectorstores import FAISS
+from langchain_core.embeddings import Embeddings
 from src.config.logging import logger
-from src.config.setup import config
+from typing import Optional
 from typing import Dict
 
 
@@ -22,12 +23,13 @@ def extract_metadata(record: Dict[str, any], metadata: Dict[str, str]) -> Dict[s
     return metadata
 
 
-def load_and_index(file_path: str) -> FAISS:
+def load_and_index(file_path: str, text_embedder: Optional[Embeddings] = None) -> FAISS:
     """
-    Loads data from a JSON lines file, indexes it using VertexAI for embeddings, and creates a FAISS vector store.
+    Loads data from a JSON lines file, indexes it using the configured embedding provider, and creates a FAISS vector store.
 
     Parameters:
         file_path (str): The path to the JSON lines file containing the data to be indexed.
+        text_embedder (Optional[Embeddings]): Embeddings to index with. Defaults to the configured provider's embeddings.
 
     Returns:
         FAISS: A FAISS vector store object containing the indexed data.
@@ -45,18 +47,19 @@ def load_and_index(file_path: str) -> FAISS:
     entities = loader.load()
     logger.info("Data loaded successfully")
 
-    logger.info("Initializing text embedder with model name from configuration")
-    text_embedder = VertexAIEmbeddings(model_name=config.TEXT_EMBED_MODEL_NAME)
-    text_embedder.instance['batch_size'] = 100  # Batch size for embedding processing
-    logger.info("Text embedder initialized with configuration: %s", text_embedder.instance)
+    if text_embedder is None:
+        provider = get_embedding_provider()
+        logger.info("Initializing text embedder from provider '%s'", provider.name)
+        text_embedder = provider.create_embeddings()
 
     logger.info("Creating FAISS vector store from loaded data")
-    vector_store = FAISS.from_documents(documents=entities, embedder=text_embedder)
+    vector_store = FAISS.from_documents(documents=entities, embedding=text_embedder)
     logger.info("FAISS vector store created successfully")
 
     return vector_store
 
 if __name__ == "__main__":
+    index_path = get_embedding_provider().index_path
     vector_store = load_and_index("./data/entities.jsonl")
-    vector_store.save_local("./data/faiss_index/")
-    logger.info("FAISS vector store saved locally to './data/faiss_index/'")
\ No newline at end of file
+    vector_store.save_local(index_path)
+    logger.info(f"FAISS vector store saved locally to '{index_path}'")
\ No newline at end of file
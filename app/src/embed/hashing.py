@@ -0,0 +1,53 @@
+from langchain_core.embeddings import Embeddings
+from typing import List
+import hashlib
+import math
+
+
+class HashingEmbeddings(Embeddings):
+    """
+    Deterministic, network-free embeddings built by hashing word and character n-gram
+    features into a fixed-size vector. Similar strings share features and therefore land
+    close together, which is enough for entity name resolution in tests and load tests.
+    """
+
+    def __init__(self, dimension: int = 768, ngram_size: int = 3) -> None:
+        """
+        Args:
+            dimension (int): Size of the output vectors.
+            ngram_size (int): Length of the character n-grams used as features.
+        """
+        self.dimension = dimension
+        self.ngram_size = ngram_size
+
+    def _features(self, text: str) -> List[str]:
+        normalized = " ".join(text.lower().split())
+        features = normalized.split()
+        padded = f" {normalized} "
+        features.extend(padded[i:i + self.ngram_size] for i in range(max(len(padded) - self.ngram_size + 1, 0)))
+        return features
+
+    def _embed(self, text: str) -> List[float]:
+        vector = [0.0] * self.dimension
+        for feature in self._features(text):
+            digest = hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest()
+            value = int.from_bytes(digest, 'little')
+            index = value % self.dimension
+            sign = 1.0 if (value >> 63) & 1 else -1.0
+            vector[index] += sign
+        norm = math.sqrt(sum(v * v for v in vector))
+        if norm:
+            vector = [v / norm for v in vector]
+        return vector
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embeds a list of documents.
+        """
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        """
+        Embeds a single query.
+        """
+        return self._embed(text)
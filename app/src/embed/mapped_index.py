@@ -0,0 +1,91 @@
+from src.config.logging import logger
+from typing import Tuple
+import numpy as np
+import json
+import os
+
+
+VECTORS_FILE = "vectors.f32"
+VECTORS_META_FILE = "vectors.json"
+
+
+def export_vectors(index_path: str) -> None:
+    """
+    Writes the vectors of a flat FAISS index as a raw float32 matrix next to it, with its shape and
+    metric in a JSON sidecar. The files are replaced atomically, so processes starting together can
+    all call this safely. Does nothing if the export is newer than the index.
+
+    Args:
+        index_path (str): Directory holding `index.faiss`.
+    """
+    import faiss
+
+    index_file = os.path.join(index_path, "index.faiss")
+    vectors_file = os.path.join(index_path, VECTORS_FILE)
+    meta_file = os.path.join(index_path, VECTORS_META_FILE)
+    if os.path.exists(meta_file) and os.path.getmtime(meta_file) >= os.path.getmtime(index_file):
+        return
+
+    index = faiss.read_index(index_file)
+    if not isinstance(index, faiss.IndexFlat):
+        raise ValueError(f"Only flat FAISS indexes can be mapped, not {type(index).__name__}")
+    vectors = faiss.rev_swig_ptr(index.get_xb(), index.ntotal * index.d).reshape(index.ntotal, index.d)
+    metric = "ip" if index.metric_type == faiss.METRIC_INNER_PRODUCT else "l2"
+
+    suffix = f".{os.getpid()}.tmp"
+    vectors.astype(np.float32, copy=False).tofile(vectors_file + suffix)
+    os.replace(vectors_file + suffix, vectors_file)
+    with open(meta_file + suffix, "w") as file:
+        json.dump({"ntotal": int(index.ntotal), "d": int(index.d), "metric": metric}, file)
+    os.replace(meta_file + suffix, meta_file)
+    logger.info(f"Exported {index.ntotal} vectors from {index_file} for memory mapping")
+
+
+class MappedFlatIndex:
+    """
+    Read-only exact search over vectors memory-mapped from a file written by `export_vectors`.
+
+    The matrix is never copied into the process: searches read it through the mapping, so every
+    process using the same file shares one set of pages in the OS page cache. Only the squared
+    norms (one float per vector) are private. Implements the part of the FAISS index interface
+    that LangChain's FAISS vector store uses for searching.
+
+    Attributes:
+        ntotal (int): Number of vectors.
+        d (int): Vector dimension.
+        metric (str): 'l2' (squared Euclidean distance, lower is closer) or 'ip' (inner product, higher is closer).
+    """
+
+    def __init__(self, index_path: str) -> None:
+        with open(os.path.join(index_path, VECTORS_META_FILE)) as file:
+            meta = json.load(file)
+        self.ntotal = meta["ntotal"]
+        self.d = meta["d"]
+        self.metric = meta["metric"]
+        self.vectors = np.memmap(os.path.join(index_path, VECTORS_FILE), dtype=np.float32, mode="r", shape=(self.ntotal, self.d))
+        self._norms = np.einsum("ij,ij->i", self.vectors, self.vectors) if self.metric == "l2" else None
+
+    def search(self, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the `k` nearest vectors for each query, as FAISS does: distances and positions of
+        shape (n, k), padded with -1 positions when there are fewer than `k` vectors.
+        """
+        queries = np.asarray(queries, dtype=np.float32).reshape(-1, self.d)
+        distances = np.full((len(queries), k), np.inf if self.metric == "l2" else -np.inf, dtype=np.float32)
+        positions = np.full((len(queries), k), -1, dtype=np.int64)
+        found = min(k, self.ntotal)
+        if found == 0:
+            return distances, positions
+
+        products = queries @ self.vectors.T
+        if self.metric == "l2":
+            scores = self._norms[None, :] - 2 * products + np.einsum("ij,ij->i", queries, queries)[:, None]
+        else:
+            # Negated so that lower is closer for both metrics below
+            scores = -products
+        for row, row_scores in enumerate(scores):
+            nearest = np.argpartition(row_scores, found - 1)[:found]
+            nearest = nearest[np.argsort(row_scores[nearest])]
+            positions[row, :found] = nearest
+            distances[row, :found] = row_scores[nearest] if self.metric == "l2" else -row_scores[nearest]
+        return distances, positions
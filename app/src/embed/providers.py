@@ -0,0 +1,144 @@
+from src.config.logging import logger
+from src.config.setup import config
+from typing import TYPE_CHECKING
+from abc import abstractmethod
+from abc import ABC
+from typing import Optional
+import threading
+import pickle
+import os
+
+if TYPE_CHECKING:
+    from langchain_community.vectorstores import FAISS
+    from langchain_core.embeddings import Embeddings
+
+
+class EmbeddingProvider(ABC):
+    """
+    Interface for text embedding backends.
+
+    Attributes:
+        name (str): Provider name as used in the configuration.
+        index_path (str): Directory of the FAISS index built with this provider's embeddings.
+    """
+
+    name = ""
+    index_path = ""
+
+    @abstractmethod
+    def create_embeddings(self) -> 'Embeddings':
+        ...
+
+
+class VertexEmbeddingProvider(EmbeddingProvider):
+    """
+    Embeddings served by Vertex AI.
+    """
+
+    name = "vertex"
+    index_path = "./data/faiss_index"
+
+    def create_embeddings(self) -> 'Embeddings':
+        from langchain_google_vertexai import VertexAIEmbeddings
+
+        embeddings = VertexAIEmbeddings(model_name=config.TEXT_EMBED_MODEL_NAME)
+        embeddings.instance['batch_size'] = 100  # Batch size for embedding processing
+        return embeddings
+
+
+class LocalEmbeddingProvider(EmbeddingProvider):
+    """
+    Deterministic hashing embeddings that run without network access.
+    """
+
+    name = "local"
+    index_path = "./data/faiss_index_local"
+
+    def create_embeddings(self) -> 'Embeddings':
+        from src.embed.hashing import HashingEmbeddings
+
+        return HashingEmbeddings(dimension=config.LOCAL_EMBEDDING_DIMENSION)
+
+
+# The configured provider's index is loaded on first use and shared afterwards
+_vector_store: Optional['FAISS'] = None
+_vector_store_lock = threading.Lock()
+
+
+PROVIDERS = {
+    VertexEmbeddingProvider.name: VertexEmbeddingProvider,
+    LocalEmbeddingProvider.name: LocalEmbeddingProvider,
+}
+
+
+def get_embedding_provider() -> EmbeddingProvider:
+    """
+    Returns the embedding provider selected by the `model_provider` configuration key.
+
+    Returns:
+        EmbeddingProvider: The configured provider.
+
+    Raises:
+        ValueError: If the configured provider is unknown.
+    """
+    provider_cls = PROVIDERS.get(config.MODEL_PROVIDER)
+    if provider_cls is None:
+        logger.error(f"Unknown model provider: {config.MODEL_PROVIDER}")
+        raise ValueError(f"Unknown model provider: {config.MODEL_PROVIDER}")
+    return provider_cls()
+
+
+def load_vector_store(provider: Optional[EmbeddingProvider] = None, mmap: bool = False) -> 'FAISS':
+    """
+    Loads the FAISS index matching the provider's embeddings. The local provider's index is
+    built from the entities file and saved on first use, since it needs no network access.
+
+    Args:
+        provider (EmbeddingProvider): Provider to load the index for. Defaults to the configured provider.
+        mmap (bool): Search the index's vectors through a read-only memory mapping of a raw copy
+            exported next to the index, so processes loading the same index share one copy of the
+            vectors in the OS page cache. The docstore (names and metadata only) is still loaded
+            per process.
+
+    Returns:
+        FAISS: The loaded vector store.
+    """
+    from langchain_community.vectorstores import FAISS
+
+    provider = provider or get_embedding_provider()
+    embeddings = provider.create_embeddings()
+    if isinstance(provider, LocalEmbeddingProvider) and not os.path.exists(os.path.join(provider.index_path, "index.faiss")):
+        from src.embed.encode import load_and_index
+
+        logger.info(f"Building local FAISS index at {provider.index_path}")
+        vector_store = load_and_index(config.ENTITIES_PATH, embeddings)
+        vector_store.save_local(provider.index_path)
+        return vector_store
+    if not mmap:
+        return FAISS.load_local(provider.index_path, embeddings, allow_dangerous_deserialization=True)
+
+    # faiss copies flat indexes into memory even with IO_FLAG_MMAP, so search a mapped export instead
+    from src.embed.mapped_index import MappedFlatIndex
+    from src.embed.mapped_index import export_vectors
+
+    export_vectors(provider.index_path)
+    index = MappedFlatIndex(provider.index_path)
+    with open(os.path.join(provider.index_path, "index.pkl"), "rb") as file:
+        docstore, index_to_docstore_id = pickle.load(file)
+    logger.info(f"Memory-mapped {index.ntotal} FAISS vectors at {provider.index_path}")
+    return FAISS(embeddings, index, docstore, index_to_docstore_id)
+
+
+def get_vector_store() -> 'FAISS':
+    """
+    Returns the configured provider's vector store, loading it on first use.
+
+    Returns:
+        FAISS: The shared vector store.
+    """
+    global _vector_store
+    if _vector_store is None:
+        with _vector_store_lock:
+            if _vector_store is None:
+                _vector_store = load_vector_store(mmap=config.FAISS_MMAP)
+    return _vector_store
@@ -1,19 +1,13 @@
-from langchain_google_vertexai import VertexAIEmbeddings
-from langchain_community.vectorstores import FAISS
+from src.embed.providers import load_vector_store
 from src.embed.match import match_by_country
 from src.config.logging import logger
-from src.config.setup import config
 from typing import List
 from tqdm import tqdm
 import json
 
 
-# Setup the text embedder
-text_embedder = VertexAIEmbeddings(model_name=config.TEXT_EMBED_MODEL_NAME)
-text_embedder.instance['batch_size'] = 100
-
-# Load the vector store
-vector_store = FAISS.load_local("./data/faiss_index/", text_embedder, allow_dangerous_deserialization=True)
+# Load the vector store for the configured embedding provider
+vector_store = load_vector_store()
 retriever = vector_store.as_retriever(search_type='similarity', search_kwargs={'k': 1})
 
 
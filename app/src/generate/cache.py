@@ -0,0 +1,206 @@
+from collections import OrderedDict
+from abc import abstractmethod
+from abc import ABC
+from src.config.logging import logger
+from src.config.setup import config
+from typing import Optional
+from typing import Tuple
+import threading
+import hashlib
+import sqlite3
+import json
+import time
+import os
+
+
+def make_cache_key(model_name: str, temperature: float, task: str, query: str) -> str:
+    """
+    Builds a stable cache key for an LLM prompt.
+
+    Args:
+        model_name (str): Name of the generation model.
+        temperature (float): Sampling temperature used for the call.
+        task (str): The task prompt.
+        query (str): The user query.
+
+    Returns:
+        str: A SHA-256 hex digest identifying the prompt.
+    """
+    payload = json.dumps([model_name, temperature, task, query], ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ResponseCache(ABC):
+    """
+    Interface for LLM response caches. Implementations must be thread-safe.
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[str]:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value: str) -> None:
+        ...
+
+    @abstractmethod
+    def clear(self) -> None:
+        ...
+
+
+class MemoryCache(ResponseCache):
+    """
+    In-process LRU cache with a per-entry time-to-live.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: Optional[float] = None) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, value = entry
+            if self.ttl_seconds is not None and time.time() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str, stored_at: Optional[float] = None) -> None:
+        """
+        Stores a value. `stored_at` (default now) is when it was first cached, from which its
+        time-to-live counts.
+        """
+        with self._lock:
+            self._entries[key] = (time.time() if stored_at is None else stored_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class DiskCache(ResponseCache):
+    """
+    SQLite-backed cache that survives restarts. Entries beyond `max_entries` are evicted
+    least-recently-used first.
+    """
+
+    def __init__(self, path: str, max_entries: int = 10000, ttl_seconds: Optional[float] = None) -> None:
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, stored_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._connection.execute("CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)")
+
+    def get(self, key: str) -> Optional[str]:
+        entry = self.get_entry(key)
+        return entry[1] if entry is not None else None
+
+    def get_entry(self, key: str) -> Optional[Tuple[float, str]]:
+        """
+        Returns when a live entry was stored and its value, or None if there is none.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value, stored_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, stored_at = row
+            with self._connection:
+                if self.ttl_seconds is not None and now - stored_at > self.ttl_seconds:
+                    self._connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    return None
+                self._connection.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            return stored_at, value
+
+    def set(self, key: str, value: str) -> None:
+        now = time.time()
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses (key, value, stored_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, value, now, now)
+            )
+            self._connection.execute(
+                "DELETE FROM responses WHERE key IN ("
+                "SELECT key FROM responses ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+
+    def clear(self) -> None:
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM responses")
+
+
+class TieredCache(ResponseCache):
+    """
+    Memory tier in front of a disk tier. Disk hits are promoted into memory with the time they
+    were stored on disk, so promotion does not extend their time-to-live.
+    """
+
+    def __init__(self, memory: MemoryCache, disk: DiskCache) -> None:
+        self.memory = memory
+        self.disk = disk
+
+    def get(self, key: str) -> Optional[str]:
+        value = self.memory.get(key)
+        if value is not None:
+            return value
+        entry = self.disk.get_entry(key)
+        if entry is None:
+            return None
+        stored_at, value = entry
+        self.memory.set(key, value, stored_at=stored_at)
+        return value
+
+    def set(self, key: str, value: str) -> None:
+        self.memory.set(key, value)
+        self.disk.set(key, value)
+
+    def clear(self) -> None:
+        self.memory.clear()
+        self.disk.clear()
+
+
+def build_response_cache() -> Optional[ResponseCache]:
+    """
+    Builds the response cache described by the configuration.
+
+    Returns:
+        Optional[ResponseCache]: The configured cache, or None if caching is disabled.
+    """
+    if not config.LLM_CACHE_ENABLED:
+        return None
+
+    memory = MemoryCache(max_entries=config.LLM_CACHE_MAX_ENTRIES, ttl_seconds=config.LLM_CACHE_TTL_SECONDS)
+    if not config.LLM_CACHE_PATH:
+        return memory
+
+    try:
+        disk = DiskCache(
+            config.LLM_CACHE_PATH,
+            max_entries=config.LLM_CACHE_DISK_MAX_ENTRIES,
+            ttl_seconds=config.LLM_CACHE_TTL_SECONDS
+        )
+        return TieredCache(memory, disk)
+    except (sqlite3.Error, OSError) as e:
+        logger.error(f"Failed to open on-disk LLM cache at {config.LLM_CACHE_PATH}, using memory only: {e}")
+        return memory
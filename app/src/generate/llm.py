@@ -1,62 +1,242 @@
-from langchain.prompts.chat import HumanMessagePromptTemplate, ChatPromptTemplate
-from langchain_google_vertexai import ChatVertexAI
+from src.generate.providers import get_chat_provider
+from src.generate.cache import build_response_cache
+from src.generate.cache import make_cache_key
+from src.generate.cache import ResponseCache
+from src.utils.coalesce import SingleFlight
+from src.utils.metrics import call_outcome
+from src.utils.metrics import histogram
+from src.utils.metrics import counter
+from src.utils.lazy import lazy_import
 from src.config.logging import logger
 from src.config.setup import config
+from functools import lru_cache
 from typing import Optional
+from typing import TYPE_CHECKING
+from typing import List
+import threading
+import time
+
+if TYPE_CHECKING:
+    from langchain_core.language_models.chat_models import BaseChatModel
+    from langchain.prompts.chat import ChatPromptTemplate
+
+
+TEMPERATURE = 0.1
+
+HUMAN_TEMPLATE = "{task}\nQuery:\n{query}"
+
+prompts = lazy_import("langchain.prompts.chat")
+
+_predict_flight = SingleFlight("llm_predict")
+
+LLM_CALLS = counter("llm_calls_total", "Chat model requests, by call type and outcome.", ("call", "outcome"))
+LLM_CALL_SECONDS = histogram("llm_call_seconds", "Chat model request latency, by call type.", ("call",))
+LLM_CACHE_LOOKUPS = counter("llm_cache_lookups_total", "LLM response cache lookups, by result.", ("result",))
+
+
+def _model_id() -> str:
+    """
+    Identifies the model for cache keys, so responses from different providers never mix.
+    """
+    return f"{config.MODEL_PROVIDER}/{config.TEXT_GEN_MODEL_NAME}"
+
+
+@lru_cache(maxsize=1)
+def _chat_template() -> 'ChatPromptTemplate':
+    """
+    Returns the chat prompt template shared by all tasks, compiled on first use.
+    """
+    return prompts.ChatPromptTemplate.from_messages([prompts.HumanMessagePromptTemplate.from_template(HUMAN_TEMPLATE)])
+
+
+@lru_cache(maxsize=128)
+def _task_template(task: str) -> 'ChatPromptTemplate':
+    """
+    Returns the chat prompt template with the task already bound, compiled once per task.
+    """
+    return _chat_template().partial(task=task)
+
 
 class LLM:
     """
-    A class representing a Language Model using Vertex AI.
+    A class representing a Language Model served by the configured chat provider (Vertex AI by default).
+
+    The underlying chat model is shared by all instances and created on first use.
 
     Attributes:
-        model (ChatVertexAI): The chat model loaded from Vertex AI.
+        cache (Optional[ResponseCache]): Cache of previous responses, or None if caching is disabled.
     """
 
-    def __init__(self) -> None:
+    _shared_model: Optional['BaseChatModel'] = None
+    _model_lock = threading.Lock()
+
+    def __init__(self, cache: Optional[ResponseCache] = None) -> None:
         """
-        Initializes the LLM class by loading the chat model.
+        Initializes the LLM class.
+
+        Args:
+            cache (Optional[ResponseCache]): Response cache to use. Defaults to the one described by the configuration.
         """
-        self.model = self._initialize_model()
+        self.cache = cache if cache is not None else build_response_cache()
 
-    def _initialize_model(self) -> Optional[ChatVertexAI]:
+    @property
+    def model(self) -> Optional['BaseChatModel']:
+        """
+        The shared chat model, loaded on first access.
         """
-        Loads the chat model from Vertex AI.
+        if LLM._shared_model is None:
+            with LLM._model_lock:
+                if LLM._shared_model is None:
+                    LLM._shared_model = self._initialize_model()
+        return LLM._shared_model
+
+    def _initialize_model(self) -> Optional['BaseChatModel']:
+        """
+        Loads the chat model from the configured provider.
 
         Returns:
-            ChatVertexAI: An instance of the Vertex AI chat model.
+            BaseChatModel: An instance of the provider's chat model.
         """
         try:
-            model = ChatVertexAI(
+            model = get_chat_provider().create_chat_model(
                 model_name=config.TEXT_GEN_MODEL_NAME,
-                temperature=0.1,
-                max_output_tokens=1024,
-                verbose=True
+                temperature=TEMPERATURE,
+                max_output_tokens=1024
             )
-            logger.info("Chat model loaded successfully.")
+            logger.info("Chat model loaded successfully from provider '%s'.", config.MODEL_PROVIDER)
             return model
         except Exception as e:
             logger.error(f"Failed to load the model: {e}")
             return None
 
-    def predict(self, task: str, query: str) -> Optional[str]:
+    def predict(self, task: str, query: str, use_cache: bool = True) -> Optional[str]:
         """
         Generates a response for a given task and query using the chat model.
 
         Args:
             task (str): The task to be performed by the model.
             query (str): The query or input text for the model.
+            use_cache (bool): Whether to read and write the response cache for this call.
 
         Returns:
             Optional[str]: The model's response or None if an error occurred.
         """
+        key = make_cache_key(_model_id(), TEMPERATURE, task, query)
+        if use_cache and self.cache is not None:
+            cached = self.cache.get(key)
+            LLM_CACHE_LOOKUPS.inc(result="hit" if cached is not None else "miss")
+            if cached is not None:
+                logger.info("LLM cache hit for task: %.60s", task)
+                return cached
+
+        completion = _predict_flight.do(key, self._predict, task, query)
+        if use_cache and self.cache is not None and completion is not None:
+            self.cache.set(key, completion)
+        return completion
+
+    def predict_many(
+        self, tasks: List[str], query: str, use_cache: bool = True, cache_text: Optional[str] = None
+    ) -> List[Optional[str]]:
+        """
+        Generates responses for several tasks over the same query, sending all uncached
+        prompts to the model in a single batch.
+
+        Args:
+            tasks (List[str]): The tasks to be performed by the model.
+            query (str): The query or input text for the model.
+            use_cache (bool): Whether to read and write the response cache for this call.
+            cache_text (Optional[str]): Stands in for `query` in cache and coalescing keys, so that
+                queries that are the same prompt (e.g. differing only in spacing) share responses.
+
+        Returns:
+            List[Optional[str]]: One response per task, in order; None where an error occurred.
+        """
+        key_text = query if cache_text is None else cache_text
+        keys = [make_cache_key(_model_id(), TEMPERATURE, task, key_text) for task in tasks]
+        completions: List[Optional[str]] = [None] * len(tasks)
+        pending = []
+        for i, key in enumerate(keys):
+            cached = None
+            if use_cache and self.cache is not None:
+                cached = self.cache.get(key)
+                LLM_CACHE_LOOKUPS.inc(result="hit" if cached is not None else "miss")
+            if cached is not None:
+                completions[i] = cached
+            else:
+                pending.append(i)
+
+        if not pending:
+            logger.info("LLM cache hit for all %d tasks.", len(tasks))
+            return completions
+
+        pending_tasks = [tasks[i] for i in pending]
+        batch_key = tuple(keys[i] for i in pending)
+        responses = _predict_flight.do(batch_key, self._predict_batch, pending_tasks, query)
+        for i, completion in zip(pending, responses):
+            completions[i] = completion
+            if use_cache and self.cache is not None and completion is not None:
+                self.cache.set(keys[i], completion)
+        return completions
+
+    def _predict(self, task: str, query: str) -> Optional[str]:
+        """
+        Calls the chat model for a task and query.
+        """
+        start = time.perf_counter()
+        error = None
         try:
-            human_template = "{task}\nQuery:\n{query}"
-            human_message = HumanMessagePromptTemplate.from_template(human_template)
-            chat_template = ChatPromptTemplate.from_messages([human_message])
-            prompt = chat_template.format_prompt(task=task, query=query).to_messages()
-            response = self.model(prompt)
+            prompt = _task_template(task).format_prompt(query=query).to_messages()
+            response = self.model.invoke(prompt)
             completion = response.content
             return completion
         except Exception as e:
+            error = e
             logger.error(f"Error during model prediction: {e}")
-            return None
\ No newline at end of file
+            return None
+        finally:
+            LLM_CALL_SECONDS.observe(time.perf_counter() - start, call="single")
+            LLM_CALLS.inc(call="single", outcome=call_outcome(error))
+
+    def _predict_batch(self, tasks: List[str], query: str) -> List[Optional[str]]:
+        """
+        Calls the chat model's batch API for several tasks over one query.
+        """
+        start = time.perf_counter()
+        try:
+            prompts = [_task_template(task).format_prompt(query=query).to_messages() for task in tasks]
+            responses = self.model.batch(prompts, return_exceptions=True)
+        except Exception as e:
+            LLM_CALLS.inc(len(tasks), call="batch", outcome=call_outcome(e))
+            logger.error(f"Error during batched model prediction: {e}")
+            return [None] * len(tasks)
+        finally:
+            LLM_CALL_SECONDS.observe(time.perf_counter() - start, call="batch")
+
+        completions = []
+        for task, response in zip(tasks, responses):
+            LLM_CALLS.inc(call="batch", outcome=call_outcome(response if isinstance(response, Exception) else None))
+            if isinstance(response, Exception):
+                logger.error(f"Error during model prediction for task '{task[:60]}': {response}")
+                completions.append(None)
+            else:
+                completions.append(response.content)
+        return completions
+
+
+_llm: Optional[LLM] = None
+_llm_lock = threading.Lock()
+
+
+def get_llm() -> LLM:
+    """
+    Returns the process-wide LLM instance, creating it on first use.
+
+    Returns:
+        LLM: The shared LLM instance.
+    """
+    global _llm
+    if _llm is None:
+        with _llm_lock:
+            if _llm is None:
+                _llm = LLM()
+    return _llm
@@ -0,0 +1,82 @@
+from src.config.logging import logger
+from src.config.setup import config
+from typing import TYPE_CHECKING
+from abc import abstractmethod
+from abc import ABC
+
+if TYPE_CHECKING:
+    from langchain_core.language_models.chat_models import BaseChatModel
+
+
+class ChatProvider(ABC):
+    """
+    Interface for chat model backends.
+
+    Attributes:
+        name (str): Provider name as used in the configuration.
+    """
+
+    name = ""
+
+    @abstractmethod
+    def create_chat_model(self, model_name: str, temperature: float, max_output_tokens: int) -> 'BaseChatModel':
+        ...
+
+
+class VertexChatProvider(ChatProvider):
+    """
+    Chat models served by Vertex AI.
+    """
+
+    name = "vertex"
+
+    def create_chat_model(self, model_name: str, temperature: float, max_output_tokens: int) -> 'BaseChatModel':
+        from langchain_google_vertexai import ChatVertexAI
+
+        return ChatVertexAI(
+            model_name=model_name,
+            temperature=temperature,
+            max_output_tokens=max_output_tokens,
+            verbose=True
+        )
+
+
+class LocalChatProvider(ChatProvider):
+    """
+    Rule-based and recorded chat responses that run without network access.
+    """
+
+    name = "local"
+
+    def create_chat_model(self, model_name: str, temperature: float, max_output_tokens: int) -> 'BaseChatModel':
+        from src.generate.local_chat import LocalChatModel
+        from src.generate.local_chat import load_recordings
+        from src.generate.local_chat import load_countries
+
+        return LocalChatModel(
+            recordings=load_recordings(config.LOCAL_CHAT_RECORDINGS_PATH),
+            countries=load_countries(config.ENTITIES_PATH)
+        )
+
+
+PROVIDERS = {
+    VertexChatProvider.name: VertexChatProvider,
+    LocalChatProvider.name: LocalChatProvider,
+}
+
+
+def get_chat_provider() -> ChatProvider:
+    """
+    Returns the chat provider selected by the `model_provider` configuration key.
+
+    Returns:
+        ChatProvider: The configured provider.
+
+    Raises:
+        ValueError: If the configured provider is unknown.
+    """
+    provider_cls = PROVIDERS.get(config.MODEL_PROVIDER)
+    if provider_cls is None:
+        logger.error(f"Unknown model provider: {config.MODEL_PROVIDER}")
+        raise ValueError(f"Unknown model provider: {config.MODEL_PROVIDER}")
+    return provider_cls()
@@ -0,0 +1,240 @@
+from src.config.logging import logger
+from src.config.setup import config
+from typing import Optional
+from typing import List
+from typing import Dict
+import unicodedata
+import threading
+import json
+import re
+
+
+# Corporate suffixes dropped to derive short aliases ("Commerzbank AG" -> "commerzbank")
+LEGAL_SUFFIXES = {
+    'inc', 'incorporated', 'ltd', 'limited', 'corp', 'corporation', 'co', 'company', 'sa', 'plc', 'ag',
+    'ab', 'spa', 'nv', 'se', 'as', 'oyj', 'tbk', 'asa', 'bhd', 'pcl', 'llc', 'cv', 'lp', 'dd', 'kgaa',
+    'sas', 'bv', 'gmbh', 'hf', 'sca', 'sl', 'saa', 'pt',
+}
+
+# Single words too generic to stand for one company on their own
+GENERIC_WORDS = {
+    'bank', 'group', 'holding', 'holdings', 'international', 'capital', 'trust', 'the', 'financial',
+    'annual', 'report', 'quarterly', 'interim', 'sustainability',
+}
+
+# Report-type spellings rewritten to one vocabulary, matched as whole phrases
+REPORT_TYPE_SYNONYMS = {
+    'rpt': 'report',
+    'rept': 'report',
+    'reports': 'report',
+    'yearly': 'annual',
+    'qtrly': 'quarterly',
+    '10k': 'annual report',
+    '20f': 'annual report',
+    '10q': 'quarterly report',
+    'annual review': 'annual report',
+    'half year': 'interim',
+    'half yearly': 'interim',
+    'esg report': 'sustainability report',
+    'csr report': 'sustainability report',
+}
+
+_INNER_PUNCTUATION = re.compile(r"(?<=\w)[.\-/'’&](?=\w)")
+_PUNCTUATION = re.compile(r"[^\w\s]")
+
+
+def normalize_text(text: str) -> str:
+    """
+    Applies Unicode NFKC normalization and case folding, drops punctuation and collapses whitespace.
+    Punctuation inside a token is removed rather than split on, so "10-K" and "N.V." become
+    "10k" and "nv".
+
+    Args:
+        text (str): Text to normalize.
+
+    Returns:
+        str: The normalized text.
+    """
+    text = unicodedata.normalize("NFKC", text).casefold()
+    text = _INNER_PUNCTUATION.sub("", text)
+    text = _PUNCTUATION.sub(" ", text)
+    return " ".join(text.split())
+
+
+def _replace_phrases(tokens: List[str], phrases: Dict[str, str], max_tokens: int) -> List[str]:
+    """
+    Replaces the longest matching phrase at each position, scanning left to right.
+    """
+    output = []
+    i = 0
+    while i < len(tokens):
+        for length in range(min(max_tokens, len(tokens) - i), 0, -1):
+            phrase = " ".join(tokens[i:i + length])
+            if phrase in phrases:
+                output.extend(phrases[phrase].split())
+                i += length
+                break
+        else:
+            output.append(tokens[i])
+            i += 1
+    return output
+
+
+class AliasTable:
+    """
+    Maps normalized company aliases to canonical entity names.
+
+    Attributes:
+        aliases (Dict[str, str]): Normalized alias -> canonical entity name as in entities.jsonl.
+        max_tokens (int): Length in tokens of the longest alias.
+    """
+
+    def __init__(self, aliases: Dict[str, str]) -> None:
+        self.aliases = aliases
+        self.max_tokens = max((len(alias.split()) for alias in aliases), default=0)
+        # Aliases are replaced by a single token so that token sorting keeps the name together
+        self._tokens = {alias: entity_token(entity) for alias, entity in aliases.items()}
+        self._entities_by_token = {token: self.aliases[alias] for alias, token in self._tokens.items()}
+
+    def lookup(self, name: str) -> Optional[str]:
+        """
+        Returns the canonical entity name for a company name or alias, if known.
+        """
+        return self.aliases.get(normalize_text(name))
+
+    def replace(self, tokens: List[str]) -> List[str]:
+        return _replace_phrases(tokens, self._tokens, self.max_tokens)
+
+    def entities_in(self, query: str) -> List[str]:
+        """
+        Returns the canonical names of the companies mentioned by name or alias in a query.
+        """
+        return [self._entities_by_token[token] for token in canonicalize(query) if token in self._entities_by_token]
+
+
+def entity_token(entity: str) -> str:
+    """
+    Returns the single-token form of a canonical entity name used in canonical keys.
+    """
+    return normalize_text(entity).replace(" ", "_")
+
+
+def _short_alias(normalized_name: str) -> Optional[str]:
+    tokens = normalized_name.split()
+    while len(tokens) > 1 and tokens[-1] in LEGAL_SUFFIXES:
+        tokens.pop()
+    if len(tokens) == 1 and (tokens[0] in GENERIC_WORDS or len(tokens[0]) < 4):
+        return None
+    return " ".join(tokens)
+
+
+def load_alias_table(file_path: str) -> AliasTable:
+    """
+    Builds the alias table from an entities JSON lines file.
+
+    Each entity is reachable by its full normalized name, by that name without trailing legal
+    suffixes, and by any names listed under `variants`. Derived aliases shared by several entities
+    are dropped; full names always win.
+
+    Args:
+        file_path (str): Path to the entities JSON lines file.
+
+    Returns:
+        AliasTable: The alias table; empty if the file does not exist.
+    """
+    exact: Dict[str, str] = {}
+    derived: Dict[str, Optional[str]] = {}
+    try:
+        with open(file_path, 'r') as file:
+            for line in file:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                entity = record['entity']
+                normalized = normalize_text(entity)
+                exact[normalized] = entity
+                candidates = [_short_alias(normalized)] + [normalize_text(variant) for variant in record.get('variants', [])]
+                for alias in candidates:
+                    if alias and alias != normalized:
+                        # None marks an alias claimed by more than one entity
+                        derived[alias] = entity if derived.get(alias, entity) == entity else None
+    except FileNotFoundError:
+        logger.error(f"Entities file {file_path} not found; company aliases will not be canonicalized.")
+        return AliasTable({})
+
+    aliases = {alias: entity for alias, entity in derived.items() if entity is not None}
+    aliases.update(exact)
+    logger.info("Loaded %d company aliases for %d entities", len(aliases), len(exact))
+    return AliasTable(aliases)
+
+
+_alias_table: Optional[AliasTable] = None
+_alias_table_lock = threading.Lock()
+
+
+def get_alias_table() -> AliasTable:
+    """
+    Returns the alias table for the configured entities file, building it on first use.
+    """
+    global _alias_table
+    if _alias_table is None:
+        with _alias_table_lock:
+            if _alias_table is None:
+                _alias_table = load_alias_table(config.ENTITIES_PATH)
+    return _alias_table
+
+
+_max_synonym_tokens = max(len(phrase.split()) for phrase in REPORT_TYPE_SYNONYMS)
+
+
+def canonical_report_type(report_type: str) -> str:
+    """
+    Returns the report type in the shared vocabulary, e.g. "Annual Rpt" -> "annual report".
+    """
+    return " ".join(_replace_phrases(normalize_text(report_type).split(), REPORT_TYPE_SYNONYMS, _max_synonym_tokens))
+
+
+def canonicalize(query: str) -> List[str]:
+    """
+    Normalizes a query into tokens: normalized text, report-type synonyms rewritten, and company
+    aliases replaced by their canonical entity token.
+
+    Args:
+        query (str): The user's query.
+
+    Returns:
+        List[str]: Canonical tokens in query order.
+    """
+    tokens = normalize_text(query).split()
+    tokens = _replace_phrases(tokens, REPORT_TYPE_SYNONYMS, _max_synonym_tokens)
+    return get_alias_table().replace(tokens)
+
+
+def stable_query_key(query: str) -> str:
+    """
+    Returns a key equal for queries differing only in case, spacing, Unicode form or word order.
+    Unlike `canonical_key` it does not depend on the alias table or synonym lists, so it stays
+    the same when those change and is safe to persist.
+
+    Args:
+        query (str): The user's query.
+
+    Returns:
+        str: The key.
+    """
+    return " ".join(sorted(normalize_text(query).split()))
+
+
+def canonical_key(query: str) -> str:
+    """
+    Returns a key that is equal for queries differing only in case, spacing, Unicode form,
+    word order, report-type spelling or company alias, e.g. "Annual Report 2012 Commerzbank"
+    and "2012 annual rpt commerzbank".
+
+    Args:
+        query (str): The user's query.
+
+    Returns:
+        str: The canonical key.
+    """
+    return " ".join(sorted(canonicalize(query)))
@@ -0,0 +1,185 @@
+from src.query.canonical import canonical_report_type
+from src.config.logging import logger
+from src.config.setup import config
+from typing import NamedTuple
+from typing import Optional
+from typing import Tuple
+from typing import List
+from typing import Dict
+import threading
+import json
+import time
+
+
+# Search phrasing for canonical report types where a country's filings use their own names
+COUNTRY_REPORT_VOCABULARY: Dict[str, Dict[str, str]] = {
+    'United States of America': {
+        'annual report': 'annual report 10-K',
+        'quarterly report': 'quarterly report 10-Q',
+    },
+}
+
+
+class EntityRecord(NamedTuple):
+    """
+    Everything needed to search for one entity's reports.
+
+    Attributes:
+        entity_id (int): Position of the entity in the entities file.
+        name (str): Canonical entity name.
+        site_url (str): URL pattern of the entity's website.
+        country (str): Country of the entity.
+        batch_id (Optional[str]): Data store holding the entity's site; None if not loaded in the database.
+        report_vocabulary (Dict[str, str]): Canonical report type -> phrase to search for.
+    """
+    entity_id: int
+    name: str
+    site_url: str
+    country: str
+    batch_id: Optional[str]
+    report_vocabulary: Dict[str, str]
+
+    def report_phrase(self, report_type: str) -> str:
+        """
+        Returns the phrase to search for a report type, falling back to the type as given.
+        """
+        return self.report_vocabulary.get(canonical_report_type(report_type), report_type)
+
+    def site_query(self, year: str, report_type: str) -> str:
+        return f'filetype:pdf "{self.name}" {year} {self.report_phrase(report_type)} {self.country} {self.site_url}'
+
+    def cdn_query(self, year: str, report_type: str) -> str:
+        return f'filetype:pdf "{self.name}" {year} {self.report_phrase(report_type)} {self.country}'
+
+
+class EntityTable:
+    """
+    In-memory table of entity records, looked up by name and country.
+    """
+
+    def __init__(self, records: List[EntityRecord]) -> None:
+        self.records = records
+        self.batch_ids = {record.batch_id for record in records if record.batch_id}
+        self._by_key: Dict[Tuple[str, str], int] = {}
+        self._by_name: Dict[str, int] = {}
+        for record in records:
+            self._by_key.setdefault((record.name, record.country), record.entity_id)
+            self._by_name.setdefault(record.name, record.entity_id)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def get(self, name: str, country: Optional[str] = None) -> Optional[EntityRecord]:
+        """
+        Returns the record for an entity in `country`. Only when no country is given is the name
+        looked up alone, returning its first record if it is listed for several countries.
+        """
+        entity_id = self._by_key.get((name, country)) if country else self._by_name.get(name)
+        return self.records[entity_id] if entity_id is not None else None
+
+    def with_batch_ids(self, batch_ids: Dict[Tuple[str, str], str]) -> 'EntityTable':
+        """
+        Returns a copy of the table with batch IDs from the database applied; records missing from
+        `batch_ids` keep theirs.
+        """
+        return EntityTable([
+            record._replace(batch_id=batch_ids.get((record.name, record.country)) or record.batch_id)
+            for record in self.records
+        ])
+
+
+def _load_batch_ids() -> Dict[Tuple[str, str], str]:
+    """
+    Reads every entity's batch ID from the entity_urls table in one query.
+    """
+    from src.utils.db import get_engine
+    from sqlalchemy import text
+
+    query = text(f"SELECT entity, country, batch_id FROM {config.CLOUD_SQL_URLS_TABLE}")
+    with get_engine().connect() as connection:
+        return {(entity, country): batch_id for entity, country, batch_id in connection.execute(query)}
+
+
+def load_entity_table(file_path: str) -> EntityTable:
+    """
+    Materializes the entity table from the entities file and the batch IDs in the database.
+    If the batch IDs cannot be read, records have no batch ID (unless the file sets one) and
+    searches fall back to looking it up per query.
+
+    Args:
+        file_path (str): Path to the entities JSON lines file.
+
+    Returns:
+        EntityTable: The entity table; empty if the file does not exist.
+    """
+    start = time.perf_counter()
+    try:
+        batch_ids = _load_batch_ids()
+    # Connector errors (e.g. from the Cloud SQL connector) are not all SQLAlchemy errors
+    except Exception as e:
+        logger.error(f"Failed to load entity batch IDs; they will be looked up per query: {e}")
+        batch_ids = {}
+
+    records = []
+    try:
+        with open(file_path, 'r') as file:
+            for line in file:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                country = record.get('country', 'Unknown')
+                vocabulary = {**COUNTRY_REPORT_VOCABULARY.get(country, {}), **record.get('report_vocabulary', {})}
+                records.append(EntityRecord(
+                    entity_id=len(records),
+                    name=record['entity'],
+                    site_url=record.get('url', 'Unknown'),
+                    country=country,
+                    batch_id=record.get('batch_id'),
+                    report_vocabulary=vocabulary,
+                ))
+    except FileNotFoundError:
+        logger.error(f"Entities file {file_path} not found; entity records are unavailable.")
+
+    logger.info("Loaded %d entity records in %.0f ms", len(records), (time.perf_counter() - start) * 1000)
+    return EntityTable(records).with_batch_ids(batch_ids)
+
+
+_entity_table: Optional[EntityTable] = None
+_entity_table_lock = threading.Lock()
+_last_refresh = 0.0
+_refreshing = False
+
+
+def _refresh_batch_ids() -> None:
+    global _entity_table, _last_refresh, _refreshing
+    try:
+        batch_ids = _load_batch_ids()
+        _entity_table = _entity_table.with_batch_ids(batch_ids)
+        logger.info("Refreshed batch IDs for %d entities", len(batch_ids))
+    except Exception as e:
+        logger.error(f"Failed to refresh entity batch IDs; keeping the previous ones: {e}")
+    finally:
+        _last_refresh = time.monotonic()
+        _refreshing = False
+
+
+def get_entity_table() -> EntityTable:
+    """
+    Returns the entity table for the configured entities file, building it on first use.
+
+    Batch IDs are re-read from the database in the background every
+    `entity_batch_refresh_seconds`, so entity reloads reach running processes without a restart.
+    Changes to the entities file itself need a restart.
+    """
+    global _entity_table, _last_refresh, _refreshing
+    if _entity_table is None:
+        with _entity_table_lock:
+            if _entity_table is None:
+                _entity_table = load_entity_table(config.ENTITIES_PATH)
+                _last_refresh = time.monotonic()
+    if time.monotonic() - _last_refresh > config.ENTITY_BATCH_REFRESH_SECONDS and not _refreshing:
+        with _entity_table_lock:
+            if not _refreshing:
+                _refreshing = True
+                threading.Thread(target=_refresh_batch_ids, name="entity-refresh", daemon=True).start()
+    return _entity_table
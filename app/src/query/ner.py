@@ -1,10 +1,34 @@
 from src.query.sematic_search import find_closest_match
+from src.query.entity_table import get_entity_table
+from src.query.canonical import get_alias_table
 from src.config.logging import logger
-from src.generate.llm import LLM
+from src.generate.llm import get_llm
+from typing import Optional
 from typing import Dict
+import unicodedata
 
 
-llm = LLM()
+ENTITY_TASKS = {
+    'company': 'Given a query as shown below, extract the company name from it. If company name not found return NONE.',
+    'country': 'Given a query as shown below, extract the country name from it. If country name not found return NONE.',
+    'report_type': 'Given a query as shown below, extract the report type from it. If report type not found return NONE.',
+    'year': 'Given a query as shown below, extract the year from it. If year not found return NONE.',
+}
+
+
+def _entity_in_query(query: str, country: str) -> Optional[Dict[str, str]]:
+    """
+    Resolves the company from the entity table when the query names exactly one known entity
+    or alias, avoiding the embedding call and vector search. When a country was extracted, the
+    entity must be listed for that country.
+    """
+    names = set(get_alias_table().entities_in(query))
+    if len(names) != 1:
+        return None
+    record = get_entity_table().get(names.pop(), country if country != 'NONE' else None)
+    if record is None:
+        return None
+    return {'bank_name': record.name, 'site_url': record.site_url, 'country': record.country}
 
 
 def extract_entities(query: str) -> Dict[str, str]:
@@ -18,17 +42,14 @@ def extract_entities(query: str) -> Dict[str, str]:
     Dict[str, str]: A dictionary containing extracted entities like company name, country, report type, year, and URLs.
     """
     logger.info("Starting Named Entity Recognition (NER)")
-    extracted_entities = {}
-    
-    def extract_entity(task: str, query: str) -> str:
-        return llm.predict(task=task, query=query)
-
-    extracted_entities['company'] = extract_entity('Given a query as shown below, extract the company name from it. If company name not found return NONE.', query)
-    extracted_entities['country'] = extract_entity('Given a query as shown below, extract the country name from it. If country name not found return NONE.', query)
-    extracted_entities['report_type'] = extract_entity('Given a query as shown below, extract the report type from it. If report type not found return NONE.', query)
-    extracted_entities['year'] = extract_entity('Given a query as shown below, extract the year from it. If year not found return NONE.', query)
-    
-    closest_match = find_closest_match(extracted_entities['company'])
+    names = list(ENTITY_TASKS)
+    # Keyed on the prompt as sent, up to Unicode form and spacing: the answers echo the query's wording,
+    # so differently worded queries must not share them
+    prompt_text = " ".join(unicodedata.normalize("NFKC", query).split())
+    completions = get_llm().predict_many([ENTITY_TASKS[name] for name in names], query, cache_text=prompt_text)
+    extracted_entities = dict(zip(names, completions))
+
+    closest_match = _entity_in_query(query, extracted_entities['country']) or find_closest_match(extracted_entities['company'])
     extracted_entities['company'] = closest_match.get('bank_name', 'NONE')
     extracted_entities['site_url'] = closest_match.get('site_url', 'NONE')
 
@@ -42,4 +63,4 @@ def extract_entities(query: str) -> Dict[str, str]:
 if __name__ == '__main__':
     query = "Annual Report 2012 commerzbank"
     entities = extract_entities(query)
-    logger.info(entities)
+    logger.info('Entities: %s', entities)
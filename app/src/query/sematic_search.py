@@ -1,11 +1,21 @@
-from langchain_google_vertexai import VertexAIEmbeddings
-from langchain_community.vectorstores import FAISS
+from src.embed.providers import get_vector_store
+from src.query.canonical import canonical_key
+from src.utils.coalesce import SingleFlight
+from src.utils.coalesce import normalize_key
+from src.utils.metrics import histogram
+from src.utils.metrics import counter
 from src.config.logging import logger
 from src.config.setup import config
 from typing import List 
 from typing import Dict 
 
 
+_match_flight = SingleFlight("find_closest_match")
+
+EMBEDDING_CALLS = counter("embedding_calls_total", "Query embedding calls, by model provider.", ("provider",))
+ENTITY_RESOLUTION_SECONDS = histogram("entity_resolution_seconds", "Latency of resolving a company name against the FAISS index.")
+
+
 def execute_query(query: str, retriever):
     """
     Execute a query and log the resulting documents.
@@ -14,7 +24,7 @@ def execute_query(query: str, retriever):
     query (str): Query string.
     retriever: Retriever object for document retrieval.
     """
-    logger.info(f"Executing query: {query}")
+    logger.info("Executing query: %s", query)
     matches = []
     try:
         banks = retriever.get_relevant_documents(query)
@@ -24,18 +34,30 @@ def execute_query(query: str, retriever):
             country = metadata['country']
             site_url = metadata['url']
             matches.append({'bank_name': name, 'country': country, 'site_url': site_url})
-        logger.info(f"Query executed successfully")
+        logger.info("Query executed successfully")
     except Exception as e:
         logger.error(f"Error executing query '{query}': {e}")
     return matches
 
 
 def find_closest_match(query: str) -> List[Dict]:
-    embeddings = VertexAIEmbeddings(model_name=config.TEXT_EMBED_MODEL_NAME)
-    embeddings.instance['batch_size'] = 100
-    vector_store = FAISS.load_local("./data/faiss_index", embeddings, allow_dangerous_deserialization=True)
+    """
+    Resolve a company name to the closest entity in the FAISS index.
+
+    Concurrent lookups for the same name share one embedding call and index search.
+
+    Parameters:
+    query (str): Company name to resolve.
+    """
+    return _match_flight.do(normalize_key(canonical_key(query)), _find_closest_match, query)
+
+
+def _find_closest_match(query: str) -> List[Dict]:
+    vector_store = get_vector_store()
     retriever = vector_store.as_retriever(search_type='similarity', search_kwargs={'k': 1})
-    matches = execute_query(query, retriever)
+    EMBEDDING_CALLS.inc(provider=config.MODEL_PROVIDER)
+    with ENTITY_RESOLUTION_SECONDS.time():
+        matches = execute_query(query, retriever)
     return matches[0]
 
 
@@ -0,0 +1,35 @@
+from src.utils.lazy import lazy_import
+from src.config.logging import logger
+from typing import Optional
+import threading
+
+
+LOCATION = "global"
+
+discoveryengine = lazy_import("google.cloud.discoveryengine_v1beta")
+client_options_lib = lazy_import("google.api_core.client_options")
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_search_client() -> 'discoveryengine.SearchServiceClient':
+    """
+    Returns the Discovery Engine search client shared by the site and CDN searches,
+    creating it (and its gRPC channel) on first use.
+
+    Returns:
+        discoveryengine.SearchServiceClient: The shared search client.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                client_options: Optional['client_options_lib.ClientOptions'] = (
+                    client_options_lib.ClientOptions(api_endpoint=f"{LOCATION}-discoveryengine.googleapis.com")
+                    if LOCATION != "global"
+                    else None
+                )
+                _client = discoveryengine.SearchServiceClient(client_options=client_options)
+                logger.info("Discovery Engine search client created.")
+    return _client
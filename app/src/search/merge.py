@@ -0,0 +1,145 @@
+from src.query.canonical import normalize_text
+from src.utils.metrics import counter
+from urllib.parse import urlsplit
+from typing import Optional
+from typing import Tuple
+from typing import List
+from typing import Dict
+from typing import Any
+import hashlib
+import re
+
+
+DUPLICATE_RESULTS = counter("search_duplicate_results_total", "Search results dropped as duplicates, by backend.", ("backend",))
+
+# Query parameters that only track the visit and never change the document
+TRACKING_PARAMS = {'utm_source', 'utm_medium', 'utm_campaign', 'utm_term', 'utm_content', 'gclid', 'fbclid'}
+
+# Snippets Discovery Engine returns when it has none; they say nothing about the document
+PLACEHOLDER_SNIPPETS = {"no snippet is available for this page"}
+
+_TAGS = re.compile(r"<[^>]+>")
+
+
+def normalize_url(link: str) -> str:
+    """
+    Normalizes a result link so that the same document is recognized whatever the scheme,
+    host case, `www.` prefix, fragment, tracking parameters or trailing slash, e.g.
+    "HTTPS://www.Bank.com/ar.pdf?utm_source=x#page=2" -> "bank.com/ar.pdf".
+
+    Args:
+        link (str): The result link.
+
+    Returns:
+        str: The normalized link; empty if there is no link.
+    """
+    parts = urlsplit(link.strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[len("www."):]
+    params = [param for param in parts.query.split("&") if param and param.split("=", 1)[0].lower() not in TRACKING_PARAMS]
+    url = host + parts.path.rstrip("/")
+    return url + ("?" + "&".join(sorted(params)) if params else "")
+
+
+def content_fingerprint(result: Dict[str, Any]) -> Optional[str]:
+    """
+    Hashes a result's normalized title and snippet, identifying the same document mirrored under
+    another URL. Results without a real snippet have no fingerprint, since titles alone (e.g.
+    "Annual Report") are shared by distinct documents.
+    """
+    title = normalize_text(_TAGS.sub(" ", result.get('title') or ""))
+    snippet = normalize_text(_TAGS.sub(" ", result.get('snippet') or ""))
+    if not snippet or snippet in PLACEHOLDER_SNIPPETS:
+        return None
+    return hashlib.blake2b(f"{title}\n{snippet}".encode('utf-8'), digest_size=16).hexdigest()
+
+
+class _SeenResults:
+    """
+    Results kept so far. A result duplicates a kept one with the same normalized URL, or with the
+    same content fingerprint from another backend; within one backend, equal fingerprints are
+    distinct documents the backend chose to list separately.
+    """
+
+    def __init__(self) -> None:
+        self.urls = set()
+        self.fingerprints: Dict[str, set] = {}
+
+    def is_duplicate(self, result: Dict[str, Any], backend: str) -> bool:
+        url = normalize_url(result.get('link') or "")
+        if url and url in self.urls:
+            return True
+        backends = self.fingerprints.get(content_fingerprint(result), ())
+        return any(other != backend for other in backends)
+
+    def add(self, result: Dict[str, Any], backend: str) -> None:
+        url = normalize_url(result.get('link') or "")
+        if url:
+            self.urls.add(url)
+        fingerprint = content_fingerprint(result)
+        if fingerprint:
+            self.fingerprints.setdefault(fingerprint, set()).add(backend)
+
+
+def dedupe_results(
+    results: Dict[str, List[Dict[str, Any]]],
+    backends: Tuple[str, ...] = ('site', 'cdn'),
+    shown: Optional[Dict[str, List[Dict[str, Any]]]] = None
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Removes duplicate results within and across backends. Results are duplicates when their
+    normalized URLs match, or when results from different backends have the same content
+    fingerprint. The copy with the best (lowest) rank is kept, in its own backend's list; ties go
+    to the backend listed first.
+
+    Args:
+        results (Dict[str, List[Dict[str, Any]]]): Ranked results per backend.
+        backends (Tuple[str, ...]): Backends to deduplicate, in order of preference.
+        shown (Optional[Dict[str, List[Dict[str, Any]]]]): Results already on screen per backend,
+            when deduplicating a further page; results duplicating them are dropped.
+
+    Returns:
+        Dict[str, List[Dict[str, Any]]]: The same mapping with duplicates removed from the backend lists.
+    """
+    seen = _SeenResults()
+    for backend, shown_results in (shown or {}).items():
+        for result in shown_results:
+            seen.add(result, backend)
+
+    # Visit results rank by rank, so the first occurrence of a document is its best-ranked copy
+    depth = max((len(results.get(backend, [])) for backend in backends), default=0)
+    kept = {backend: [] for backend in backends if backend in results}
+    for rank in range(depth):
+        for backend in kept:
+            if rank >= len(results[backend]):
+                continue
+            result = results[backend][rank]
+            if seen.is_duplicate(result, backend):
+                DUPLICATE_RESULTS.inc(backend=backend)
+                continue
+            seen.add(result, backend)
+            kept[backend].append(result)
+    return {**results, **kept}
+
+
+def merge_results(results: Dict[str, List[Dict[str, Any]]], backends: Tuple[str, ...] = ('site', 'cdn')) -> List[Dict[str, Any]]:
+    """
+    Interleaves already deduplicated backend lists into one ranked list: results are ordered by
+    their rank within their backend, then by backend preference. Each result records its backend
+    under 'source'.
+
+    Args:
+        results (Dict[str, List[Dict[str, Any]]]): Deduplicated ranked results per backend.
+        backends (Tuple[str, ...]): Backends to merge, in order of preference.
+
+    Returns:
+        List[Dict[str, Any]]: The unified ranked list.
+    """
+    merged = []
+    depth = max((len(results.get(backend, [])) for backend in backends), default=0)
+    for rank in range(depth):
+        for backend in backends:
+            if rank < len(results.get(backend, [])):
+                merged.append({**results[backend][rank], 'source': backend})
+    return merged
@@ -0,0 +1,117 @@
+from src.search.site_search import extract_relevant_data as site_search_extract
+from src.search.cdn_search import extract_relevant_data as cdn_search_extract
+from src.search.site_search import search_data_store as site_search
+from src.search.cdn_search import search_data_store as cdn_search
+from concurrent.futures import ThreadPoolExecutor
+from src.utils.coalesce import SingleFlight
+from src.utils.coalesce import normalize_key
+from src.utils.metrics import counter
+from src.search.rerank import rerank
+from src.config.logging import logger
+from src.config.setup import config
+from collections import OrderedDict
+from typing import Optional
+from typing import Tuple
+from typing import List
+from typing import Dict
+from typing import Any
+import threading
+
+
+PAGE_CACHE_LOOKUPS = counter("search_page_cache_lookups_total", "Result page cache lookups, by result.", ("result",))
+
+Page = Tuple[List[Dict[str, str]], Optional[Dict[str, Any]]]
+
+_page_flight = SingleFlight("search_page")
+_page_cache: 'OrderedDict[tuple, Page]' = OrderedDict()
+_page_cache_lock = threading.Lock()
+_prefetcher = ThreadPoolExecutor(max_workers=config.PREFETCH_WORKERS, thread_name_prefix="prefetch")
+
+
+def page_cursor(backend: str, query: str, company: str, batch_id: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Builds the cursor for the first page of a backend's results.
+
+    A cursor holds everything needed to fetch a page without rerunning entity extraction: the
+    backend ('site' or 'cdn'), the query sent to it, the company (for reranking), the site data
+    store and the Discovery Engine page token. It is a plain dict so it can be kept in session
+    state and sent to the worker pool.
+    """
+    return {'backend': backend, 'query': query, 'company': company, 'batch_id': batch_id, 'page_token': ""}
+
+
+def _fetch(cursor: Dict[str, Any]) -> Tuple[Page, bool]:
+    if cursor['backend'] == 'site':
+        response = site_search(cursor['query'], cursor['batch_id'], page_token=cursor['page_token'])
+        results = site_search_extract(response)
+    else:
+        response = cdn_search(search_query=cursor['query'], page_token=cursor['page_token'])
+        results = cdn_search_extract(response)
+    token = getattr(response, 'next_page_token', "") if response is not None else ""
+    next_cursor = {**cursor, 'page_token': token} if token else None
+    return (results, next_cursor), response is not None
+
+
+def _fetch_and_cache(key: tuple, cursor: Dict[str, Any]) -> Page:
+    page, ok = _fetch(cursor)
+    # Failed calls are not cached, so the next request retries them
+    if ok:
+        with _page_cache_lock:
+            _page_cache[key] = page
+            while len(_page_cache) > config.SEARCH_PAGE_CACHE_SIZE:
+                _page_cache.popitem(last=False)
+    return page
+
+
+def fetch_page(cursor: Dict[str, Any]) -> Page:
+    """
+    Returns one page of results and the cursor of the following page (None on the last page).
+    Pages are cached per query and page token; a request for a page being prefetched waits for
+    the prefetch instead of calling the backend again.
+
+    Args:
+        cursor (Dict[str, Any]): Cursor from `page_cursor` or from the previous page.
+
+    Returns:
+        Tuple[List[Dict[str, str]], Optional[Dict[str, Any]]]: The page's results and the next cursor.
+    """
+    key = normalize_key(cursor['backend'], cursor['query'], cursor['batch_id'], cursor['page_token'])
+    with _page_cache_lock:
+        page = _page_cache.get(key)
+        if page is not None:
+            _page_cache.move_to_end(key)
+    PAGE_CACHE_LOOKUPS.inc(result="hit" if page is not None else "miss")
+    if page is not None:
+        return page
+    return _page_flight.do(key, _fetch_and_cache, key, cursor)
+
+
+def prefetch(cursor: Optional[Dict[str, Any]]) -> None:
+    """
+    Fetches a page in the background so that showing it later is served from the page cache.
+    """
+    if cursor is None or not config.PREFETCH_NEXT_PAGE:
+        return
+
+    def run() -> None:
+        try:
+            fetch_page(cursor)
+        except Exception as e:
+            logger.error(f"Failed to prefetch the next {cursor['backend']} page: {e}")
+
+    _prefetcher.submit(run)
+
+
+def fetch_more(cursor: Dict[str, Any]) -> Page:
+    """
+    Returns the reranked page for a cursor and starts prefetching the page after it.
+
+    Args:
+        cursor (Dict[str, Any]): Cursor of the page to show, from the previous page.
+
+    Returns:
+        Tuple[List[Dict[str, str]], Optional[Dict[str, Any]]]: The page's results and the next cursor.
+    """
+    results, next_cursor = fetch_page(cursor)
+    prefetch(next_cursor)
+    return rerank(results, cursor['company']), next_cursor
@@ -0,0 +1,165 @@
+from src.config.logging import logger
+from src.config.setup import config
+from typing import Optional
+from typing import Tuple
+from typing import List
+from typing import Dict
+from typing import Any
+import threading
+import json
+import time
+import os
+
+
+# Votes added to the denominator so a single vote cannot swing a result all the way
+PRIOR_VOTES = 2
+
+# Seconds between checks for a newer relevance table on disk
+RELOAD_CHECK_SECONDS = 60
+
+
+def relevance_key(company: str, url: str) -> Tuple[str, str]:
+    """
+    Builds the lookup key for a (company, url) pair.
+    """
+    return (company or "").strip().lower(), (url or "").strip()
+
+
+class RelevanceTable:
+    """
+    Per-(company, url) relevance scores aggregated from user feedback.
+
+    Attributes:
+        counts (Dict[Tuple[str, str], List[int]]): [relevant votes, not relevant votes] per key.
+        last_id (int): Highest feedback id already aggregated, for incremental refreshes.
+    """
+
+    def __init__(self, counts: Optional[Dict[Tuple[str, str], List[int]]] = None, last_id: int = 0) -> None:
+        self.counts = counts or {}
+        self.last_id = last_id
+
+    def score(self, company: str, url: str) -> float:
+        """
+        Returns a score in (-1, 1): positive when users mostly found the link relevant for the company.
+        """
+        votes = self.counts.get(relevance_key(company, url))
+        if votes is None:
+            return 0.0
+        relevant, not_relevant = votes
+        return (relevant - not_relevant) / (relevant + not_relevant + PRIOR_VOTES)
+
+    def refresh(self) -> int:
+        """
+        Folds feedback added since `last_id` into the table.
+
+        Returns:
+            int: Number of (company, url) pairs updated.
+        """
+        from src.utils.db import get_engine
+        from sqlalchemy import text
+
+        query = text(f"""
+            SELECT company, url,
+                   SUM(CASE WHEN is_relevant = 'Yes' THEN 1 ELSE 0 END) AS relevant,
+                   SUM(CASE WHEN is_relevant = 'No' THEN 1 ELSE 0 END) AS not_relevant,
+                   MAX(id) AS max_id
+            FROM {config.CLOUD_SQL_FEEDBACK_TABLE}
+            WHERE id > :last_id AND url IS NOT NULL
+            GROUP BY company, url
+        """)
+        with get_engine().connect() as connection:
+            rows = connection.execute(query, {'last_id': self.last_id}).fetchall()
+
+        for company, url, relevant, not_relevant, max_id in rows:
+            votes = self.counts.setdefault(relevance_key(company, url), [0, 0])
+            votes[0] += int(relevant or 0)
+            votes[1] += int(not_relevant or 0)
+            self.last_id = max(self.last_id, int(max_id))
+        logger.info("Relevance table refreshed: %d pairs updated, %d total, last id %d", len(rows), len(self.counts), self.last_id)
+        return len(rows)
+
+    def save(self, path: str) -> None:
+        """
+        Writes the table atomically as compact JSON.
+        """
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        payload = {
+            'last_id': self.last_id,
+            'entries': [[company, url, votes[0], votes[1]] for (company, url), votes in self.counts.items()],
+        }
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as file:
+            json.dump(payload, file, separators=(',', ':'))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'RelevanceTable':
+        """
+        Reads a table written by `save`. Returns an empty table if the file does not exist.
+        """
+        if not os.path.exists(path):
+            return cls()
+        with open(path, 'r') as file:
+            payload = json.load(file)
+        counts = {(company, url): [relevant, not_relevant] for company, url, relevant, not_relevant in payload['entries']}
+        return cls(counts, payload.get('last_id', 0))
+
+
+_table = RelevanceTable()
+_table_mtime: Optional[float] = None
+_last_check = 0.0
+_lock = threading.Lock()
+
+
+def get_relevance_table() -> RelevanceTable:
+    """
+    Returns the in-memory relevance table, reloading it when the file on disk has changed.
+    The file is checked at most once every RELOAD_CHECK_SECONDS.
+    """
+    global _table, _table_mtime, _last_check
+    now = time.monotonic()
+    if _table_mtime is not None and now - _last_check < RELOAD_CHECK_SECONDS:
+        return _table
+    with _lock:
+        _last_check = now
+        path = config.RELEVANCE_TABLE_PATH
+        try:
+            mtime = os.path.getmtime(path) if os.path.exists(path) else 0.0
+            if mtime != _table_mtime:
+                _table = RelevanceTable.load(path)
+                _table_mtime = mtime
+                logger.info("Loaded relevance table with %d pairs from %s", len(_table.counts), path)
+        except (OSError, ValueError, KeyError) as e:
+            logger.error(f"Failed to load relevance table from {path}: {e}")
+            _table_mtime = _table_mtime or 0.0
+    return _table
+
+
+def rerank(results: List[Dict[str, Any]], company: str) -> List[Dict[str, Any]]:
+    """
+    Reorders search results using feedback: each result moves up or down by up to
+    `rerank_weight` positions according to its relevance score for the company.
+
+    Args:
+        results (List[Dict[str, Any]]): Results in backend order, each with a 'link'.
+        company (str): Resolved company name.
+
+    Returns:
+        List[Dict[str, Any]]: The reordered results.
+    """
+    table = get_relevance_table()
+    if not results or not table.counts:
+        return results
+    weight = config.RERANK_WEIGHT
+    positions = {id(result): i - weight * table.score(company, result.get('link', '')) for i, result in enumerate(results)}
+    return sorted(results, key=lambda result: positions[id(result)])
+
+
+if __name__ == "__main__":
+    path = config.RELEVANCE_TABLE_PATH
+    table = RelevanceTable.load(path)
+    table.refresh()
+    table.save(path)
+    logger.info(f"Relevance table saved to {path}")
@@ -1,17 +1,34 @@
-from src.search.site_search import extract_relevant_data as site_search_extract
-from src.search.cdn_search import extract_relevant_data as cdn_search_extract
-from src.search.site_search import search_data_store as site_search
-from src.search.cdn_search import search_data_store as cdn_search
+from src.query.entity_table import get_entity_table
 from src.db.match import find_entity_url_by_key
+from src.search.merge import dedupe_results
+from src.search.merge import merge_results
+from src.search.paging import page_cursor
+from src.search.paging import fetch_page
+from src.search.paging import prefetch
+from src.search.rerank import rerank
+from src.utils.coalesce import SingleFlight
+from src.utils.coalesce import normalize_key
+from src.utils.metrics import histogram
+from src.utils.metrics import counter
 from src.query.ner import extract_entities
+from src.query.canonical import canonical_key
 from src.config.logging import logger
+from src.config.setup import config
 from typing import Dict 
 
 
+_search_flight = SingleFlight("perform_search")
+
+SEARCH_REQUESTS = counter("search_requests_total", "Searches run through the pipeline, by query mode.", ("mode",))
+SEARCH_STAGE_SECONDS = histogram("search_stage_seconds", "Latency of each search pipeline stage.", ("stage",))
+
+
 def perform_search(query_mode: str, query: str):
     """
     Perform a specific type of search based on the query mode and the incoming user query.
 
+    Concurrent equivalent requests (same mode and canonical query) share a single pipeline execution.
+
     Parameters:
     query_mode (str): Mode of query ('Raw' or 'Reformulated').
     query (str): The search query.
@@ -19,9 +36,31 @@ def perform_search(query_mode: str, query: str):
     Returns:
     dict: A dictionary of dictionaries containing search results.
     """
+    key = normalize_key(query_mode, canonical_key(query))
+    return _search_flight.do(key, _perform_search, query_mode, query)
+
+
+def _perform_search(query_mode: str, query: str):
+    """
+    Runs the full entity extraction and search pipeline for a query.
+
+    Parameters:
+    query_mode (str): Mode of query ('Raw' or 'Reformulated').
+    query (str): The search query.
+
+    Returns:
+    dict: A dictionary of dictionaries containing search results.
+    """
+    SEARCH_REQUESTS.inc(mode=query_mode)
+    with SEARCH_STAGE_SECONDS.time(stage="pipeline"):
+        return _run_pipeline(query_mode, query)
+
+
+def _run_pipeline(query_mode: str, query: str):
     results = {}
-    entities = extract_entities(query)
-    logger.info(f'Extracted Entities: {entities}')
+    with SEARCH_STAGE_SECONDS.time(stage="extract_entities"):
+        entities = extract_entities(query)
+    logger.info('Extracted Entities: %s', entities)
     company = entities['company']
     report_type = entities['report_type']
     country = entities['country']
@@ -29,29 +68,63 @@ def perform_search(query_mode: str, query: str):
     site_url = entities['site_url']
     entities = {'company': company, 'report_type': report_type, 'country': country, 'year': year, 'site_url': site_url}
     
-    logger.info(f'Starting Vertex AI Search with Query Mode: <{query_mode}>')
+    logger.info('Starting Vertex AI Search with Query Mode: <%s>', query_mode)
 
-    row_info = find_entity_url_by_key(company, country)
-    if row_info:
-        batch_id = row_info['batch_id'] 
-    
+    # The entity table holds everything the searches need; the database is only asked for
+    # entities whose batch ID was not available when the table was built
+    record = get_entity_table().get(company, country)
+    if record is not None and record.batch_id:
+        batch_id = record.batch_id
+    else:
+        with SEARCH_STAGE_SECONDS.time(stage="entity_lookup"):
+            row_info = find_entity_url_by_key(company, country)
+        batch_id = row_info['batch_id'] if row_info else None
+    if batch_id:
+        next_pages = {}
         if query_mode == 'Raw':
-            response = site_search(query, batch_id=batch_id)
-            results['site'] = site_search_extract(response)
-            response = cdn_search(search_query=query)
-            results['cdn'] = cdn_search_extract(response)
+            with SEARCH_STAGE_SECONDS.time(stage="site_search"):
+                results['site'], next_pages['site'] = fetch_page(page_cursor('site', query, company, batch_id))
+            with SEARCH_STAGE_SECONDS.time(stage="cdn_search"):
+                results['cdn'], next_pages['cdn'] = fetch_page(page_cursor('cdn', query, company))
         elif query_mode == 'Targeted':
-            reformulated_query = f'filetype:pdf "{company}" {year} {report_type} {country} {site_url}'
-            response = site_search(reformulated_query, batch_id)
-            results['site'] = site_search_extract(response)
+            if record is not None:
+                reformulated_query = record.site_query(year, report_type)
+            else:
+                reformulated_query = f'filetype:pdf "{company}" {year} {report_type} {country} {site_url}'
+            with SEARCH_STAGE_SECONDS.time(stage="site_search"):
+                results['site'], next_pages['site'] = fetch_page(page_cursor('site', reformulated_query, company, batch_id))
             results['reformulated_query_site_search'] = reformulated_query
-            reformulated_query = f'filetype:pdf "{company}" {year} {report_type} {country}'
-            response = cdn_search(search_query=reformulated_query)
-            results['cdn'] = cdn_search_extract(response)
+            if record is not None:
+                reformulated_query = record.cdn_query(year, report_type)
+            else:
+                reformulated_query = f'filetype:pdf "{company}" {year} {report_type} {country}'
+            with SEARCH_STAGE_SECONDS.time(stage="cdn_search"):
+                results['cdn'], next_pages['cdn'] = fetch_page(page_cursor('cdn', reformulated_query, company))
             results['reformulated_query_cdn_search'] = reformulated_query
 
-    logger.info('Vertex AI Search completed')
-    logger.info(results)
+        # Boost or demote links using aggregated user feedback for this company
+        with SEARCH_STAGE_SECONDS.time(stage="rerank"):
+            for backend in ('site', 'cdn'):
+                if backend in results:
+                    results[backend] = rerank(results[backend], company)
+
+        # The same PDF often comes back from both backends; keep only its best-ranked copy
+        results = dedupe_results(results)
+        if config.UNIFIED_RESULTS:
+            results['all'] = merge_results(results)
+
+        # Cursors let "Show more" fetch later pages without rerunning entity extraction;
+        # the next pages are fetched now so that showing them is instant
+        results['next_pages'] = next_pages
+        for cursor in next_pages.values():
+            prefetch(cursor)
+
+    logger.info(
+        'Vertex AI Search completed: %d site and %d CDN results',
+        len(results.get('site', [])), len(results.get('cdn', []))
+    )
+    # Full result payloads are large; keep a sample of them for debugging
+    logger.debug('Search results: %s', results, extra={'sample_rate': 0.1})
     return results, entities
 
 
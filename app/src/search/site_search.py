@@ -1,34 +1,39 @@
-from google.cloud import discoveryengine_v1beta as discoveryengine
-from google.api_core.client_options import ClientOptions
+from src.search.client import get_search_client
+from src.search.client import discoveryengine
+from src.search.client import LOCATION
+from src.utils.metrics import call_outcome
+from src.utils.metrics import histogram
+from src.utils.metrics import counter
+from src.utils.lazy import lazy_import
 from src.db.match import find_entity_url_by_key
-from google.protobuf import json_format
 from src.config.logging import logger 
 from src.config.setup import config
 from typing import Optional
 from typing import List
 from typing import Dict
+import time
 
 
-LOCATION = "global" 
+json_format = lazy_import("google.protobuf.json_format")
 
-def search_data_store(search_query: str, batch_id: str) -> Optional[discoveryengine.SearchResponse]:
+SEARCH_BACKEND_CALLS = counter("search_backend_calls_total", "Discovery Engine search calls, by backend and outcome.", ("backend", "outcome"))
+SEARCH_BACKEND_SECONDS = histogram("search_backend_seconds", "Discovery Engine search call latency, by backend.", ("backend",))
+
+def search_data_store(search_query: str, batch_id: str, page_token: Optional[str] = None) -> Optional['discoveryengine.SearchResponse']:
     """
     Search the data store using Google Cloud's Discovery Engine API.
 
     Args:
         search_query (str): The search query string.
+        page_token (Optional[str]): `next_page_token` of the previous page's response; None for the first page.
 
     Returns:
         discoveryengine.SearchResponse: The search response from the Discovery Engine API.
     """
+    start = time.perf_counter()
+    error = None
     try:
-        client_options = (
-            ClientOptions(api_endpoint=f"{LOCATION}-discoveryengine.googleapis.com")
-            if LOCATION != "global"
-            else None
-        )
-
-        client = discoveryengine.SearchServiceClient(client_options=client_options)
+        client = get_search_client()
 
         serving_config = client.serving_config_path(
             project=config.PROJECT_ID,
@@ -46,7 +51,8 @@ def search_data_store(search_query: str, batch_id: str) -> Optional[discoveryeng
         request = discoveryengine.SearchRequest(
             serving_config=serving_config,
             query=search_query,
-            page_size=5,
+            page_size=config.SEARCH_PAGE_SIZE,
+            page_token=page_token or "",
             content_search_spec=content_search_spec,
             query_expansion_spec=discoveryengine.SearchRequest.QueryExpansionSpec(
                 condition=discoveryengine.SearchRequest.QueryExpansionSpec.Condition.AUTO,
@@ -60,10 +66,14 @@ def search_data_store(search_query: str, batch_id: str) -> Optional[discoveryeng
         return response
 
     except Exception as e:
+        error = e
         logger.error(f"Error during data store search: {e}")
         return None
+    finally:
+        SEARCH_BACKEND_SECONDS.observe(time.perf_counter() - start, backend="site")
+        SEARCH_BACKEND_CALLS.inc(backend="site", outcome=call_outcome(error))
 
-def extract_relevant_data(response: Optional[discoveryengine.SearchResponse]) -> List[Dict[str, str]]:
+def extract_relevant_data(response: Optional['discoveryengine.SearchResponse']) -> List[Dict[str, str]]:
     """
     Extracts company, title, snippet, and link from the search response.
 
@@ -0,0 +1,315 @@
+from concurrent.futures import ThreadPoolExecutor
+from src.utils.passwords import verify_session_token
+from src.utils.passwords import issue_session_token
+from src.db.create import authenticate_user
+from src.app.warmup import start_warmup
+from src.app.warmup import is_ready
+from src.db.create import insert_feedback
+from src.config.logging import logger
+from src.config.setup import config
+from datetime import datetime
+from functools import partial
+from typing import Awaitable
+from typing import Callable
+from typing import Optional
+from typing import Tuple
+from typing import List
+from typing import Dict
+from typing import Any
+from aiohttp import web
+import argparse
+import asyncio
+import json
+
+
+# Responses smaller than this are sent uncompressed; compressing them costs more than it saves
+COMPRESSION_MIN_BYTES = 1024
+
+# Feedback fields accepted from clients: (type, maximum length in bytes) as in the feedback table's schema
+TEXT_BYTES = 65535
+FEEDBACK_FIELDS: Dict[str, Tuple[type, Optional[int]]] = {
+    'query': (str, TEXT_BYTES),
+    'title': (str, TEXT_BYTES),
+    'snippet': (str, TEXT_BYTES),
+    'url': (str, 255),
+    'feedback': (str, TEXT_BYTES),
+    'is_relevant': (str, 3),
+    'match_rank': (int, None),
+    'company': (str, 255),
+    'report_type': (str, 255),
+    'country': (str, 255),
+    'year': (int, None),
+    'query_mode': (str, 32),
+}
+
+CURSOR_FIELDS = {'backend', 'query', 'company', 'batch_id', 'page_token'}
+
+Handler = Callable[[web.Request], Awaitable[web.StreamResponse]]
+
+
+def _search(query_mode: str, query: str) -> Dict[str, Any]:
+    if config.SERVING_MODE == "worker_pool":
+        from src.serve.client import get_pool_client
+        results, entities = get_pool_client().perform_search(query_mode, query)
+    else:
+        from src.search.search import perform_search
+        results, entities = perform_search(query_mode, query)
+    return {'results': results, 'entities': entities}
+
+
+def _extract(query: str) -> Dict[str, str]:
+    if config.SERVING_MODE == "worker_pool":
+        from src.serve.client import get_pool_client
+        return get_pool_client().call("extract", query=query)
+    from src.query.ner import extract_entities
+    return extract_entities(query)
+
+
+def _resolve(name: str) -> Dict[str, str]:
+    if config.SERVING_MODE == "worker_pool":
+        from src.serve.client import get_pool_client
+        return get_pool_client().call("resolve", name=name)
+    from src.query.sematic_search import find_closest_match
+    return find_closest_match(name)
+
+
+def _cursor_allowed(cursor: Dict[str, Any]) -> bool:
+    """
+    Cursors come from clients, so a site cursor may only name a data store that belongs to a known
+    entity, either in the entity table or (for entities loaded since it was built) in the database;
+    CDN cursors always search the CDN data store and must not name one.
+    """
+    if cursor['backend'] == 'cdn':
+        return cursor['batch_id'] is None
+    if cursor['backend'] == 'site' and isinstance(cursor['batch_id'], str):
+        from src.query.entity_table import get_entity_table
+        from src.db.match import batch_id_exists
+        return cursor['batch_id'] in get_entity_table().batch_ids or batch_id_exists(cursor['batch_id'])
+    return False
+
+
+def _more(cursor: Dict[str, Any]) -> Dict[str, Any]:
+    if config.SERVING_MODE == "worker_pool":
+        from src.serve.client import get_pool_client
+        results, next_cursor = get_pool_client().fetch_more(cursor)
+    else:
+        from src.search.paging import fetch_more
+        results, next_cursor = fetch_more(cursor)
+    return {'results': results, 'next_page': next_cursor}
+
+
+def _validate_feedback(row: Any) -> Dict[str, Any]:
+    """
+    Checks a client's feedback row against the feedback table's schema, so that bad rows are
+    rejected here instead of failing later when the spool is flushed.
+
+    Raises:
+        web.HTTPBadRequest: If the row is not valid.
+    """
+    if not isinstance(row, dict):
+        raise web.HTTPBadRequest(text="Each feedback row must be a JSON object.")
+    if row.get('is_relevant') not in ('Yes', 'No', 'NA'):
+        raise web.HTTPBadRequest(text="Each feedback row needs 'is_relevant' set to 'Yes', 'No' or 'NA'.")
+    if not isinstance(row.get('query'), str) or not row['query'].strip():
+        raise web.HTTPBadRequest(text="Each feedback row needs a non-empty 'query'.")
+
+    validated = {}
+    for field, (field_type, max_bytes) in FEEDBACK_FIELDS.items():
+        value = row.get(field)
+        # Search responses report entities that were not found as 'NONE'
+        if field == 'year' and value == 'NONE':
+            value = None
+        if field_type is int and isinstance(value, str) and value.isdigit():
+            value = int(value)
+        if value is not None and (not isinstance(value, field_type) or isinstance(value, bool)):
+            raise web.HTTPBadRequest(text=f"Feedback field '{field}' must be {'an integer' if field_type is int else 'a string'}.")
+        if max_bytes is not None and value is not None and len(value.encode('utf-8')) > max_bytes:
+            raise web.HTTPBadRequest(text=f"Feedback field '{field}' is longer than {max_bytes} bytes.")
+        validated[field] = value
+    return validated
+
+
+def _json_response(data: Any, status: int = 200) -> web.Response:
+    return web.json_response(data, status=status, dumps=partial(json.dumps, default=str))
+
+
+def _error(status: int, message: str) -> web.Response:
+    return _json_response({'error': message}, status=status)
+
+
+@web.middleware
+async def compression_middleware(request: web.Request, handler: Handler) -> web.StreamResponse:
+    """
+    Compresses responses above COMPRESSION_MIN_BYTES with gzip or deflate when the client accepts it.
+    """
+    response = await handler(request)
+    if isinstance(response, web.Response) and response.body is not None and len(response.body) >= COMPRESSION_MIN_BYTES:
+        response.enable_compression()
+    return response
+
+
+@web.middleware
+async def auth_middleware(request: web.Request, handler: Handler) -> web.StreamResponse:
+    """
+    Requires a session token from /login (`Authorization: Bearer <token>`) on every other route.
+    """
+    if request.path in ("/login", "/ready"):
+        return await handler(request)
+    header = request.headers.get("Authorization", "")
+    username = verify_session_token(header[len("Bearer "):] if header.startswith("Bearer ") else None)
+    if username is None:
+        return _error(401, "A valid session token is required.")
+    request['username'] = username
+    return await handler(request)
+
+
+class SearchAPI:
+    """
+    HTTP API over the same pipeline functions, clients and caches as the Streamlit app.
+
+    Blocking pipeline calls run on a bounded thread pool; a semaphore of the same size limits how
+    many run at once, so excess requests wait instead of piling onto the backends. Each endpoint
+    takes a single item or a batch (a list under the plural key), whose items run concurrently;
+    identical items share one execution through the pipeline's single-flight groups.
+    """
+
+    def __init__(self, max_concurrency: int, max_batch: int) -> None:
+        self.max_concurrency = max_concurrency
+        self.max_batch = max_batch
+        self.semaphore: Optional[asyncio.Semaphore] = None
+        self.executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="api")
+
+    async def _on_startup(self, app: web.Application) -> None:
+        # Created here so it belongs to the server's event loop
+        self.semaphore = asyncio.Semaphore(self.max_concurrency)
+        start_warmup()
+
+    async def _on_cleanup(self, app: web.Application) -> None:
+        self.executor.shutdown(wait=False)
+
+    async def _run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        async with self.semaphore:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+
+    async def _body(self, request: web.Request) -> Dict[str, Any]:
+        try:
+            body = await request.json()
+        except json.JSONDecodeError:
+            raise web.HTTPBadRequest(text="Request body must be JSON.")
+        if not isinstance(body, dict):
+            raise web.HTTPBadRequest(text="Request body must be a JSON object.")
+        return body
+
+    async def _items(self, request: web.Request, single: str, batch: str) -> List[Any]:
+        """
+        Reads either `{single: item}` or `{batch: [items]}` from the JSON body.
+        """
+        body = await self._body(request)
+        if batch in body:
+            items = body[batch]
+            if not isinstance(items, list) or len(items) > self.max_batch:
+                raise web.HTTPBadRequest(text=f"'{batch}' must be a list of at most {self.max_batch} items.")
+            return items
+        if single in body:
+            return [body[single]]
+        raise web.HTTPBadRequest(text=f"Expected '{single}' or '{batch}' in the request body.")
+
+    async def _batch(self, fn: Callable[..., Any], args: List[tuple]) -> List[Any]:
+        """
+        Runs `fn` once per item concurrently. An item that fails is reported as `{"error": message}`
+        in its place, without failing the other items.
+        """
+        outcomes = await asyncio.gather(*(self._run(fn, *arg) for arg in args), return_exceptions=True)
+        results = []
+        for arg, outcome in zip(args, outcomes):
+            if isinstance(outcome, Exception):
+                logger.error(f"API call {fn.__name__}{arg} failed: {outcome}")
+                results.append({'error': str(outcome)})
+            elif isinstance(outcome, BaseException):
+                raise outcome
+            else:
+                results.append(outcome)
+        return results
+
+    async def login(self, request: web.Request) -> web.Response:
+        body = await self._body(request)
+        username, password = body.get('username', ''), body.get('password', '')
+        if not await self._run(authenticate_user, username, password):
+            return _error(401, "Invalid username or password.")
+        return _json_response({'token': issue_session_token(username), 'expires_in': config.SESSION_TTL_SECONDS})
+
+    async def resolve(self, request: web.Request) -> web.Response:
+        names = await self._items(request, 'name', 'names')
+        return _json_response({'matches': await self._batch(_resolve, [(name,) for name in names])})
+
+    async def extract(self, request: web.Request) -> web.Response:
+        queries = await self._items(request, 'query', 'queries')
+        return _json_response({'entities': await self._batch(_extract, [(query,) for query in queries])})
+
+    async def search(self, request: web.Request) -> web.Response:
+        searches = await self._items(request, 'search', 'searches')
+        try:
+            args = [(item.get('mode', 'Raw'), item['query']) for item in searches]
+        except (AttributeError, KeyError):
+            raise web.HTTPBadRequest(text="Each search needs a 'query' and optionally a 'mode' ('Raw' or 'Targeted').")
+        return _json_response({'searches': await self._batch(_search, args)})
+
+    async def more(self, request: web.Request) -> web.Response:
+        cursors = await self._items(request, 'cursor', 'cursors')
+        if not all(isinstance(cursor, dict) and CURSOR_FIELDS <= cursor.keys() for cursor in cursors):
+            raise web.HTTPBadRequest(text="Each cursor must be a 'next_pages' entry from a search response.")
+        allowed = await asyncio.gather(*(self._run(_cursor_allowed, cursor) for cursor in cursors))
+        if not all(allowed):
+            return _error(403, "A cursor names a data store that does not belong to a known entity.")
+        return _json_response({'pages': await self._batch(_more, [(cursor,) for cursor in cursors])})
+
+    async def feedback(self, request: web.Request) -> web.Response:
+        rows = await self._items(request, 'feedback', 'feedback_rows')
+        now = datetime.now()
+        feedback_rows = []
+        for row in rows:
+            feedback_rows.append({
+                **_validate_feedback(row),
+                'username': request['username'],
+                'timestamp': now,
+                'feedback_given_timestamp': now,
+            })
+        outcomes = await self._batch(insert_feedback, [(row,) for row in feedback_rows])
+        errors = [{'index': index, **outcome} for index, outcome in enumerate(outcomes) if isinstance(outcome, dict)]
+        return _json_response({'accepted': len(feedback_rows) - len(errors), 'errors': errors}, status=202)
+
+    async def ready(self, request: web.Request) -> web.Response:
+        return _json_response({'ready': is_ready()}, status=200 if is_ready() else 503)
+
+    def create_app(self) -> web.Application:
+        app = web.Application(middlewares=[compression_middleware, auth_middleware])
+        app.add_routes([
+            web.post('/login', self.login),
+            web.post('/resolve', self.resolve),
+            web.post('/extract', self.extract),
+            web.post('/search', self.search),
+            web.post('/more', self.more),
+            web.post('/feedback', self.feedback),
+            web.get('/ready', self.ready),
+        ])
+        app.on_startup.append(self._on_startup)
+        app.on_cleanup.append(self._on_cleanup)
+        return app
+
+
+def serve(host: str, port: int) -> None:
+    """
+    Serves the API until interrupted. Connections are kept alive for `api_keepalive_seconds`
+    between requests, so clients reuse them instead of reconnecting per call.
+    """
+    api = SearchAPI(config.API_MAX_CONCURRENCY, config.API_MAX_BATCH)
+    logger.info("Serving the search API on %s:%d", host, port)
+    web.run_app(api.create_app(), host=host, port=port, keepalive_timeout=config.API_KEEPALIVE_SECONDS, print=None)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the search pipeline over HTTP.")
+    parser.add_argument("--host", default=config.API_HOST)
+    parser.add_argument("--port", type=int, default=config.API_PORT)
+    args = parser.parse_args()
+    serve(args.host, args.port)
@@ -0,0 +1,85 @@
+from multiprocessing.connection import Connection
+from multiprocessing.connection import Client
+from src.config.logging import logger
+from src.config.setup import config
+from typing import Optional
+from typing import Tuple
+from typing import List
+from typing import Dict
+from typing import Any
+import threading
+
+
+class PoolClient:
+    """
+    Thin client for `src.serve.pool`. Connections are kept open and reused; each call holds one
+    connection exclusively, so concurrent callers open as many as they need.
+    """
+
+    def __init__(self, address: Tuple[str, int], authkey: Optional[bytes] = None) -> None:
+        self.address = address
+        self.authkey = authkey
+        self._idle: List[Connection] = []
+        self._lock = threading.Lock()
+
+    def _acquire(self) -> Connection:
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        return Client(self.address, authkey=self.authkey)
+
+    def _release(self, connection: Connection) -> None:
+        with self._lock:
+            self._idle.append(connection)
+
+    def call(self, method: str, **kwargs: Any) -> Any:
+        """
+        Runs a pool method and returns its result.
+
+        Raises:
+            RuntimeError: If the method failed in the worker.
+        """
+        connection = self._acquire()
+        try:
+            connection.send((method, kwargs))
+            status, result = connection.recv()
+        except (EOFError, OSError):
+            # The pool restarted or dropped the connection; don't reuse it
+            connection.close()
+            raise
+        self._release(connection)
+        if status != "ok":
+            raise RuntimeError(f"Pool method '{method}' failed: {result}")
+        return result
+
+    def perform_search(self, query_mode: str, query: str, profile: bool = False) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Same contract as `src.search.search.perform_search`. With `profile`, the worker samples
+        the pipeline and offers the profile to the profile store.
+        """
+        return tuple(self.call("search", query_mode=query_mode, query=query, profile=profile))
+
+    def fetch_more(self, cursor: Dict[str, Any]) -> Tuple[List[Dict[str, str]], Optional[Dict[str, Any]]]:
+        """
+        Same contract as `src.search.paging.fetch_more`. Pages are cached per worker, so a page
+        prefetched by another worker is fetched again.
+        """
+        return tuple(self.call("more", cursor=cursor))
+
+
+_client: Optional[PoolClient] = None
+_client_lock = threading.Lock()
+
+
+def get_pool_client() -> PoolClient:
+    """
+    Returns the client for the configured worker pool, creating it on first use.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                authkey = config.POOL_AUTHKEY.encode('utf-8') if config.POOL_AUTHKEY else None
+                _client = PoolClient((config.POOL_HOST, config.POOL_PORT), authkey)
+                logger.info("Sending searches to the worker pool at %s:%d", config.POOL_HOST, config.POOL_PORT)
+    return _client
@@ -0,0 +1,204 @@
+from concurrent.futures.process import BrokenProcessPool
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.connection import Connection
+from multiprocessing.connection import Listener
+from src.config.logging import logger
+from src.config.setup import config
+from typing import Callable
+from typing import Optional
+from typing import Tuple
+from typing import List
+from typing import Dict
+from typing import Any
+import multiprocessing
+import ipaddress
+import threading
+import argparse
+import socket
+import time
+
+
+def _search(query_mode: str, query: str, profile: bool = False) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    from src.utils.profiler import profile_request
+    from src.search.search import perform_search
+
+    # The pipeline runs here, so this is where it is sampled; profiles go to the shared profile_dir
+    with profile_request(f"{query_mode}: {query}", enabled=profile):
+        return perform_search(query_mode, query)
+
+
+def _extract(query: str) -> Dict[str, str]:
+    from src.query.ner import extract_entities
+    return extract_entities(query)
+
+
+def _resolve(name: str) -> Dict[str, str]:
+    from src.query.sematic_search import find_closest_match
+    return find_closest_match(name)
+
+
+def _more(cursor: Dict[str, Any]) -> Tuple[List[Dict[str, str]], Optional[Dict[str, Any]]]:
+    from src.search.paging import fetch_more
+    return fetch_more(cursor)
+
+
+def _ping() -> str:
+    return "pong"
+
+
+# Methods callable by clients, run in a worker process
+METHODS: Dict[str, Callable[..., Any]] = {
+    "search": _search,
+    "extract": _extract,
+    "resolve": _resolve,
+    "more": _more,
+    "ping": _ping,
+}
+
+
+def _init_worker() -> None:
+    """
+    Builds the worker's own clients before it takes requests. Workers are spawned, not forked,
+    so no gRPC channel or DB connection is inherited from the parent.
+    """
+    start = time.perf_counter()
+    try:
+        from src.query.entity_table import get_entity_table
+        from src.embed.providers import get_vector_store
+        from src.search.client import get_search_client
+        from src.generate.llm import get_llm
+
+        get_entity_table()
+        get_vector_store()
+        get_search_client()
+        get_llm().model
+    except Exception as e:
+        # An exception here would break the whole pool; leave the clients to load on first use
+        logger.error(f"Pool worker failed to preload clients: {e}")
+    logger.info("Pool worker ready in %.0f ms", (time.perf_counter() - start) * 1000)
+
+
+def _run(method: str, kwargs: Dict[str, Any]) -> Any:
+    return METHODS[method](**kwargs)
+
+
+class WorkerPoolServer:
+    """
+    Runs the search pipeline in a pool of worker processes behind a local
+    `multiprocessing.connection` listener, so CPU-bound work (FAISS search, protobuf conversion)
+    is spread over all cores instead of contending for one interpreter's GIL.
+
+    Requests are `(method, kwargs)` tuples; responses are `("ok", result)` or `("error", message)`.
+    Each client connection is served by a thread in this process, which only forwards work.
+    """
+
+    def __init__(self, address: Tuple[str, int], workers: int, authkey: Optional[bytes] = None) -> None:
+        self.address = address
+        self.workers = workers
+        self.authkey = authkey
+        self.executor: Optional[ProcessPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+
+    def _start_executor(self) -> ProcessPoolExecutor:
+        executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker
+        )
+        # Start every worker now rather than on the first requests
+        for _ in range(self.workers):
+            executor.submit(_ping)
+        return executor
+
+    def _submit(self, method: str, kwargs: Dict[str, Any]) -> Any:
+        """
+        Runs a method in a worker. If a worker died (e.g. killed for memory), the executor is
+        broken for good, so it is replaced for later requests; this request still fails, since
+        retrying it could kill the new workers too.
+        """
+        executor = self.executor
+        try:
+            return executor.submit(_run, method, kwargs).result()
+        except BrokenProcessPool:
+            with self._executor_lock:
+                if self.executor is executor:
+                    logger.error("A pool worker died; restarting the worker pool")
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    self.executor = self._start_executor()
+            raise
+
+    def _handle(self, connection: Connection) -> None:
+        with connection:
+            while True:
+                try:
+                    method, kwargs = connection.recv()
+                except (EOFError, OSError):
+                    return
+                if method not in METHODS:
+                    connection.send(("error", f"Unknown method '{method}'"))
+                    continue
+                try:
+                    result = self._submit(method, kwargs)
+                    connection.send(("ok", result))
+                except Exception as e:
+                    logger.error(f"Pool request '{method}' failed: {e}")
+                    connection.send(("error", str(e)))
+
+    def serve_forever(self) -> None:
+        """
+        Starts the workers and accepts client connections until interrupted.
+        """
+        self.executor = self._start_executor()
+
+        with Listener(self.address, authkey=self.authkey) as listener:
+            logger.info("Worker pool with %d processes listening on %s:%d", self.workers, *self.address)
+            try:
+                while True:
+                    try:
+                        connection = listener.accept()
+                    except Exception as e:
+                        # Failed handshakes (e.g. a wrong authkey) only affect that client
+                        logger.error(f"Rejected pool connection: {e}")
+                        continue
+                    threading.Thread(target=self._handle, args=(connection,), name="pool-client", daemon=True).start()
+            finally:
+                self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _is_loopback(host: str) -> bool:
+    try:
+        return ipaddress.ip_address(socket.gethostbyname(host)).is_loopback
+    except (socket.gaierror, ValueError):
+        return False
+
+
+def serve(
+    host: Optional[str] = None,
+    port: Optional[int] = None,
+    workers: Optional[int] = None,
+    authkey: Optional[str] = None
+) -> None:
+    """
+    Serves the worker pool with the configured address, size and authkey.
+
+    Requests are unpickled, so anyone who can connect can run code in the workers; an authkey is
+    therefore required unless the pool only listens on a loopback address.
+
+    Raises:
+        ValueError: If the pool would listen beyond localhost without an authkey.
+    """
+    host = host or config.POOL_HOST
+    authkey = authkey or config.POOL_AUTHKEY
+    if not authkey and not _is_loopback(host):
+        raise ValueError(f"Refusing to serve the worker pool on {host} without pool_authkey")
+    server = WorkerPoolServer((host, port or config.POOL_PORT), workers or config.POOL_WORKERS, authkey.encode('utf-8') if authkey else None)
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the search pipeline from a pool of worker processes.")
+    parser.add_argument("--host")
+    parser.add_argument("--port", type=int)
+    parser.add_argument("--workers", type=int)
+    args = parser.parse_args()
+    serve(args.host, args.port, args.workers)
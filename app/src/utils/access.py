@@ -2,22 +2,21 @@ from src.config.logging import logger
 from src.config.setup import config
 from typing import Optional
 from typing import Dict
-import subprocess
 
 
 def fetch_access_token() -> Optional[str]:
     """
     Fetches an access token for authentication with Google Cloud services.
 
+    The token comes from the shared credential manager, which caches it in-process and refreshes
+    it in the background before it expires.
+
     Returns:
         Optional[str]: The fetched access token if successful, None otherwise.
     """
-    cmd = ["gcloud", "auth", "print-access-token"]
     try:
-        token = subprocess.check_output(cmd).decode('utf-8').strip()
-        logger.info("Successfully fetched access token.")
-        return token
-    except subprocess.CalledProcessError as e:
+        return config.credentials.get_token()
+    except RuntimeError as e:
         logger.error(f"Failed to fetch access token: {e}")
         return None
 
@@ -41,4 +40,4 @@ def create_headers() -> Dict[str, str]:
         "Content-Type": "application/json",
         "X-Goog-User-Project": config.PROJECT_ID
     }
-    return headers
\ No newline at end of file
+    return headers
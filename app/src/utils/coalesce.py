@@ -0,0 +1,102 @@
+from src.config.logging import logger
+from src.utils.metrics import counter
+from typing import Callable
+from typing import Hashable
+from typing import Optional
+from typing import Dict
+from typing import Any
+import threading
+
+
+SINGLE_FLIGHT_CALLS = counter(
+    "single_flight_calls_total", "Calls through a single-flight group; followers reused a leader's result.", ("name", "role")
+)
+
+
+class _Call:
+    """
+    A single in-flight execution shared by every caller that asked for the same key.
+    """
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Deduplicates concurrent calls that share a key.
+
+    The first caller for a key runs the function; callers arriving while it is still
+    running block until it finishes and receive the same result (or exception).
+    Nothing is cached once the call completes - later callers trigger a fresh execution.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def do(self, key: Hashable, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        Executes `fn(*args, **kwargs)` once per in-flight key.
+
+        Args:
+            key (Hashable): Key identifying identical requests.
+            fn (Callable): The function to execute.
+
+        Returns:
+            Any: The result of the shared execution.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                leader = True
+
+        SINGLE_FLIGHT_CALLS.inc(name=self.name, role="leader" if leader else "follower")
+        if not leader:
+            logger.info("[%s] Joining in-flight call for key %r", self.name, key)
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+            if call.waiters:
+                logger.info("[%s] Shared result for key %r with %d waiting caller(s)", self.name, key, call.waiters)
+
+    def in_flight(self) -> int:
+        """
+        Returns the number of keys currently being executed.
+        """
+        with self._lock:
+            return len(self._calls)
+
+
+def normalize_key(*parts: Any) -> tuple:
+    """
+    Builds a coalescing key from the given parts, lowercasing strings and collapsing whitespace.
+
+    Args:
+        *parts (Any): Components of the request (e.g. query mode and query text).
+
+    Returns:
+        tuple: A hashable key.
+    """
+    return tuple(" ".join(part.lower().split()) if isinstance(part, str) else part for part in parts)
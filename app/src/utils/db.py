@@ -1,69 +1,124 @@
-from google.cloud.sql.connector import Connector
 from sqlalchemy.engine.base import Connection
 from sqlalchemy.engine.base import Engine
 from src.config.logging import logger
+from src.utils.metrics import gauge
 from sqlalchemy import create_engine
 from src.config.setup import config
-import bcrypt
+from typing import Optional
+from typing import Dict
+from typing import Tuple
+import threading
 
 # Global variables
 INSTANCE_CONNECTION_NAME = f"{config.PROJECT_ID}:{config.REGION}:{config.CLOUD_SQL_INSTANCE}"
 
-# Initialize Connector object globally to reuse
-connector = Connector()
-
-# This will hold the connection object once it's created
-_connection = None
+# The Cloud SQL connector and engine are created on first use and reused afterwards
+_connector = None
+_engine: Optional[Engine] = None
+_lock = threading.Lock()
 
 # Added to track if the connection has been logged
 _connection_established_logged = False
 
+DB_POOL_CONNECTIONS = gauge("db_pool_connections", "Connections held by the database pool, by state.", ("state",))
+
+
+def _pool_usage() -> Dict[Tuple[str, ...], float]:
+    """
+    Reads the pool's connection counts at scrape time; empty until the engine exists.
+    """
+    pool = _engine.pool if _engine is not None else None
+    if pool is None or not hasattr(pool, "checkedout"):
+        return {}
+    return {("checked_out",): pool.checkedout(), ("idle",): pool.checkedin(), ("overflow",): max(pool.overflow(), 0)}
+
+
+DB_POOL_CONNECTIONS.set_function(_pool_usage)
+
+
+def get_connector():
+    """
+    Returns the shared Cloud SQL connector, creating it on first use.
+
+    Returns:
+        google.cloud.sql.connector.Connector: The Cloud SQL connector.
+    """
+    global _connector
+    if _connector is None:
+        with _lock:
+            if _connector is None:
+                from google.cloud.sql.connector import Connector
+                _connector = Connector()
+    return _connector
+
+
 def get_connection() -> Connection:
     """
-    Establishes a connection to the Cloud SQL instance or returns the existing connection if already established.
+    Opens a new DBAPI connection to the Cloud SQL instance. Used as the creator of the
+    engine's connection pool, which reuses the connections it opens.
     Logs the connection establishment only the first time.
 
     Returns:
         A connection object to the Cloud SQL database.
     """
-    global _connection, _connection_established_logged  # Reference the global variables to modify them
-    if _connection is None:  # Check if the connection does not already exist
-        try:
-            _connection = connector.connect(
-                INSTANCE_CONNECTION_NAME,
-                "pymysql",
-                user=config.CLOUD_SQL_USERNAME,
-                password=config.CLOUD_SQL_PASSWORD,
-                db=config.CLOUD_SQL_DATABASE
-            )
-            if not _connection_established_logged:
-                logger.info("Successfully established connection to Cloud SQL.")
-                _connection_established_logged = True  # Ensure this log happens only once
-        except Exception as e:
-            logger.error(f"Failed to connect to Cloud SQL: {e}")
-            raise
-    return _connection
+    global _connection_established_logged  # Reference the global variable to modify it
+    try:
+        connection = get_connector().connect(
+            INSTANCE_CONNECTION_NAME,
+            "pymysql",
+            user=config.CLOUD_SQL_USERNAME,
+            password=config.CLOUD_SQL_PASSWORD,
+            db=config.CLOUD_SQL_DATABASE
+        )
+        if not _connection_established_logged:
+            logger.info("Successfully established connection to Cloud SQL.")
+            _connection_established_logged = True  # Ensure this log happens only once
+        return connection
+    except Exception as e:
+        logger.error(f"Failed to connect to Cloud SQL: {e}")
+        raise
+
 
 def create_engine_with_connection_pool() -> Engine:
     """
     Creates a SQLAlchemy engine with a connection pool using the `get_connection` function.
+    When `database_url` is configured (e.g. a local SQLite file or MySQL server for testing),
+    the engine connects there instead of Cloud SQL.
 
     Returns:
         A SQLAlchemy engine object.
     """
-    engine = create_engine("mysql+pymysql://", creator=get_connection)
+    if config.DATABASE_URL:
+        logger.info("Using database at configured database_url instead of Cloud SQL.")
+        return create_engine(config.DATABASE_URL, pool_pre_ping=True)
+    engine = create_engine("mysql+pymysql://", creator=get_connection, pool_pre_ping=True)
     return engine
 
+
+def get_engine() -> Engine:
+    """
+    Returns the engine shared by all database modules, creating it on first use.
+
+    Returns:
+        A SQLAlchemy engine object.
+    """
+    global _engine
+    if _engine is None:
+        with _lock:
+            if _engine is None:
+                _engine = create_engine_with_connection_pool()
+    return _engine
+
+
 def encrypt_password(password: str) -> bytes:
     """
-    Generates a salt and hashes the provided password.
-    
+    Generates a salt and hashes the provided password on the bcrypt worker pool.
+
     Args:
         password (str): The plain text password to hash.
-        
+
     Returns:
         bytes: The hashed password.
     """
-    salt = bcrypt.gensalt()
-    hashed_password = bcrypt.hashpw(password.encode('utf-8'), salt)
-    return hashed_password
+    from src.utils.passwords import hash_password
+    return hash_password(password)
@@ -0,0 +1,55 @@
+from typing import List
+from typing import Tuple
+import subprocess
+import argparse
+import sys
+
+
+def profile_imports(module: str) -> List[Tuple[int, int, str]]:
+    """
+    Imports a module in a fresh interpreter with `-X importtime` and collects the timings.
+
+    Args:
+        module (str): Fully qualified name of the module to import.
+
+    Returns:
+        List[Tuple[int, int, str]]: (self microseconds, cumulative microseconds, module name) per imported module.
+    """
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True
+    )
+    timings = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        timings.append((int(self_us), int(cumulative_us), name.rstrip()))
+    if completed.returncode != 0:
+        print(completed.stderr.splitlines()[-1] if completed.stderr else f"Importing {module} failed", file=sys.stderr)
+    return timings
+
+
+def report(module: str, top: int = 25) -> None:
+    """
+    Prints the slowest imports (by cumulative time) triggered by importing a module.
+
+    Args:
+        module (str): Fully qualified name of the module to import.
+        top (int): Number of entries to print.
+    """
+    timings = profile_imports(module)
+    total_us = max((cumulative for _, cumulative, _ in timings), default=0)
+    print(f"Importing {module}: {len(timings)} modules, {total_us / 1000:.0f} ms")
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for self_us, cumulative_us, name in sorted(timings, key=lambda t: t[1], reverse=True)[:top]:
+        print(f"{cumulative_us / 1000:>14.1f} {self_us / 1000:>9.1f}  {name}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Report import-time cost of a module.")
+    parser.add_argument("module", nargs="?", default="src.app.app")
+    parser.add_argument("--top", type=int, default=25)
+    args = parser.parse_args()
+    report(args.module, args.top)
@@ -0,0 +1,50 @@
+from src.config.logging import logger
+from types import ModuleType
+from typing import Optional
+from typing import Any
+import threading
+import importlib
+import time
+
+
+class LazyModule:
+    """
+    Stand-in for a module that is only imported when one of its attributes is first accessed.
+
+    Used for heavy dependencies (Vertex AI, LangChain, Discovery Engine, FAISS) so that importing
+    the app does not pay for them until a request actually needs them.
+    """
+
+    def __init__(self, name: str) -> None:
+        self._name = name
+        self._module: Optional[ModuleType] = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> ModuleType:
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    start = time.perf_counter()
+                    self._module = importlib.import_module(self._name)
+                    logger.info("Lazily imported %s in %.0f ms", self._name, (time.perf_counter() - start) * 1000)
+        return self._module
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._load(), attr)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<lazy module '{self._name}' ({state})>"
+
+
+def lazy_import(name: str) -> LazyModule:
+    """
+    Returns a proxy that imports the named module on first attribute access.
+
+    Args:
+        name (str): Fully qualified module name.
+
+    Returns:
+        LazyModule: The module proxy.
+    """
+    return LazyModule(name)
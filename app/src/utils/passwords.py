@@ -0,0 +1,126 @@
+from concurrent.futures import ThreadPoolExecutor
+from src.config.logging import logger
+from src.config.setup import config
+from typing import Optional
+from typing import Union
+import threading
+import secrets
+import hashlib
+import bcrypt
+import hmac
+import time
+
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+# Secret used to sign session tokens; falls back to a per-process random secret
+_session_secret = (config.SESSION_SECRET or secrets.token_hex(32)).encode('utf-8')
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """
+    Returns the bounded pool that runs bcrypt work. bcrypt releases the GIL while hashing, so the
+    pool size caps how many cores password work can occupy at once.
+    """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=config.BCRYPT_WORKERS, thread_name_prefix="bcrypt")
+    return _executor
+
+
+def _to_bytes(value: Union[str, bytes]) -> bytes:
+    return value.encode('utf-8') if isinstance(value, str) else value
+
+
+def hash_password(password: str) -> bytes:
+    """
+    Hashes a password with the configured bcrypt cost on the bcrypt worker pool.
+
+    Args:
+        password (str): The plain text password to hash.
+
+    Returns:
+        bytes: The hashed password.
+    """
+    salt = bcrypt.gensalt(rounds=config.BCRYPT_ROUNDS)
+    return _get_executor().submit(bcrypt.hashpw, password.encode('utf-8'), salt).result()
+
+
+def verify_password(password: str, hashed_password: Union[str, bytes]) -> bool:
+    """
+    Checks a password against a stored bcrypt hash on the bcrypt worker pool.
+
+    Args:
+        password (str): The plain text password to verify.
+        hashed_password (Union[str, bytes]): The stored hash.
+
+    Returns:
+        bool: True if the password matches, False otherwise.
+    """
+    return _get_executor().submit(bcrypt.checkpw, password.encode('utf-8'), _to_bytes(hashed_password)).result()
+
+
+def hash_cost(hashed_password: Union[str, bytes]) -> Optional[int]:
+    """
+    Reads the cost factor from a bcrypt hash of the form $2b$<cost>$...
+
+    Returns:
+        Optional[int]: The cost factor, or None if the hash is not in bcrypt format.
+    """
+    parts = _to_bytes(hashed_password).split(b'$')
+    try:
+        return int(parts[2])
+    except (IndexError, ValueError):
+        return None
+
+
+def needs_rehash(hashed_password: Union[str, bytes]) -> bool:
+    """
+    Returns True if a hash was made with a cost factor other than the configured one.
+    """
+    return hash_cost(hashed_password) != config.BCRYPT_ROUNDS
+
+
+def issue_session_token(username: str, ttl_seconds: Optional[int] = None) -> str:
+    """
+    Issues a signed token proving the user authenticated, valid for a limited time.
+
+    Args:
+        username (str): The authenticated user.
+        ttl_seconds (Optional[int]): Token lifetime. Defaults to the configured session TTL.
+
+    Returns:
+        str: The token, "<username>|<expiry>|<signature>".
+    """
+    expires_at = int(time.time()) + (ttl_seconds or config.SESSION_TTL_SECONDS)
+    payload = f"{username}|{expires_at}"
+    signature = hmac.new(_session_secret, payload.encode('utf-8'), hashlib.sha256).hexdigest()
+    return f"{payload}|{signature}"
+
+
+def verify_session_token(token: Optional[str]) -> Optional[str]:
+    """
+    Validates a session token without touching bcrypt or the database.
+
+    Args:
+        token (Optional[str]): Token from `issue_session_token`.
+
+    Returns:
+        Optional[str]: The username if the token is authentic and unexpired, None otherwise.
+    """
+    if not token:
+        return None
+    try:
+        username, expires_at, signature = token.rsplit('|', 2)
+        expected = hmac.new(_session_secret, f"{username}|{expires_at}".encode('utf-8'), hashlib.sha256).hexdigest()
+        if not hmac.compare_digest(signature, expected):
+            logger.error("Rejected session token with an invalid signature.")
+            return None
+        if int(expires_at) < time.time():
+            return None
+        return username
+    except ValueError:
+        return None
@@ -0,0 +1,193 @@
+from src.config.logging import logger
+from src.config.setup import config
+from contextlib import contextmanager
+from collections import Counter
+from typing import NamedTuple
+from typing import Iterator
+from typing import Optional
+from typing import List
+import threading
+import hashlib
+import time
+import sys
+import os
+
+
+class SamplingProfiler:
+    """
+    Samples one thread's call stack at a fixed interval from a background thread. The profiled
+    code runs unmodified; the cost is one stack walk per interval.
+
+    Stacks are aggregated in the folded format ("outer;inner;leaf <count>") read by
+    flamegraph.pl and speedscope.
+    """
+
+    def __init__(self, thread_id: int, interval: float = 0.005) -> None:
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _sample(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            if stack:
+                self.samples[";".join(reversed(stack))] += 1
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._sample, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def folded(self) -> str:
+        return "\n".join(f"{stack} {count}" for stack, count in self.samples.most_common()) + "\n"
+
+
+class ProfileInfo(NamedTuple):
+    """
+    A stored profile.
+
+    Attributes:
+        path (str): Location of the folded-stack file.
+        hour (str): UTC hour the request ran in, as YYYYMMDDHH.
+        duration_ms (int): Wall-clock duration of the request.
+        label (str): Description of the request.
+    """
+    path: str
+    hour: str
+    duration_ms: int
+    label: str
+
+
+class ProfileStore:
+    """
+    Keeps the slowest `keep_per_hour` profiles of each hour in a directory and deletes hours
+    older than `retention_hours`, so the directory stays bounded.
+
+    Files are named `<hour>_<duration_ms>_<id>.folded`; the first line holds the label. Pool
+    workers share the directory, so a file may be deleted by another process between listing
+    and removing it.
+    """
+
+    def __init__(self, directory: str, keep_per_hour: int = 5, retention_hours: int = 24) -> None:
+        self.directory = directory
+        self.keep_per_hour = keep_per_hour
+        self.retention_hours = retention_hours
+        self._lock = threading.Lock()
+
+    def list(self) -> List[ProfileInfo]:
+        """
+        Returns stored profiles, newest hour first and slowest first within an hour.
+        """
+        if not os.path.isdir(self.directory):
+            return []
+        profiles = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".folded"):
+                continue
+            try:
+                hour, duration_ms, _ = name.split("_", 2)
+                path = os.path.join(self.directory, name)
+                with open(path, 'r') as file:
+                    label = file.readline().lstrip("# ").rstrip("\n")
+                profiles.append(ProfileInfo(path, hour, int(duration_ms), label))
+            except (ValueError, OSError):
+                continue
+        return sorted(profiles, key=lambda p: (p.hour, p.duration_ms), reverse=True)
+
+    def offer(self, label: str, duration: float, folded: str) -> Optional[str]:
+        """
+        Stores a profile if it is among the slowest of the current hour.
+
+        Args:
+            label (str): Description of the request.
+            duration (float): Request duration in seconds.
+            folded (str): The profile in folded-stack format.
+
+        Returns:
+            Optional[str]: Path of the stored profile, or None if it was not slow enough.
+        """
+        now = time.time()
+        hour = time.strftime("%Y%m%d%H", time.gmtime(now))
+        oldest_hour = time.strftime("%Y%m%d%H", time.gmtime(now - self.retention_hours * 3600))
+        duration_ms = int(duration * 1000)
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            profiles = self.list()
+            for profile in profiles:
+                if profile.hour < oldest_hour:
+                    _remove(profile.path)
+            this_hour = sorted((p for p in profiles if p.hour == hour), key=lambda p: p.duration_ms)
+            if len(this_hour) >= self.keep_per_hour:
+                if duration_ms <= this_hour[0].duration_ms:
+                    return None
+                _remove(this_hour[0].path)
+
+            profile_id = hashlib.sha1(f"{label}{now}".encode('utf-8')).hexdigest()[:8]
+            path = os.path.join(self.directory, f"{hour}_{duration_ms:08d}_{profile_id}.folded")
+            with open(path, 'w') as file:
+                file.write(f"# {label}\n")
+                file.write(folded)
+        logger.info("Stored profile of a %d ms request at %s", duration_ms, path)
+        return path
+
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+_store: Optional[ProfileStore] = None
+_store_lock = threading.Lock()
+
+
+def get_profile_store() -> ProfileStore:
+    """
+    Returns the profile store configured by the `profile_*` keys, creating it on first use.
+    """
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = ProfileStore(config.PROFILE_DIR, config.PROFILE_KEEP_PER_HOUR, config.PROFILE_RETENTION_HOURS)
+    return _store
+
+
+@contextmanager
+def profile_request(label: str, enabled: bool) -> Iterator[None]:
+    """
+    Samples the current thread for the duration of the block and offers the result to the
+    profile store. Does nothing when `enabled` is False.
+
+    Args:
+        label (str): Description of the request, stored with the profile.
+        enabled (bool): Whether to profile this request.
+    """
+    if not enabled:
+        yield
+        return
+
+    profiler = SamplingProfiler(threading.get_ident(), config.PROFILE_INTERVAL_MS / 1000)
+    start = time.perf_counter()
+    profiler.start()
+    try:
+        yield
+    finally:
+        profiler.stop()
+        duration = time.perf_counter() - start
+        try:
+            get_profile_store().offer(label, duration, profiler.folded())
+        except OSError as e:
+            logger.error(f"Failed to store profile: {e}")
@@ -0,0 +1,8 @@
+import sys
+import os
+
+
+# The app imports its modules as `src.*` and reads ./config/config.yml, both relative to app/
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+os.chdir(APP_DIR)
@@ -0,0 +1,146 @@
+from src.utils.passwords import issue_session_token
+from aiohttp.test_utils import TestServer
+from aiohttp.test_utils import TestClient
+from src.serve.api import SearchAPI
+import src.serve.api as api
+import asyncio
+import pytest
+
+
+SEARCH_RESULTS = {'site': [{'title': 'Annual Report 2021', 'link': 'https://bank.example/ar2021.pdf'}], 'cdn': []}
+ENTITIES = {'company': 'Example Bank', 'report_type': 'annual report', 'country': 'Japan', 'year': '2021', 'site_url': 'bank.example'}
+
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    """
+    Stands in for the search pipeline and the database at the API's boundary.
+    """
+    calls = {'search': [], 'feedback': []}
+
+    def search(query_mode, query):
+        calls['search'].append((query_mode, query))
+        if query == "fail":
+            raise RuntimeError("backend down")
+        return {'results': SEARCH_RESULTS, 'entities': ENTITIES}
+
+    def insert_feedback(row):
+        calls['feedback'].append(row)
+        return True
+
+    monkeypatch.setattr(api, "start_warmup", lambda: None)
+    monkeypatch.setattr(api, "_search", search)
+    monkeypatch.setattr(api, "insert_feedback", insert_feedback)
+    monkeypatch.setattr(api, "authenticate_user", lambda username, password: (username, password) == ("alice", "secret"))
+    return calls
+
+
+def _request(method, path, json=None, token="valid"):
+    """
+    Sends one request to a fresh API server and returns (status, body).
+    """
+    async def run():
+        headers = {}
+        if token == "valid":
+            headers['Authorization'] = f"Bearer {issue_session_token('alice')}"
+        elif token is not None:
+            headers['Authorization'] = f"Bearer {token}"
+        async with TestClient(TestServer(SearchAPI(max_concurrency=4, max_batch=10).create_app())) as client:
+            response = await client.request(method, path, json=json, headers=headers)
+            # Bad requests are answered in plain text
+            body = await response.json() if response.content_type == "application/json" else await response.text()
+            return response.status, body
+    return asyncio.run(run())
+
+
+def test_login_issues_a_token_that_authorizes_requests(pipeline):
+    status, body = _request("POST", "/login", {'username': 'alice', 'password': 'secret'}, token=None)
+    assert status == 200
+    status, _ = _request("POST", "/search", {'search': {'query': 'annual report'}}, token=body['token'])
+    assert status == 200
+
+
+def test_login_rejects_a_wrong_password(pipeline):
+    status, body = _request("POST", "/login", {'username': 'alice', 'password': 'wrong'}, token=None)
+    assert status == 401
+    assert 'token' not in body
+
+
+@pytest.mark.parametrize("token", [None, "not-a-token", "alice|0|forged"])
+def test_requests_without_a_valid_token_are_rejected(pipeline, token):
+    status, _ = _request("POST", "/search", {'search': {'query': 'annual report'}}, token=token)
+    assert status == 401
+    assert pipeline['search'] == []
+
+
+def test_search_runs_one_pipeline_call_per_item(pipeline):
+    status, body = _request("POST", "/search", {'searches': [{'query': 'annual report', 'mode': 'Targeted'}, {'query': 'fail'}]})
+    assert status == 200
+    assert body['searches'][0] == {'results': SEARCH_RESULTS, 'entities': ENTITIES}
+    assert body['searches'][1] == {'error': "backend down"}
+    assert sorted(pipeline['search']) == [('Raw', 'fail'), ('Targeted', 'annual report')]
+
+
+def test_search_rejects_items_without_a_query(pipeline):
+    status, _ = _request("POST", "/search", {'search': {'mode': 'Raw'}})
+    assert status == 400
+
+
+def test_feedback_is_validated_and_attributed_to_the_session_user(pipeline):
+    row = {'query': 'annual report', 'is_relevant': 'Yes', 'url': 'https://bank.example/ar2021.pdf', 'year': '2021', 'match_rank': 1}
+    status, body = _request("POST", "/feedback", {'feedback_rows': [row, {**row, 'year': 'NONE'}]})
+    assert status == 202
+    assert body == {'accepted': 2, 'errors': []}
+    assert [stored['username'] for stored in pipeline['feedback']] == ['alice', 'alice']
+    assert [stored['year'] for stored in pipeline['feedback']] == [2021, None]
+
+
+def test_feedback_with_invalid_fields_is_rejected(pipeline):
+    status, _ = _request("POST", "/feedback", {'feedback': {'query': 'annual report', 'is_relevant': 'Maybe'}})
+    assert status == 400
+    status, _ = _request("POST", "/feedback", {'feedback': {'query': 'q', 'is_relevant': 'Yes', 'url': 'x' * 300}})
+    assert status == 400
+    assert pipeline['feedback'] == []
+
+
+@pytest.fixture
+def paging(pipeline, monkeypatch):
+    """
+    Known data stores: 'batch_1' in the entity table, 'batch_9' only in the database.
+    """
+    from src.query.entity_table import EntityRecord
+    from src.query.entity_table import EntityTable
+    import src.query.entity_table as entity_table
+    import src.db.match as match
+
+    table = EntityTable([EntityRecord(0, 'Example Bank', 'bank.example', 'Japan', 'batch_1', {})])
+    monkeypatch.setattr(entity_table, "get_entity_table", lambda: table)
+    monkeypatch.setattr(match, "batch_id_exists", lambda batch_id: batch_id == 'batch_9')
+    monkeypatch.setattr(api, "_more", lambda cursor: {'results': [{'title': cursor['page_token']}], 'next_page': None})
+
+
+def _cursor(backend, batch_id, page_token="page-2"):
+    return {'backend': backend, 'query': 'annual report', 'company': 'Example Bank', 'batch_id': batch_id, 'page_token': page_token}
+
+
+def test_more_returns_the_page_of_each_cursor(paging):
+    cursors = [_cursor('site', 'batch_1'), _cursor('cdn', None, "page-3"), _cursor('site', 'batch_9')]
+    status, body = _request("POST", "/more", {'cursors': cursors})
+    assert status == 200
+    assert [page['results'][0]['title'] for page in body['pages']] == ["page-2", "page-3", "page-2"]
+
+
+@pytest.mark.parametrize("cursor", [_cursor('site', 'batch_other'), _cursor('site', None), _cursor('cdn', 'batch_1'), _cursor('ftp', None)])
+def test_more_rejects_cursors_for_unknown_data_stores(paging, cursor):
+    status, _ = _request("POST", "/more", {'cursors': [_cursor('site', 'batch_1'), cursor]})
+    assert status == 403
+
+
+def test_more_rejects_malformed_cursors(paging):
+    status, _ = _request("POST", "/more", {'cursor': {'backend': 'site'}})
+    assert status == 400
+
+
+def test_more_requires_a_session_token(paging):
+    status, _ = _request("POST", "/more", {'cursor': _cursor('site', 'batch_1')}, token=None)
+    assert status == 401
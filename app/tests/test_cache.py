@@ -0,0 +1,77 @@
+from src.generate.cache import MemoryCache
+from src.generate.cache import TieredCache
+from src.generate.cache import DiskCache
+import src.generate.cache as cache_module
+import pytest
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(cache_module.time, "time", fake.time)
+    return fake
+
+
+def test_memory_cache_expires_after_ttl(clock):
+    cache = MemoryCache(ttl_seconds=10)
+    cache.set("key", "value")
+    clock.now += 9
+    assert cache.get("key") == "value"
+    clock.now += 2
+    assert cache.get("key") is None
+
+
+def test_memory_cache_evicts_least_recently_used():
+    cache = MemoryCache(max_entries=2)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    cache.get("a")
+    cache.set("c", "3")
+    assert cache.get("a") == "1"
+    assert cache.get("b") is None
+    assert cache.get("c") == "3"
+
+
+def test_disk_cache_expires_after_ttl_and_survives_reopening(tmp_path, clock):
+    path = str(tmp_path / "cache.sqlite")
+    DiskCache(path, ttl_seconds=10).set("key", "value")
+    reopened = DiskCache(path, ttl_seconds=10)
+    assert reopened.get("key") == "value"
+    clock.now += 11
+    assert reopened.get("key") is None
+
+
+def test_tiered_cache_promotes_disk_hits(tmp_path):
+    disk = DiskCache(str(tmp_path / "cache.sqlite"))
+    disk.set("key", "value")
+    cache = TieredCache(MemoryCache(), disk)
+    assert cache.get("key") == "value"
+    assert cache.memory.get("key") == "value"
+
+
+def test_tiered_cache_promotion_keeps_the_original_ttl(tmp_path, clock):
+    disk = DiskCache(str(tmp_path / "cache.sqlite"), ttl_seconds=10)
+    disk.set("key", "value")
+    cache = TieredCache(MemoryCache(ttl_seconds=10), disk)
+    clock.now += 8
+    assert cache.get("key") == "value"
+    clock.now += 3
+    assert cache.memory.get("key") is None
+    assert cache.get("key") is None
+
+
+def test_tiered_cache_writes_and_clears_both_tiers(tmp_path):
+    cache = TieredCache(MemoryCache(), DiskCache(str(tmp_path / "cache.sqlite")))
+    cache.set("key", "value")
+    assert cache.memory.get("key") == "value"
+    assert cache.disk.get("key") == "value"
+    cache.clear()
+    assert cache.get("key") is None
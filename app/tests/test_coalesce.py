@@ -0,0 +1,97 @@
+from src.utils.coalesce import SingleFlight
+import threading
+import pytest
+
+
+def _start_calls(flight, key, fn, count):
+    results, threads = [], []
+    for _ in range(count):
+        thread = threading.Thread(target=lambda: results.append(flight.do(key, fn)))
+        thread.start()
+        threads.append(thread)
+    return results, threads
+
+
+def _wait_for_waiters(flight, key, count):
+    for _ in range(1000):
+        with flight._lock:
+            call = flight._calls.get(key)
+            if call is not None and call.waiters == count:
+                return
+        threading.Event().wait(0.001)
+    raise AssertionError(f"{count} followers never joined the call")
+
+
+def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight("test")
+    release = threading.Event()
+    calls = []
+
+    def fn():
+        calls.append(1)
+        release.wait(5)
+        return "result"
+
+    leader, leader_threads = _start_calls(flight, "key", fn, 1)
+    while not calls:
+        threading.Event().wait(0.001)
+    followers, follower_threads = _start_calls(flight, "key", fn, 3)
+    _wait_for_waiters(flight, "key", 3)
+    release.set()
+    for thread in leader_threads + follower_threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert leader + followers == ["result"] * 4
+
+
+def test_followers_receive_the_leaders_exception():
+    flight = SingleFlight("test")
+    release = threading.Event()
+    started = threading.Event()
+    errors = []
+
+    def fn():
+        started.set()
+        release.wait(5)
+        raise ValueError("backend down")
+
+    def call():
+        try:
+            flight.do("key", fn)
+        except ValueError as e:
+            errors.append(str(e))
+
+    threads = [threading.Thread(target=call)]
+    threads[0].start()
+    started.wait(5)
+    threads += [threading.Thread(target=call) for _ in range(2)]
+    for thread in threads[1:]:
+        thread.start()
+    _wait_for_waiters(flight, "key", 2)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert errors == ["backend down"] * 3
+
+
+def test_completed_calls_are_not_cached():
+    flight = SingleFlight("test")
+    calls = []
+
+    def fn():
+        calls.append(1)
+        return len(calls)
+
+    assert flight.do("key", fn) == 1
+    assert flight.do("key", fn) == 2
+    assert flight._calls == {}
+
+
+def test_different_keys_run_separately():
+    flight = SingleFlight("test")
+    assert flight.do("a", lambda: "a") == "a"
+    assert flight.do("b", lambda: "b") == "b"
+    with pytest.raises(KeyError):
+        flight.do("c", lambda: {}["missing"])
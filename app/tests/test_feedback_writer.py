@@ -0,0 +1,117 @@
+from src.db.feedback_writer import FeedbackWriter
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.exc import DataError
+from sqlalchemy import create_engine
+from src.db.migrate import migrate
+from src.db.migrate import FEEDBACK
+from sqlalchemy import text
+import src.db.feedback_writer as feedback_writer
+import subprocess
+import json
+import sys
+import os
+import pytest
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'feedback.sqlite'}")
+    migrate(engine)
+    monkeypatch.setattr(feedback_writer, "get_engine", lambda: engine)
+    return engine
+
+
+@pytest.fixture
+def writer(tmp_path):
+    return FeedbackWriter(str(tmp_path / "spool" / "feedback.jsonl"), batch_size=2)
+
+
+def _row(unique_hash, **overrides):
+    row = {
+        'timestamp': '2024-01-01 00:00:00', 'feedback_given_timestamp': '2024-01-01 00:00:00',
+        'username': 'alice', 'query': 'annual report', 'is_relevant': 'Yes', 'unique_hash': unique_hash,
+    }
+    return {**row, **overrides}
+
+
+def _stored_hashes(engine):
+    with engine.connect() as connection:
+        return sorted(value for (value,) in connection.execute(text(f"SELECT unique_hash FROM {FEEDBACK}")))
+
+
+def _spool_files(writer):
+    directory = os.path.dirname(writer.spool_path)
+    return sorted(name for name in os.listdir(directory) if not name.endswith(".failed"))
+
+
+def test_flush_inserts_spooled_rows_and_ignores_duplicates(engine, writer):
+    for unique_hash in ("a", "b", "c", "a"):
+        writer.enqueue(_row(unique_hash))
+    assert writer.flush() == 4
+    assert _stored_hashes(engine) == ["a", "b", "c"]
+    assert _spool_files(writer) == []
+
+
+def test_transient_errors_keep_the_batch_spooled(engine, writer, monkeypatch):
+    writer.enqueue(_row("a"))
+    insert_rows = writer._insert_rows
+    available = False
+
+    def insert_when_available(rows):
+        if not available:
+            raise OperationalError("INSERT", {}, Exception("database unavailable"))
+        insert_rows(rows)
+
+    monkeypatch.setattr(writer, "_insert_rows", insert_when_available)
+    assert writer.flush() == 0
+    assert len(_spool_files(writer)) == 1
+
+    available = True
+    assert writer.flush() == 1
+    assert _stored_hashes(engine) == ["a"]
+    assert _spool_files(writer) == []
+
+
+def test_rejected_rows_and_torn_lines_are_quarantined(engine, writer, monkeypatch):
+    insert_rows = writer._insert_rows
+
+    def reject_long_urls(rows):
+        # As MySQL rejects a value too long for its column; SQLite does not enforce lengths
+        if any(len(row['url'] or "") > 255 for row in rows):
+            raise DataError("INSERT", {}, Exception("Data too long for column 'url'"))
+        insert_rows(rows)
+
+    monkeypatch.setattr(writer, "_insert_rows", reject_long_urls)
+    writer.enqueue(_row("a"))
+    writer.enqueue(_row("b", url="https://example.com/" + "x" * 300))
+    with open(f"{writer.spool_path}.{os.getpid()}", 'a') as spool:
+        spool.write('{"username": "alice", "que')
+
+    assert writer.flush() == 1
+    assert _stored_hashes(engine) == ["a"]
+    with open(f"{writer.spool_path}.failed") as failed:
+        lines = failed.read().splitlines()
+    # Torn lines are quarantined as the batch is read, before any insert
+    assert lines[0] == '{"username": "alice", "que'
+    assert json.loads(lines[1])['unique_hash'] == "b"
+
+
+def test_flush_adopts_spools_of_exited_processes(engine, writer):
+    exited = subprocess.Popen([sys.executable, "-c", "pass"])
+    exited.wait()
+    with open(f"{writer.spool_path}.{exited.pid}", 'w') as spool:
+        spool.write(json.dumps({column: _row("orphan").get(column) for column in feedback_writer.FEEDBACK_COLUMNS}) + "\n")
+
+    assert writer.flush() == 1
+    assert _stored_hashes(engine) == ["orphan"]
+    assert _spool_files(writer) == []
+
+
+def test_flush_leaves_batches_of_running_processes(engine, writer):
+    # The test runner's parent process is running and owns this batch
+    batch_path = f"{writer.spool_path}.{os.getppid()}.1.batch"
+    with open(batch_path, 'w') as batch:
+        batch.write(json.dumps(_row("theirs")) + "\n")
+
+    assert writer.flush() == 0
+    assert os.path.exists(batch_path)
@@ -0,0 +1,77 @@
+from sqlalchemy.exc import OperationalError
+from src.db.migrate import SCHEMA_VERSION_TABLE
+from src.db.migrate import current_version
+from src.db.create import generate_hash
+from src.db.migrate import ENTITY_URLS
+from src.db.migrate import MIGRATIONS
+from src.db.migrate import FEEDBACK
+from src.db.migrate import migrate
+from src.db.migrate import USERS
+from sqlalchemy import create_engine
+from sqlalchemy import inspect
+from sqlalchemy import text
+import src.db.migrate as migrate_module
+import pytest
+
+
+LATEST = MIGRATIONS[-1].version
+
+
+@pytest.fixture
+def engine():
+    return create_engine("sqlite://")
+
+
+def test_migrate_creates_the_schema_and_records_each_version(engine):
+    assert current_version(engine) == 0
+    assert migrate(engine) == LATEST
+
+    tables = set(inspect(engine).get_table_names())
+    assert {USERS, FEEDBACK, ENTITY_URLS, SCHEMA_VERSION_TABLE} <= tables
+    assert "query_mode" in {column['name'] for column in inspect(engine).get_columns(FEEDBACK)}
+    with engine.connect() as connection:
+        versions = [version for (version,) in connection.execute(text(f"SELECT version FROM {SCHEMA_VERSION_TABLE} ORDER BY version"))]
+    assert versions == [migration.version for migration in MIGRATIONS]
+
+
+def test_migrate_is_a_no_op_when_current(engine):
+    migrate(engine)
+    assert migrate(engine) == LATEST
+    with engine.connect() as connection:
+        assert connection.execute(text(f"SELECT COUNT(*) FROM {SCHEMA_VERSION_TABLE}")).scalar() == len(MIGRATIONS)
+
+
+def test_migrate_stops_at_the_target_and_resumes(engine):
+    assert migrate(engine, target=3) == 3
+    assert "query_mode" not in {column['name'] for column in inspect(engine).get_columns(FEEDBACK)}
+    assert migrate(engine) == LATEST
+    assert "query_mode" in {column['name'] for column in inspect(engine).get_columns(FEEDBACK)}
+
+
+def test_a_failed_migration_is_not_recorded(engine, monkeypatch):
+    def broken(connection):
+        connection.execute(text("ALTER TABLE missing_table ADD COLUMN x INT"))
+
+    failing = migrate_module.Migration(LATEST + 1, "broken", broken)
+    monkeypatch.setattr(migrate_module, "MIGRATIONS", MIGRATIONS + [failing])
+    with pytest.raises(OperationalError):
+        migrate(engine)
+    assert current_version(engine) == LATEST
+
+
+def test_rehash_keeps_the_earliest_of_rows_that_become_duplicates(engine, monkeypatch):
+    monkeypatch.setattr(migrate_module, "REHASH_BATCH_SIZE", 2)
+    migrate(engine, target=5)
+    queries = ["Annual Report 2021", "annual  report 2021", "2021 ANNUAL REPORT", "quarterly report"]
+    with engine.begin() as connection:
+        connection.execute(text(f"INSERT INTO {USERS} (username, password_hash) VALUES ('alice', 'x')"))
+        for number, query in enumerate(queries):
+            connection.execute(
+                text(f"INSERT INTO {FEEDBACK} (username, query, feedback, is_relevant, unique_hash) VALUES ('alice', :query, 'ok', 'Yes', :old)"),
+                {'query': query, 'old': f"old-{number}"}
+            )
+
+    migrate(engine)
+    with engine.connect() as connection:
+        hashes = [value for (value,) in connection.execute(text(f"SELECT unique_hash FROM {FEEDBACK} ORDER BY id"))]
+    assert hashes == [generate_hash('alice', queries[0], 'ok', 'Yes'), None, None, generate_hash('alice', queries[3], 'ok', 'Yes')]